@@ -39,7 +39,9 @@ r"""
 """
 
 from .customTypes import (Matrix, intList, matrixList, supInp, ndOrListInt, ndOrList)
-from .linearAlgebra import (hc, innerProd, norm, outerProd, tensorProd, trace, partialTrace, _matMulInputs, _matPower)
+from .linearAlgebra import (
+    hc, innerProd, norm, outerProd, tensorProd, trace, partialTrace, applyLocal, _matMulInputs, _matPower
+)
 from .states import (
     basis, completeBasis, basisBra, zerosKet, zerosMat, weightedSum, superPos, densityMatrix, completeBasisMat,
     normalise, compositeState, mat2Vec, vec2Mat, BellStates, purity
@@ -49,13 +51,17 @@ from .operators import (
     paritySUM, parityEXP, displacement, squeeze, compositeOp
 )
 from .evolution import (
-    Unitary, Liouvillian, LiouvillianExp, dissipator, _preSO, _postSO, _prepostSO, evolveOpen, steadyState
+    Unitary, Liouvillian, LiouvillianExp, UnitaryAction, LiouvillianExpAction, hermitianEigens, UnitaryEigen,
+    dissipator, evolveODE, magnusNodes, MagnusExp, splitHamiltonian, trotterParameters, TrotterAction, _preSO, _postSO,
+    _prepostSO, evolveBatch, FloquetEigens, quasiEnergies, FloquetEvolve, symmetrySectors, SectorExp, sectorRestrict,
+    sectorEmbed, UnitaryDiagonal, UnitaryRotation, UnitaryTwoLevel, quantumJumpStep, evolveOpen, steadyState,
+    iterativeSteadyState, LiouvillianOperator, KroneckerHamiltonian, _kroneckerTrace
 )
 from .functions import (
     expectation, fidelityPure, entropy, sortedEigens, concurrence, traceDistance, _expectationColArr,
     standardDev, spectralNorm, _fidelityTest
 )
-from ._helpers import (loopIt)
+from ._helpers import (loopIt, _matrixKey)
 from .rmtDistributions import (EigenVectorDist, WignerDyson, WignerSurmise, Poissonian)
 from .thermodynamics import(nBarThermal, qubitPolarisation, HeatCurrent)
 from .spinRotations import(qubRotation, xRotation, yRotation, zRotation)
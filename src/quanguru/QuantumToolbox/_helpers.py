@@ -9,6 +9,7 @@ r"""
     .. autosummary::
 
         loopIt
+        _matrixKey
 
     .. |c| unicode:: U+2705
     .. |x| unicode:: U+274C
@@ -18,11 +19,18 @@ r"""
        **Function Name**        **Docstrings**       **Examples**     **Unit Tests**     **Tutorials**
     =======================    ==================   ==============   ================   ===============
        `loopIt`                  |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `_matrixKey`              |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
     =======================    ==================   ==============   ================   ===============
 
 """
 
 from typing import Callable, Iterable, List
+from hashlib import blake2b
+
+import numpy as np # type: ignore
+import scipy.sparse as sp # type: ignore
+
+from .customTypes import Matrix
 
 
 def loopIt(func: Callable, *inps: Iterable) -> List:
@@ -55,3 +63,37 @@ def loopIt(func: Callable, *inps: Iterable) -> List:
 
     """
     return [func(*inp) for inp in zip(*inps)]
+
+def _matrixKey(matrix: Matrix) -> tuple:
+    r"""
+    Creates a hashable key from the content (shape, dtype, and the values) of a (sparse or array) matrix, so that two
+    matrices with the same content have the same key even if they are different objects. Used internally to cache
+    quantities (such as the eigen-decomposition or the exponential) computed from a matrix.
+
+    Parameters
+    ----------
+    matrix : Matrix
+        a sparse or array matrix
+
+    Returns
+    -------
+    tuple
+        shape, dtype and digest of the content of the matrix
+
+    Examples
+    --------
+    >>> _matrixKey(sigmaz()) == _matrixKey(sigmaz())
+    True
+    >>> _matrixKey(sigmaz()) == _matrixKey(sigmax())
+    False
+
+    """
+    digest = blake2b(digest_size=16)
+    if sp.issparse(matrix):
+        matrix = sp.csc_matrix(matrix)
+        matrix.sum_duplicates()
+        for arr in (matrix.indptr, matrix.indices, matrix.data):
+            digest.update(np.ascontiguousarray(arr).tobytes())
+    else:
+        digest.update(np.ascontiguousarray(matrix).tobytes())
+    return (matrix.shape, str(matrix.dtype), sp.issparse(matrix), digest.hexdigest())
@@ -10,6 +10,32 @@ r"""
         Unitary
         Liouvillian
         LiouvillianExp
+        UnitaryAction
+        LiouvillianExpAction
+        hermitianEigens
+        UnitaryEigen
+        evolveODE
+        magnusNodes
+        MagnusExp
+        splitHamiltonian
+        trotterParameters
+        TrotterAction
+        evolveBatch
+        FloquetEigens
+        quasiEnergies
+        FloquetEvolve
+        symmetrySectors
+        SectorExp
+        sectorRestrict
+        sectorEmbed
+        UnitaryDiagonal
+        UnitaryRotation
+        UnitaryTwoLevel
+        quantumJumpStep
+        iterativeSteadyState
+        LiouvillianOperator
+        KroneckerHamiltonian
+        evolveOpen
 
         dissipator
         _preSO
@@ -26,6 +52,32 @@ r"""
        `Unitary`                 |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |x|        |w| |w| |x|
        `Liouvillian`             |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |x|        |w| |w| |x|
        `LiouvillianExp`          |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |x|        |w| |w| |x|
+       `UnitaryAction`           |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `LiouvillianExpAction`    |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `hermitianEigens`         |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `UnitaryEigen`            |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `evolveODE`               |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `magnusNodes`             |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |x|        |w| |w| |x|
+       `MagnusExp`               |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `splitHamiltonian`        |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `trotterParameters`       |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `TrotterAction`           |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `evolveBatch`             |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `FloquetEigens`           |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `quasiEnergies`           |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `FloquetEvolve`           |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `symmetrySectors`         |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `SectorExp`               |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `sectorRestrict`          |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `sectorEmbed`             |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `UnitaryDiagonal`         |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `UnitaryRotation`         |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `UnitaryTwoLevel`         |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `quantumJumpStep`         |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `iterativeSteadyState`    |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+       `LiouvillianOperator`     |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `KroneckerHamiltonian`    |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `evolveOpen`              |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
        `dissipator`              |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
        `_preSO`                  |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
        `_postSO`                 |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
@@ -34,11 +86,16 @@ r"""
 
 """
 
-from typing import Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from inspect import signature
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+import numpy as np # type: ignore
 import scipy.sparse as sp # type: ignore
+import scipy.integrate as integ # type: ignore
 import scipy.linalg as linA # type: ignore
 import scipy.sparse.linalg as slinA # type: ignore
+import scipy.sparse.csgraph as csgraph # type: ignore
 
 from .linearAlgebra import hc
 from .functions import sortedEigens
@@ -225,6 +282,1008 @@ def LiouvillianExp(Hamiltonian: Optional[Matrix] = None, timeStep: float = 1.0,#
         liouvillianEXP = Unitary(Hamiltonian, timeStep)
     return liouvillianEXP
 
+def UnitaryAction(Hamiltonian: Matrix, state: Matrix, timeStep: float = 1.0,
+                  HamiltonianTrace: Optional[complex] = None) -> Matrix:
+    r"""
+    Computes the action :math:`e^{-i\hat{H}t}|\psi\rangle` of the `Unitary` time evolution operator on a `state` without
+    creating the `Unitary` itself, which requires only (sparse) matrix-vector products of the `Hamiltonian`
+    (see :func:`scipy.sparse.linalg.expm_multiply`).
+
+    Keeps sparse/array as sparse/array (of the `state`).
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix
+        Hamiltonian of the system
+    state : Matrix
+        ket state (or a matrix whose columns are evolved)
+    timeStep : float
+        time used in the exponentiation (default=1.0)
+    HamiltonianTrace : complex or None
+        trace of the Hamiltonian, which is used (if given) instead of estimating the trace of a matrix-free
+        Hamiltonian (such as :func:`KroneckerHamiltonian`)
+
+    Returns
+    -------
+    Matrix
+        time evolved state
+    """
+
+    return LiouvillianExpAction(Hamiltonian, state, timeStep=timeStep, HamiltonianTrace=HamiltonianTrace)
+
+def LiouvillianExpAction(Hamiltonian: Optional[Matrix] = None, state: Optional[Matrix] = None, timeStep: float = 1.0, # pylint: disable=dangerous-default-value,unsubscriptable-object # noqa: E501
+                         collapseOperators: Optional[List] = None, decayRates: Optional[List] = None,
+                         _double: bool = False, matrixFree: bool = False,
+                         HamiltonianTrace: Optional[complex] = None) -> Matrix:
+    r"""
+    For a `time step t`, computes the action of the exponentiated `Liouvillian` :math:`\hat{\mathcal{L}}` on a
+    vectorised density matrix, or of the unitary :math:`U(t)` on a ket state if there are no `collapseOperators`.
+    The exponential itself is never created, which is the main difference to :func:`LiouvillianExp`, and the memory
+    and time requirements scale with the number of non-zero elements of the generator.
+
+    Keeps sparse/array as sparse/array (of the `state`).
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix or None
+        Hamiltonian of the system
+    state : Matrix
+        ket state or vectorised density matrix (see :func:`mat2Vec <quanguru.QuantumToolbox.states.mat2Vec>`)
+    timeStep : float
+        time used in the exponentiation (default=1)
+    collapseOperators : list (of Matrix)
+        `list` of collapse operator for Lindblad dissipator terms
+    decayRates : list (of float)
+        `list` of decay rates (if not given assumed to be 1)
+    matrixFree : bool
+        if True, the Liouvillian is used as a matrix-free operator (see :func:`LiouvillianOperator`) instead of the
+        explicit super-operator (default=False)
+    HamiltonianTrace : complex or None
+        trace of the Hamiltonian (without any `collapseOperators`), which is used (if given) instead of estimating the
+        trace of a matrix-free Hamiltonian (such as :func:`KroneckerHamiltonian`)
+
+    Returns
+    -------
+    Matrix
+        time evolved (vectorised) state
+    """
+
+    traceA = None if HamiltonianTrace is None else -1j*timeStep*HamiltonianTrace
+    if isinstance(collapseOperators, list) and matrixFree:
+        terms = _lindbladTerms(Hamiltonian, collapseOperators, decayRates, _double)
+        generator, traceA = _lindbladOperator(terms), timeStep*_lindbladTrace(terms)
+    elif isinstance(collapseOperators, list):
+        generator = Liouvillian(Hamiltonian, collapseOperators, decayRates, _double=_double)
+    elif Hamiltonian is not None:
+        generator = -1j * Hamiltonian
+    else:
+        raise ValueError('Hamiltonian is required if there are no collapseOperators')
+
+    if state is None:
+        raise ValueError('state is required for the action of the exponential')
+    sparse = sp.issparse(state)
+    dense = state if isinstance(state, np.ndarray) else state.toarray()
+    evolved = slinA.expm_multiply(timeStep * generator, dense, **_expmTrace(traceA))
+    return sp.csc_matrix(evolved) if sparse else evolved
+
+def hermitianEigens(Hamiltonian: Matrix) -> Tuple:
+    r"""
+    Diagonalises a (Hermitian) `Hamiltonian` :math:`\hat{H} = \hat{V}\hat{E}\hat{V}^{\dagger}`, and returns the
+    (real and ascending) eigenvalues :math:`\hat{E}` and the eigenvectors (as the columns of :math:`\hat{V}`), which can
+    be used with :func:`UnitaryEigen` to create the unitary for any `time step` without any further exponentiation.
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix
+        Hermitian Hamiltonian of the system
+
+    Returns
+    -------
+    Tuple
+        eigenvalues (1d array) and eigenvectors (2d array)
+    """
+
+    return linA.eigh(Hamiltonian if isinstance(Hamiltonian, np.ndarray) else Hamiltonian.toarray())
+
+def UnitaryEigen(eigenValues: np.ndarray, eigenVectors: np.ndarray, timeStep: float = 1.0,
+                 sparse: bool = False) -> Matrix:
+    r"""
+    Creates `Unitary` time evolution operator :math:`U(t) = \hat{V}e^{-i\hat{E}t}\hat{V}^{\dagger}` from the eigenvalues
+    :math:`\hat{E}` and the eigenvectors :math:`\hat{V}` of a Hamiltonian (see :func:`hermitianEigens`), which
+    requires only a diagonal phase update and a matrix product, instead of an exponentiation, for each `time step t`.
+
+    Parameters
+    ----------
+    eigenValues : np.ndarray
+        eigenvalues of the Hamiltonian
+    eigenVectors : np.ndarray
+        eigenvectors (as the columns) of the Hamiltonian
+    timeStep : float
+        time used in the exponentiation (default=1.0)
+    sparse : bool
+        if True, returns a sparse (csc) matrix (default=False)
+
+    Returns
+    -------
+    Matrix
+        Unitary time evolution operator
+
+    Examples
+    --------
+    >>> UnitaryEigen(*hermitianEigens(2*np.pi*sigmaz()), 1)
+    array([[1.+2.4492936e-16j, 0.+0.0000000e+00j],
+           [0.+0.0000000e+00j, 1.-2.4492936e-16j]])
+
+    """
+
+    unitary = (eigenVectors * np.exp(-1j * eigenValues * timeStep)) @ eigenVectors.conj().T
+    return sp.csc_matrix(unitary) if sparse else unitary
+
+def _odeSolver(Hamiltonian: Union[Callable, Matrix], initialState: Matrix, initialTime: float = 0.0, # pylint: disable=too-many-arguments
+               collapseOperators: Optional[List] = None, decayRates: Optional[List] = None,
+               method: str = 'DOP853', rtol: float = 1e-8, atol: float = 1e-10):
+    r"""
+    Creates a (scipy) adaptive step-size ODE solver for the Schrödinger equation of a ket or, if there are
+    `collapseOperators`, for the Lindblad master equation of a density matrix. `Hamiltonian` is either a matrix or a
+    function of time returning a matrix, which is called only at the times chosen by the solver. Used by
+    :func:`evolveODE` and :func:`_odeStep`, and the returned solver is advanced by :func:`_odeStep`.
+    """
+
+    hamiltonian = Hamiltonian if callable(Hamiltonian) else (lambda time: Hamiltonian)
+    initialState = np.asarray(initialState) if isinstance(initialState, np.ndarray) else initialState.toarray()
+    if isinstance(collapseOperators, list):
+        if initialState.shape[0] != initialState.shape[1]:
+            initialState = densityMatrix(initialState)
+        dimension = initialState.shape[0]
+        rates = [1 for _ in collapseOperators] if decayRates is None else decayRates
+        collapses = [(rate, op, hc(op), hc(op) @ op) for rate, op in zip(rates, collapseOperators)]
+
+        def derivative(time, vec):
+            rho = vec.reshape(dimension, dimension)
+            ham = hamiltonian(time)
+            drho = -1j * ((ham @ rho) - (rho @ ham))
+            for rate, op, opDag, number in collapses:
+                drho = drho + rate * ((op @ rho @ opDag) - 0.5 * ((number @ rho) + (rho @ number)))
+            return np.asarray(drho).ravel()
+    else:
+        def derivative(time, vec):
+            return np.asarray(-1j * (hamiltonian(time) @ vec)).ravel()
+
+    return getattr(integ, method)(derivative, initialTime, initialState.astype(complex).ravel(), np.inf,
+                                  rtol=rtol, atol=atol)
+
+def _odeStep(solver, time: float, shape: Tuple, sparse: bool = False) -> Matrix:
+    r"""
+    Advances the `solver` (created by :func:`_odeSolver`) until it passes the given `time`, and returns the state at the
+    given `time` (using the dense output of the last step) in the given `shape` as sparse (if `sparse=True`) or array.
+    """
+
+    while solver.t < time:
+        solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError(f'ODE solver failed at time {solver.t}')
+    state = solver.y if solver.t == time else solver.dense_output()(time)
+    state = state.reshape(shape)
+    return sp.csc_matrix(state) if sparse else state
+
+def evolveODE(Hamiltonian: Union[Callable, Matrix], initialState: Matrix, timeList: List[float], # pylint: disable=too-many-arguments
+              collapseOperators: Optional[List] = None, decayRates: Optional[List] = None,
+              method: str = 'DOP853', rtol: float = 1e-8, atol: float = 1e-10) -> List[Matrix]:
+    r"""
+    Integrates the Schrödinger equation (or the Lindblad master equation, if there are `collapseOperators`) with an
+    adaptive step-size Runge-Kutta solver (DOP853 by default, see :mod:`scipy.integrate`), and returns the states only
+    at the given time points. Unlike the (piecewise-constant) exponentiation, a time-dependent `Hamiltonian` (given as a
+    function of time) is evaluated at the times chosen by the solver, and the number of steps is determined by the
+    tolerances instead of the time points.
+
+    Keeps sparse/array as sparse/array (of the `initialState`).
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix or Callable
+        Hamiltonian of the system or a function returning the Hamiltonian for a given time
+    initialState : Matrix
+        ket state or density matrix (a ket is converted into a density matrix, if there are `collapseOperators`)
+    timeList : List[float]
+        time points (in increasing order) at which the states are returned, first one is the initial time
+    collapseOperators : list (of Matrix)
+        `list` of collapse operator for Lindblad dissipator terms
+    decayRates : list (of float)
+        `list` of decay rates (if not given assumed to be 1)
+    method : str
+        name of the (explicit) scipy ODE solver, e.g. 'DOP853', 'RK45', 'RK23' (default='DOP853')
+    rtol : float
+        relative tolerance of the solver (default=1e-8)
+    atol : float
+        absolute tolerance of the solver (default=1e-10)
+
+    Returns
+    -------
+    List[Matrix]
+        states at the given time points
+    """
+
+    solver = _odeSolver(Hamiltonian, initialState, timeList[0], collapseOperators, decayRates, method, rtol, atol)
+    dimension = initialState.shape[0]
+    shape = (dimension, dimension) if isinstance(collapseOperators, list) else initialState.shape
+    return [_odeStep(solver, time, shape, sp.issparse(initialState)) for time in timeList]
+
+#: relative (to the step) positions of the Gauss-Legendre quadrature nodes used by the Magnus and commutator-free
+#: exponential integrators of :func:`MagnusExp`
+_magnusNodes = {'magnus2': (0.5,), 'magnus4': (0.5 - np.sqrt(3)/6, 0.5 + np.sqrt(3)/6),
+                'cf4': (0.5 - np.sqrt(3)/6, 0.5 + np.sqrt(3)/6)}
+
+def magnusNodes(method: str = 'magnus4') -> Tuple[float, ...]:
+    r"""
+    Returns the relative (in [0, 1]) positions of the quadrature nodes within a time step, at which the Hamiltonians are
+    required by :func:`MagnusExp` for the given `method`.
+
+    Parameters
+    ----------
+    method : str
+        one of 'magnus2', 'magnus4', or 'cf4' (default='magnus4')
+
+    Returns
+    -------
+    Tuple[float, ...]
+        relative positions of the nodes
+
+    Examples
+    --------
+    >>> magnusNodes('magnus2')
+    (0.5,)
+    """
+
+    return _magnusNodes[method]
+
+def MagnusExp(Hamiltonians: List[Matrix], timeStep: float = 1.0, collapseOperators: Optional[List] = None, # pylint: disable=too-many-locals
+              decayRates: Optional[List] = None, method: str = 'magnus4') -> Matrix:
+    r"""
+    Creates the time evolution operator (unitary, or the exponentiated Liouvillian if there are `collapseOperators`) of
+    a time step for a time-dependent Hamiltonian :math:`\hat{H}(t)` by a Magnus or commutator-free exponential
+    integrator, using the Hamiltonians :math:`\hat{H}_{k} = \hat{H}(t + c_{k}t_{step})` at the quadrature nodes
+    :math:`c_{k}` (given by :func:`magnusNodes`) within the step. Methods are the 2nd order Magnus (midpoint) 'magnus2'
+    :math:`e^{t_{step}A_{1}}`, 4th order Magnus 'magnus4'
+    :math:`e^{t_{step}(A_{1}+A_{2})/2 + \sqrt{3}t_{step}^{2}[A_{2}, A_{1}]/12}`, and 4th order commutator-free 'cf4'
+    :math:`e^{t_{step}(\alpha_{2}A_{1} + \alpha_{1}A_{2})}e^{t_{step}(\alpha_{1}A_{1} + \alpha_{2}A_{2})}` with
+    :math:`\alpha_{1,2} = 1/4 \pm \sqrt{3}/6`, where :math:`A_{k}` is :math:`-i\hat{H}_{k}` or the Liouvillian.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    Hamiltonians : List[Matrix]
+        Hamiltonians at the quadrature nodes of the step
+    timeStep : float
+        time step (default=1.0)
+    collapseOperators : list (of Matrix)
+        `list` of collapse operator for Lindblad dissipator terms
+    decayRates : list (of float)
+        `list` of decay rates (if not given assumed to be 1)
+    method : str
+        one of 'magnus2', 'magnus4', or 'cf4' (default='magnus4')
+
+    Returns
+    -------
+    Matrix
+        time evolution operator of the step
+    """
+
+    if len(Hamiltonians) != len(_magnusNodes[method]):
+        raise ValueError(f'{method} requires the Hamiltonians at {len(_magnusNodes[method])} nodes')
+    expm = slinA.expm if sp.issparse(Hamiltonians[0]) else linA.expm
+    if isinstance(collapseOperators, list):
+        generators = [Liouvillian(ham, collapseOperators, decayRates) for ham in Hamiltonians]
+    else:
+        generators = [-1j * ham for ham in Hamiltonians]
+
+    if method == 'magnus2':
+        propagator = expm(timeStep * generators[0])
+    elif method == 'magnus4':
+        genA, genB = generators
+        commutator = (genB @ genA) - (genA @ genB)
+        propagator = expm((0.5 * timeStep * (genA + genB)) + ((np.sqrt(3)/12) * (timeStep**2) * commutator))
+    else:
+        alpha1, alpha2 = 0.25 + np.sqrt(3)/6, 0.25 - np.sqrt(3)/6
+        genA, genB = generators
+        propagator = expm(timeStep * ((alpha2 * genA) + (alpha1 * genB)))
+        propagator = propagator @ expm(timeStep * ((alpha1 * genA) + (alpha2 * genB)))
+    return propagator
+
+def _isDiagonal(matrix: Matrix) -> bool:
+    r"""
+    Returns True if the given (sparse or array) matrix is diagonal.
+    """
+
+    matrix = sp.coo_matrix(matrix)
+    return bool(np.all(matrix.row[matrix.data != 0] == matrix.col[matrix.data != 0]))
+
+def _isHermitian(matrix: Matrix) -> bool:
+    r"""
+    Returns True if the given (sparse or array) matrix is Hermitian.
+    """
+
+    difference = matrix - hc(matrix)
+    return abs(difference).max() < 1e-12 * max(abs(matrix).max(), 1)
+
+def splitHamiltonian(Hamiltonians: List[Matrix]) -> Tuple[np.ndarray, List[Matrix]]:
+    r"""
+    Partitions the Hamiltonian terms into a diagonal group, which is returned as the (1d array of the) diagonal of their
+    sum, and Hermitian non-diagonal groups. A Hermitian non-diagonal term is a group by itself, and the non-Hermitian
+    terms are grouped with their Hermitian conjugates (e.g. the two terms of a Jaynes-Cummings coupling), and the
+    remaining non-Hermitian terms (if any) are summed into a single group. These are used by :func:`TrotterAction`.
+
+    Parameters
+    ----------
+    Hamiltonians : List[Matrix]
+        Hamiltonian terms (all in the same space) that sum up to the total Hamiltonian
+
+    Returns
+    -------
+    Tuple[np.ndarray, List[Matrix]]
+        diagonal of the diagonal group and the list of non-diagonal groups
+
+    Examples
+    --------
+    >>> diagonal, groups = splitHamiltonian([sigmaz(), sigmax()])
+    >>> diagonal
+    array([ 1.+0.j, -1.+0.j])
+    >>> len(groups)
+    1
+    """
+
+    diagonal = np.zeros(Hamiltonians[0].shape[0], dtype=complex)
+    groups: List[Matrix] = []
+    unpaired: List[Matrix] = []
+    for ham in Hamiltonians:
+        if _isDiagonal(ham):
+            diagonal += ham.diagonal()
+        elif _isHermitian(ham):
+            groups.append(ham)
+        else:
+            for ind, other in enumerate(unpaired):
+                if _isHermitian(ham + other):
+                    groups.append(ham + unpaired.pop(ind))
+                    break
+            else:
+                unpaired.append(ham)
+    if len(unpaired) > 0:
+        groups.append(sum(unpaired))
+    return diagonal, groups
+
+def _trotterSequence(numberOfOperators: int, order: int = 2, substeps: int = 1) -> List[Tuple[int, float]]:
+    r"""
+    Returns the sequence of (operator index, time step coefficient) pairs (in the order of application to a state) of
+    the 1st (Lie), 2nd (Strang), or 4th (Suzuki) order Trotter product formula with the given number of substeps, where
+    the consecutive exponentials of the same operator are merged.
+    """
+
+    def strang(coef):
+        return [(ind, coef/2) for ind in range(numberOfOperators - 1)] + [(numberOfOperators - 1, coef)] + \
+               [(ind, coef/2) for ind in reversed(range(numberOfOperators - 1))]
+
+    if order == 1:
+        step = [(ind, 1.0) for ind in range(numberOfOperators)]
+    elif order == 2:
+        step = strang(1.0)
+    elif order == 4:
+        p = 1/(4 - 4**(1/3))
+        step = strang(p) + strang(p) + strang(1 - 4*p) + strang(p) + strang(p)
+    else:
+        raise ValueError(f'Trotter order has to be 1, 2, or 4, not {order}')
+
+    sequence: List[Tuple[int, float]] = []
+    for ind, coef in step * substeps:
+        if (len(sequence) > 0) and (sequence[-1][0] == ind):
+            sequence[-1] = (ind, sequence[-1][1] + coef)
+        else:
+            sequence.append((ind, coef))
+    return [(ind, coef/substeps) for ind, coef in sequence]
+
+def trotterParameters(diagonal: np.ndarray, groups: List[Matrix], timeStep: float = 1.0, #pylint:disable=too-many-locals
+                      tolerance: float = 1e-8) -> Tuple[int, int]:
+    r"""
+    Estimates the Trotter error of a time step from the norms of the (nested) commutators of the groups (given by
+    :func:`splitHamiltonian`), and returns the order (1, 2, or 4) and the number of substeps that reach the given
+    `tolerance` with the least number of exponentials. The error of a (sub)step :math:`\delta t` is estimated as
+    :math:`C_{1}\delta t^{2}/2`, :math:`C_{2}\delta t^{3}`, and :math:`C_{2}(C_{2}/C_{1})^{2}\delta t^{5}` for the 1st,
+    2nd, and 4th orders, where :math:`C_{1} = \sum_{i<j}||[A_{i}, A_{j}]||` and
+    :math:`C_{2} = \sum_{i<j}(||[A_{j}, [A_{j}, A_{i}]]||/12 + ||[A_{i}, [A_{i}, A_{j}]]||/24)` (in the induced
+    infinity-norm), which are (rather conservative) estimates of the leading error terms.
+
+    Parameters
+    ----------
+    diagonal : np.ndarray
+        diagonal of the diagonal group
+    groups : List[Matrix]
+        non-diagonal groups
+    timeStep : float
+        time step (default=1.0)
+    tolerance : float
+        tolerance for the (estimated) error of the time step (default=1e-8)
+
+    Returns
+    -------
+    Tuple[int, int]
+        order and the number of substeps
+    """
+
+    operators = [sp.diags(diagonal, format='csc')] + [sp.csc_matrix(group) for group in groups]
+
+    def normOf(matrix):
+        return abs(matrix).sum(axis=1).max()
+
+    def commutator(opA, opB):
+        return (opA @ opB) - (opB @ opA)
+
+    firstOrder, secondOrder = 0, 0
+    for ind, opA in enumerate(operators):
+        for opB in operators[ind+1:]:
+            com = commutator(opA, opB)
+            firstOrder += normOf(com)
+            secondOrder += (normOf(commutator(opB, com))/12) + (normOf(commutator(opA, com))/24)
+    if firstOrder == 0:
+        return 1, 1
+
+    timeStep = abs(timeStep)
+    errors = {1: firstOrder*(timeStep**2)/2, 2: secondOrder*(timeStep**3),
+              4: secondOrder*((secondOrder/firstOrder)**2)*(timeStep**5)}
+    best = (np.inf, 2, 1)
+    for order, error in errors.items():
+        substeps = max(1, int(np.ceil((error/tolerance)**(1/order))))
+        cost = len(_trotterSequence(len(operators), order)) * substeps
+        if cost < best[0]:
+            best = (cost, order, substeps)
+    return best[1], best[2]
+
+def TrotterAction(diagonal: np.ndarray, groups: List[Matrix], state: Matrix, timeStep: float = 1.0, # pylint: disable=too-many-arguments
+                  order: int = 2, substeps: int = 1) -> Matrix:
+    r"""
+    Computes the action of the unitary of a time step on a `state` by a (1st, 2nd, or 4th order) Trotter-Suzuki product
+    formula of the diagonal and non-diagonal groups of a Hamiltonian (given by :func:`splitHamiltonian`), without
+    creating the unitary. The diagonal group is exponentiated elementwise and the actions of the exponentials of the
+    (sparse) non-diagonal groups are computed by :func:`scipy.sparse.linalg.expm_multiply`, so the cost scales with the
+    number of non-zero elements rather than with a dense exponentiation. See :func:`trotterParameters` for the order and
+    substeps.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    diagonal : np.ndarray
+        diagonal of the diagonal group
+    groups : List[Matrix]
+        non-diagonal groups
+    state : Matrix
+        ket state
+    timeStep : float
+        time step (default=1.0)
+    order : int
+        order of the product formula, 1, 2, or 4 (default=2)
+    substeps : int
+        number of substeps (default=1)
+
+    Returns
+    -------
+    Matrix
+        the evolved state
+    """
+
+    sparse = sp.issparse(state)
+    evolved = np.asarray(state) if isinstance(state, np.ndarray) else state.toarray()
+    for ind, coef in _trotterSequence(len(groups) + 1, order, substeps):
+        if ind == 0:
+            evolved = np.exp(-1j * coef * timeStep * diagonal).reshape(-1, 1) * evolved
+        else:
+            evolved = slinA.expm_multiply(-1j * coef * timeStep * groups[ind-1], evolved)
+    return sp.csc_matrix(evolved) if sparse else evolved
+
+def evolveBatch(Hamiltonians: np.ndarray, initialStates: np.ndarray, timeSteps: np.ndarray,
+                stepCount: int) -> np.ndarray:
+    r"""
+    Evolves a batch of ket states with a batch of (time-independent and Hermitian) Hamiltonians of the same dimension,
+    e.g. all the points of a parameter sweep, by a single batched (numpy) eigen-decomposition of the stacked
+    Hamiltonians and batched matrix-vector products, without any matrix exponentiation. Returns the states at the
+    `stepCount` steps (and the initial state) of each item in the batch.
+
+    Parameters
+    ----------
+    Hamiltonians : np.ndarray
+        stack of Hamiltonians with shape (batch size, dimension, dimension)
+    initialStates : np.ndarray
+        stack of ket states with shape (batch size, dimension)
+    timeSteps : np.ndarray
+        time step of each item in the batch with shape (batch size,)
+    stepCount : int
+        number of steps
+
+    Returns
+    -------
+    np.ndarray
+        states with shape (batch size, stepCount + 1, dimension)
+
+    Examples
+    --------
+    >>> hams = np.stack([0.5*sigmaz().A, 0.5*sigmax().A])
+    >>> states = evolveBatch(hams, np.array([[1, 0], [1, 0]]), np.array([np.pi, np.pi]), 1)
+    >>> np.round(states[:, -1], 8)
+    array([[0.-1.j, 0.+0.j],
+           [0.+0.j, 0.-1.j]])
+    """
+
+    eigenValues, eigenVectors = np.linalg.eigh(Hamiltonians)
+    phases = np.exp(-1j * eigenValues * np.asarray(timeSteps).reshape(-1, 1))
+    coefficients = np.einsum('nji,nj->ni', eigenVectors.conj(), initialStates)
+    states = np.empty((Hamiltonians.shape[0], stepCount + 1, Hamiltonians.shape[1]), dtype=complex)
+    states[:, 0] = initialStates
+    for step in range(1, stepCount + 1):
+        coefficients = phases * coefficients
+        states[:, step] = np.einsum('nij,nj->ni', eigenVectors, coefficients)
+    return states
+
+def FloquetEigens(unitary: Matrix) -> Tuple[np.ndarray, np.ndarray]:
+    r"""
+    Returns the eigenvalues (Floquet multipliers) :math:`e^{-i\epsilon_{k}T}` and the (orthonormal) eigenvectors
+    (Floquet modes) of a one-period `unitary` :math:`U(T)`. These are obtained by a complex Schur decomposition, which
+    is (numerically) diagonal for a unitary matrix and, unlike a general eigen-decomposition, gives orthonormal
+    eigenvectors also for degenerate eigenvalues. The eigenvalues are normalised to unit modulus, so that their powers
+    do not drift in long (stroboscopic) evolutions.
+
+    Parameters
+    ----------
+    unitary : Matrix
+        one-period unitary
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        eigenvalues and the eigenvectors (as columns)
+
+    Examples
+    --------
+    >>> eigenValues, eigenVectors = FloquetEigens(Unitary(sigmax(), np.pi/4))
+    >>> np.round(np.sort(np.angle(eigenValues)), 8)
+    array([-0.78539816,  0.78539816])
+    """
+
+    schurForm, eigenVectors = linA.schur(np.asarray(unitary) if isinstance(unitary, np.ndarray) else unitary.toarray(),
+                                         output='complex')
+    eigenValues = schurForm.diagonal()
+    return eigenValues/np.abs(eigenValues), eigenVectors
+
+def quasiEnergies(unitary: Matrix, period: float = 1.0) -> np.ndarray:
+    r"""
+    Returns the (sorted) quasi-energies :math:`\epsilon_{k} \in (-\pi/T, \pi/T]` of a one-period `unitary` :math:`U(T)`
+    (or of its eigenvalues, e.g. from :func:`FloquetEigens`), i.e. :math:`U(T)|\phi_{k}\rangle =
+    e^{-i\epsilon_{k}T}|\phi_{k}\rangle`.
+
+    Parameters
+    ----------
+    unitary : Matrix
+        one-period unitary or a 1D array of its eigenvalues
+    period : float
+        period T (default=1.0)
+
+    Returns
+    -------
+    np.ndarray
+        sorted quasi-energies
+
+    Examples
+    --------
+    >>> np.round(quasiEnergies(Unitary(sigmaz(), 0.5), 0.5), 8)
+    array([-1.,  1.])
+    """
+
+    eigenValues = unitary if (isinstance(unitary, np.ndarray) and unitary.ndim == 1) else FloquetEigens(unitary)[0]
+    return np.sort(-np.angle(eigenValues)/period)
+
+def FloquetEvolve(eigenValues: np.ndarray, eigenVectors: np.ndarray, state: Matrix, stepCount: int,
+                  observables: Optional[List[Matrix]] = None) -> np.ndarray:
+    r"""
+    Returns the stroboscopic (ket) states :math:`U(T)^{k}|\psi\rangle` for :math:`k = 0, ..., stepCount` (or the
+    expectation values of the `observables` in these states) by using the eigenvalues and eigenvectors of the
+    one-period unitary (see :func:`FloquetEigens`). All the steps are obtained together by a single (vectorised)
+    accumulation of the phases :math:`\lambda_{j}^{k}` of the Floquet modes and a single matrix product, instead of
+    `stepCount` matrix-vector products. The expectation values are calculated in the Floquet basis, without creating the
+    states.
+
+    Parameters
+    ----------
+    eigenValues : np.ndarray
+        eigenvalues of the one-period unitary
+    eigenVectors : np.ndarray
+        eigenvectors (as columns) of the one-period unitary
+    state : Matrix
+        initial ket state
+    stepCount : int
+        number of periods
+    observables : List[Matrix] or None
+        `list` of operators whose expectation values are returned (instead of the states)
+
+    Returns
+    -------
+    np.ndarray
+        states with shape (stepCount + 1, dimension), or expectation values with shape (len(observables), stepCount + 1)
+
+    Examples
+    --------
+    >>> eigenValues, eigenVectors = FloquetEigens(Unitary(sigmax(), np.pi/4))
+    >>> np.round(FloquetEvolve(eigenValues, eigenVectors, basis(2, 0), 2, [sigmaz()]).real, 8)
+    array([[ 1.,  0., -1.]])
+    """
+
+    state = (np.asarray(state) if isinstance(state, np.ndarray) else state.toarray()).reshape(-1)
+    # coefficients of the Floquet modes at every step (as columns)
+    modes = (eigenVectors.conj().T @ state).reshape(-1, 1) * np.power.outer(eigenValues, np.arange(stepCount + 1))
+    if observables is None:
+        return (eigenVectors @ modes).T
+    expectations = np.empty((len(observables), stepCount + 1), dtype=complex)
+    for ind, observable in enumerate(observables):
+        floquetObservable = eigenVectors.conj().T @ (observable @ eigenVectors)
+        expectations[ind] = np.einsum('ik,ik->k', modes.conj(), floquetObservable @ modes)
+    return expectations
+
+def symmetrySectors(generator: Matrix, conserved: Optional[Union[Matrix, np.ndarray]] = None) -> List[np.ndarray]:
+    r"""
+    Returns the symmetry sectors of a `generator` (Hamiltonian or Liouvillian), i.e. the lists of the basis indices that
+    are not coupled by the `generator` to the indices of the other sectors, so that the `generator` is block-diagonal
+    (after a permutation of the basis) with a block for each sector. If a `conserved` operator (such as the total
+    excitation number or the parity) is given, the sectors are its (degenerate) eigen-spaces, which requires the
+    operator to be diagonal in the given basis and the `generator` not to couple different sectors. Otherwise, the
+    sectors are detected automatically as the connected components of the (non-zero) elements of the `generator`,
+    which are the smallest such sectors and cover any conserved quantity that is diagonal in the given basis.
+
+    Parameters
+    ----------
+    generator : Matrix
+        Hamiltonian or Liouvillian
+    conserved : Matrix or np.ndarray or None
+        a (diagonal) conserved operator or its diagonal
+
+    Returns
+    -------
+    List[np.ndarray]
+        `list` of the (sorted) basis indices of each sector
+
+    Raises
+    ------
+    ValueError
+        if the conserved operator is not diagonal or the generator couples its different eigen-spaces
+
+    Examples
+    --------
+    >>> symmetrySectors(JCHam(1, 1, 0.5, 3))
+    [array([0, 4]), array([1, 5]), array([2]), array([3])]
+    """
+
+    generator = sp.csr_matrix(generator)
+    if conserved is None:
+        _, labels = csgraph.connected_components(abs(generator), directed=True, connection='weak')
+    else:
+        if not isinstance(conserved, np.ndarray) or conserved.ndim != 1:
+            if not _isDiagonal(conserved):
+                raise ValueError('conserved operator has to be diagonal in the basis of the generator')
+            conserved = conserved.diagonal()
+        _, labels = np.unique(np.round(conserved, 10), return_inverse=True)
+        rows, cols = generator.nonzero()
+        if np.any(labels[rows] != labels[cols]):
+            raise ValueError('generator couples different sectors of the conserved operator')
+    order = np.argsort(labels, kind='stable')
+    return np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+
+def SectorExp(generator: Matrix, sectors: List[np.ndarray], timeStep: float = 1.0, workers: int = 1) -> Matrix:
+    r"""
+    Computes the exponential :math:`e^{\hat{G}t}` of a (block-diagonal) `generator` :math:`\hat{G}` (such as
+    :math:`-i\hat{H}` or a Liouvillian) by exponentiating the block of each symmetry sector (see
+    :func:`symmetrySectors`) independently, so that the cost is the sum of the cubes of the sector dimensions, instead
+    of the cube of the full dimension. The blocks are exponentiated in parallel threads if `workers` is larger than 1,
+    and the (one-dimensional) sectors are exponentiated together. The result is in the original basis, and it is sparse
+    (block-diagonal) if the `generator` is sparse.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    generator : Matrix
+        generator of the evolution, e.g. :math:`-i\hat{H}`
+    sectors : List[np.ndarray]
+        `list` of the basis indices of each sector
+    timeStep : float
+        time used in the exponentiation (default=1.0)
+    workers : int
+        number of threads used to exponentiate the blocks (default=1)
+
+    Returns
+    -------
+    Matrix
+        exponential of the generator
+
+    Examples
+    --------
+    >>> ham = JCHam(1, 1, 0.5, 3)
+    >>> np.allclose(SectorExp(-1j*ham, symmetrySectors(ham), 0.3).A, Unitary(ham, 0.3).A)
+    True
+    """
+
+    sparse = sp.issparse(generator)
+    generator = sp.csr_matrix(generator)
+    singles = np.concatenate([sector for sector in sectors if len(sector) == 1] + [np.array([], dtype=int)])
+    blocks = [sector for sector in sectors if len(sector) > 1]
+
+    def exponentiate(sector):
+        return linA.expm(timeStep*generator[sector][:, sector].toarray())
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            exponentials = list(executor.map(exponentiate, blocks))
+    else:
+        exponentials = [exponentiate(sector) for sector in blocks]
+
+    rows = [singles] + [np.repeat(sector, len(sector)) for sector in blocks]
+    cols = [singles] + [np.tile(sector, len(sector)) for sector in blocks]
+    data = [np.exp(timeStep*generator.diagonal()[singles])] + [exponential.reshape(-1) for exponential in exponentials]
+    exponential = sp.csc_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                                shape=generator.shape)
+    return exponential if sparse else exponential.toarray()
+
+def sectorRestrict(state: Matrix, sector: np.ndarray) -> Matrix:
+    r"""
+    Restricts a ket state or density matrix to a symmetry sector (see :func:`symmetrySectors`), i.e. returns its
+    elements for the basis indices of the sector, which can be evolved by the block of the sector.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    state : Matrix
+        ket state or density matrix
+    sector : np.ndarray
+        basis indices of the sector
+
+    Returns
+    -------
+    Matrix
+        restricted state
+    """
+
+    if state.shape[0] == state.shape[1]:
+        return state[sector][:, sector]
+    return state[sector]
+
+def sectorEmbed(state: Matrix, sector: np.ndarray, dimension: int) -> Matrix:
+    r"""
+    Embeds a ket state or density matrix of a symmetry sector (see :func:`sectorRestrict`) into the full space of the
+    given `dimension`, i.e. the elements of the other sectors are zero. A state with a single column is treated as a
+    ket.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    state : Matrix
+        ket state or density matrix of the sector
+    sector : np.ndarray
+        basis indices of the sector
+    dimension : int
+        dimension of the full space
+
+    Returns
+    -------
+    Matrix
+        embedded state
+    """
+
+    embedding = sp.csc_matrix((np.ones(len(sector)), (sector, np.arange(len(sector)))), shape=(dimension, len(sector)))
+    embedded = embedding @ state if state.shape[1] == 1 else embedding @ state @ embedding.T
+    return sp.csc_matrix(embedded) if sp.issparse(state) else np.asarray(embedded)
+
+def UnitaryDiagonal(Hamiltonian: Matrix, timeStep: float = 1.0) -> Matrix:
+    r"""
+    Creates the `Unitary` :math:`e^{-i\hat{H}t}` of a diagonal `Hamiltonian` (such as a free harmonic oscillator, or
+    the sum of number, :math:`\hat{\sigma}_{z}`, and :math:`\hat{J}_{z}` terms) in closed form, i.e. by the
+    exponentials of its diagonal elements without any matrix exponentiation.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix
+        diagonal Hamiltonian of the system
+    timeStep : float
+        time used in the exponentiation (default=1.0)
+
+    Returns
+    -------
+    Matrix
+        Unitary time evolution operator
+
+    Examples
+    --------
+    >>> UnitaryDiagonal(number(3), np.pi).A
+    array([[ 1.+0.0000000e+00j,  0.+0.0000000e+00j,  0.+0.0000000e+00j],
+           [ 0.+0.0000000e+00j, -1.-1.2246468e-16j,  0.+0.0000000e+00j],
+           [ 0.+0.0000000e+00j,  0.+0.0000000e+00j,  1.+2.4492936e-16j]])
+    """
+
+    phases = np.exp(-1j * timeStep * Hamiltonian.diagonal())
+    return sp.diags(phases, format='csc') if sp.issparse(Hamiltonian) else np.diag(phases)
+
+def UnitaryRotation(Hamiltonian: Matrix, timeStep: float = 1.0) -> Matrix:
+    r"""
+    Creates the `Unitary` of a `Hamiltonian` whose square is proportional to identity, i.e.
+    :math:`\hat{H}^{2} = \omega^{2}\mathbb{I}` (such as a qubit rotation
+    :math:`\hat{H} = \sum_{k}\omega_{k}\hat{\sigma}_{k}` also as a part of a composite system), in closed form
+    :math:`e^{-i\hat{H}t} = \cos(\omega t)\mathbb{I} - i\frac{\sin(\omega t)}{\omega}\hat{H}`.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix
+        Hamiltonian of the system, whose square is proportional to identity
+    timeStep : float
+        time used in the exponentiation (default=1.0)
+
+    Returns
+    -------
+    Matrix
+        Unitary time evolution operator
+
+    Examples
+    --------
+    >>> np.round(UnitaryRotation(0.5*sigmax(), np.pi).A, 8)
+    array([[0.+0.j, 0.-1.j],
+           [0.-1.j, 0.+0.j]])
+    """
+
+    frequency = np.sqrt(np.real((Hamiltonian @ Hamiltonian).diagonal().mean()))
+    dimension = Hamiltonian.shape[0]
+    identity = sp.identity(dimension, format='csc') if sp.issparse(Hamiltonian) else np.identity(dimension)
+    return np.cos(frequency*timeStep)*identity - 1j*timeStep*np.sinc(frequency*timeStep/np.pi)*Hamiltonian
+
+def UnitaryTwoLevel(Hamiltonian: Matrix, sectors: List[np.ndarray], timeStep: float = 1.0) -> Matrix:
+    r"""
+    Creates the `Unitary` of a (Hermitian) `Hamiltonian` whose symmetry sectors (see :func:`symmetrySectors`) are at
+    most two-dimensional (such as the Jaynes-Cummings Hamiltonian) in closed form, where each :math:`2\times 2` block
+    :math:`\begin{pmatrix} a & b \\ b^{*} & d \end{pmatrix}` is exponentiated as
+    :math:`e^{-i\bar{\omega}t}(\cos(\Omega t)\mathbb{I} - i\frac{\sin(\Omega t)}{\Omega}(\hat{h} - \bar{\omega}))` with
+    :math:`\bar{\omega} = (a+d)/2` and :math:`\Omega = \sqrt{(a-d)^{2}/4 + |b|^{2}}`. All the blocks are computed
+    together (vectorised).
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix
+        Hamiltonian of the system
+    sectors : List[np.ndarray]
+        `list` of the basis indices of each (one or two-dimensional) sector
+    timeStep : float
+        time used in the exponentiation (default=1.0)
+
+    Returns
+    -------
+    Matrix
+        Unitary time evolution operator
+
+    Raises
+    ------
+    ValueError
+        if any of the sectors is larger than two-dimensional
+
+    Examples
+    --------
+    >>> ham = JCHam(1, 1, 0.5, 3)
+    >>> np.allclose(UnitaryTwoLevel(ham, symmetrySectors(ham), 0.3).A, Unitary(ham, 0.3).A)
+    True
+    """
+
+    if any(len(sector) > 2 for sector in sectors):
+        raise ValueError('sectors have to be at most two-dimensional')
+    sparse = sp.issparse(Hamiltonian)
+    Hamiltonian = sp.csr_matrix(Hamiltonian)
+    singles = np.array([sector[0] for sector in sectors if len(sector) == 1], dtype=int)
+    pairs = np.array([sector for sector in sectors if len(sector) == 2], dtype=int).reshape(-1, 2)
+    first, second = pairs[:, 0], pairs[:, 1]
+    diagonal = Hamiltonian.diagonal()
+    mean, detuning = (diagonal[first] + diagonal[second])/2, (diagonal[first] - diagonal[second])/2
+    coupling = np.asarray(Hamiltonian[first, second]).reshape(-1)
+    omega = np.sqrt(np.real(detuning*np.conj(detuning)) + np.abs(coupling)**2)
+    phase, cosine = np.exp(-1j*mean*timeStep), np.cos(omega*timeStep)
+    sine = timeStep*np.sinc(omega*timeStep/np.pi)
+    rows = np.concatenate([singles, first, second, first, second])
+    cols = np.concatenate([singles, first, second, second, first])
+    data = np.concatenate([np.exp(-1j*timeStep*diagonal[singles]), phase*(cosine - 1j*sine*detuning),
+                           phase*(cosine + 1j*sine*detuning), -1j*phase*sine*coupling,
+                           -1j*phase*sine*np.conj(coupling)])
+    unitary = sp.csc_matrix((data, (rows, cols)), shape=Hamiltonian.shape)
+    return unitary if sparse else unitary.toarray()
+
+def quantumJumpStep(Hamiltonian: Matrix, state: Matrix, timeStep: float, # pylint: disable=too-many-arguments,too-many-locals
+                    collapseOperators: List[Matrix], decayRates: Optional[List] = None,
+                    rng: Optional[np.random.Generator] = None, threshold: Optional[float] = None,
+                    timeTolerance: float = 1e-8) -> Tuple[Matrix, float]:
+    r"""
+    Evolves a (normalised) ket `state` for a time step along a single quantum-jump (Monte Carlo wave-function)
+    trajectory of the Lindblad master equation. The state is evolved (by :func:`scipy.sparse.linalg.expm_multiply`) with
+    the effective non-Hermitian Hamiltonian
+    :math:`\hat{H} - \frac{i}{2}\sum_{k}\kappa_{k}\hat{c}_{k}^{\dagger}\hat{c}_{k}`, until its squared norm drops
+    to the (uniformly random) `threshold`, when (at a time found by regula falsi within the `timeTolerance`) a jump
+    :math:`\hat{c}_{k}` is applied with probability proportional to
+    :math:`\kappa_{k}||\hat{c}_{k}|\psi\rangle||^{2}` and a new threshold is drawn. Only kets are used, so the memory
+    scales with the dimension rather than its square. The threshold is rescaled by the squared norm at the end of the
+    step, so that the returned state is normalised and the returned threshold continues the same trajectory.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix
+        Hamiltonian of the system
+    state : Matrix
+        normalised ket state
+    timeStep : float
+        time step
+    collapseOperators : list (of Matrix)
+        `list` of collapse operators
+    decayRates : list (of float)
+        `list` of decay rates (if not given assumed to be 1)
+    rng : np.random.Generator
+        random number generator of the trajectory (default is numpy's default_rng)
+    threshold : float
+        current threshold of the squared norm (a new one is drawn, if None)
+    timeTolerance : float
+        tolerance of the jump times (default=1e-8)
+
+    Returns
+    -------
+    Tuple[Matrix, float]
+        normalised state at the end of the time step and the (rescaled) threshold
+    """
+
+    rng = np.random.default_rng() if rng is None else rng
+    rates = [1 for _ in collapseOperators] if decayRates is None else decayRates
+    effective = Hamiltonian - 0.5j * sum(rate * (hc(op) @ op) for rate, op in zip(rates, collapseOperators))
+    sparse = sp.issparse(state)
+    current = np.asarray(state) if isinstance(state, np.ndarray) else state.toarray()
+    threshold = rng.random() if threshold is None else threshold
+
+    def normOf(ket):
+        return np.real(np.vdot(ket, ket))
+
+    remaining = timeStep
+    while True:
+        evolved = slinA.expm_multiply(-1j * remaining * effective, current)
+        if normOf(evolved) > threshold:
+            normSquare = normOf(evolved)
+            evolved = evolved / np.sqrt(normSquare)
+            return (sp.csc_matrix(evolved) if sparse else evolved), float(threshold / normSquare)
+
+        # jump time is the root of log(norm^2) - log(threshold), which is found by the (Illinois) regula falsi
+        lower, upper = (0.0, np.log(normOf(current)/threshold)), (remaining, np.log(normOf(evolved)/threshold))
+        side = 0
+        while (upper[0] - lower[0]) > timeTolerance:
+            middle = (lower[0]*upper[1] - upper[0]*lower[1]) / (upper[1] - lower[1])
+            middleKet = slinA.expm_multiply(-1j * middle * effective, current)
+            middleValue = np.log(normOf(middleKet)/threshold)
+            if middleValue > 0:
+                lower = (middle, middleValue)
+                upper = (upper[0], upper[1]/2) if side == -1 else upper
+                side = -1
+            else:
+                upper, evolved = (middle, middleValue), middleKet
+                lower = (lower[0], lower[1]/2) if side == 1 else lower
+                side = 1
+            if abs(middleValue) < timeTolerance:
+                break
+        jumped = [op @ evolved for op in collapseOperators]
+        probabilities = np.array([rate * normOf(ket) for rate, ket in zip(rates, jumped)])
+        choice = rng.choice(len(jumped), p=probabilities/probabilities.sum())
+        current = jumped[choice] / np.sqrt(normOf(jumped[choice]))
+        remaining -= upper[0]
+        threshold = rng.random()
+
 def dissipator(operatorA: Matrix, operatorB: Optional[Matrix] = None,
                identity: Optional[Matrix] = None, _double: bool = False) -> Matrix:#pylint:disable=unsubscriptable-object
     r"""
@@ -374,28 +1433,330 @@ def _prepostSO(operatorA: Matrix, operatorB: Optional[Matrix] = None) -> Matrix:
     prepost = sp.kron(operatorB.transpose(), operatorA, format='csc')
     return prepost if sp.issparse(operatorA) else prepost.A
 
-def evolveOpen(initialState, totalTime, timeStep: float = 1.0, Hamiltonian: Optional[Matrix] = None,# pylint: disable=dangerous-default-value,unsubscriptable-object,too-many-arguments # noqa: E501
+def _lindbladTerms(Hamiltonian: Optional[Matrix] = None, collapseOperators: Optional[List] = None, # pylint: disable=too-many-branches
+                   decayRates: Optional[List] = None, _double: bool = False) -> Tuple:
+    # returns the dimension, left and right multipliers (of the Hamiltonian and anti-commutator parts), (rate, A, B)
+    # triplets of the jump terms, and (rate, super-operator) pairs of the collapse super-operators
+    if Hamiltonian is not None:
+        dimension = Hamiltonian.shape[0]
+    elif not collapseOperators:
+        raise ValueError('Lindblad terms require a Hamiltonian or collapseOperators')
+    elif isinstance(collapseOperators[0], tuple):
+        dimension = collapseOperators[0][0].shape[0]
+    else:
+        dimension = collapseOperators[0].shape[0]
+
+    left = sp.csc_matrix((dimension, dimension), dtype=complex)
+    right = sp.csc_matrix((dimension, dimension), dtype=complex)
+    if Hamiltonian is not None:
+        left = left - 1j*Hamiltonian
+        right = right + 1j*Hamiltonian
+    jumps, superOperators = [], []
+    if isinstance(collapseOperators, list) and ((decayRates is None) or (len(decayRates) != 0)):
+        for idx, collapseOperator in enumerate(collapseOperators):
+            rate = 1 if decayRates is None else decayRates[idx]
+            if isinstance(collapseOperator, tuple):
+                operatorA, operatorB = collapseOperator
+            elif collapseOperator.shape[0] == dimension:
+                operatorA, operatorB = collapseOperator, hc(collapseOperator)
+            elif collapseOperator.shape[0] == (dimension**2):
+                superOperators.append((rate, collapseOperator))
+                continue
+            else:
+                raise ValueError("Dimension mismatch")
+            rate = (1+int(_double))*rate
+            number = operatorB @ operatorA
+            left = left - (0.5*rate)*number
+            right = right - (0.5*rate)*number
+            jumps.append((rate, operatorA, operatorB))
+    left = left if sp.issparse(left) else np.asarray(left)
+    right = right if sp.issparse(right) else np.asarray(right)
+    return dimension, left, right, jumps, superOperators
+
+def _lindbladOperator(terms: Tuple) -> slinA.LinearOperator:
+    dimension, left, right, jumps, superOperators = terms
+
+    def _apply(vec, adjoint=False):
+        rho = np.asarray(vec).reshape(dimension, dimension, order='F')
+        if adjoint:
+            out = hc(left) @ rho + rho @ hc(right)
+            for rate, operatorA, operatorB in jumps:
+                out = out + np.conj(rate)*(hc(operatorA) @ rho @ hc(operatorB))
+        else:
+            out = left @ rho + rho @ right
+            for rate, operatorA, operatorB in jumps:
+                out = out + rate*(operatorA @ rho @ operatorB)
+        out = np.asarray(out).reshape(-1, order='F')
+        for rate, superOperator in superOperators:
+            superOperator = hc(superOperator) if adjoint else superOperator
+            out = out + (np.conj(rate) if adjoint else rate)*np.asarray(superOperator @ np.asarray(vec).reshape(-1))
+        return out
+
+    return slinA.LinearOperator((dimension**2, dimension**2), matvec=_apply,
+                                rmatvec=lambda vec: _apply(vec, adjoint=True), dtype=complex)
+
+def _lindbladTrace(terms: Tuple) -> complex:
+    # trace of the super-operator, where the trace of the vectorised map X -> AXB is Tr(A)Tr(B)
+    dimension, left, right, jumps, superOperators = terms
+    trace = dimension*(left.diagonal().sum() + right.diagonal().sum())
+    trace += sum(rate*operatorA.diagonal().sum()*operatorB.diagonal().sum() for rate, operatorA, operatorB in jumps)
+    return trace + sum(rate*superOperator.diagonal().sum() for rate, superOperator in superOperators)
+
+def _lindbladDiagonal(terms: Tuple) -> np.ndarray:
+    # diagonal of the super-operator, where the diagonal element of the vectorised map X -> AXB for X_ij is A_ii*B_jj
+    _, left, right, jumps, superOperators = terms
+    diagonal = left.diagonal()[:, None] + right.diagonal()[None, :]
+    for rate, operatorA, operatorB in jumps:
+        diagonal = diagonal + rate*(operatorA.diagonal()[:, None]*operatorB.diagonal()[None, :])
+    diagonal = diagonal.reshape(-1, order='F')
+    for rate, superOperator in superOperators:
+        diagonal = diagonal + rate*superOperator.diagonal()
+    return diagonal
+
+def LiouvillianOperator(Hamiltonian: Optional[Matrix] = None, collapseOperators: Optional[List] = None,
+                        decayRates: Optional[List] = None, _double: bool = False) -> slinA.LinearOperator:
+    r"""
+    Creates a matrix-free :class:`LinearOperator <scipy.sparse.linalg.LinearOperator>` for the `Liouvillian`
+    super-operator (see :func:`Liouvillian`), which acts on a vectorised density matrix
+    (see :func:`mat2Vec <quanguru.QuantumToolbox.states.mat2Vec>`) by computing
+    :math:`-i[\hat{H}, \rho] + \sum_{i}\kappa_{i}(\hat{c}_{i}\rho\hat{c}_{i}^{\dagger} -
+    \frac{1}{2}\{\hat{c}_{i}^{\dagger}\hat{c}_{i}, \rho\})` directly on the :math:`d\times d` density matrix. The
+    :math:`d^{2}\times d^{2}` Kronecker products are never created, so the memory scales as :math:`O(d^{2})` and each
+    application costs :math:`O(nnz\cdot d)` (or :math:`O(d^{3})` for arrays) instead of :math:`O(d^{4})`. The
+    adjoint is also implemented, so that it can be used in the Krylov methods (such as
+    :func:`scipy.sparse.linalg.expm_multiply`, or the `matrixFree` options of :func:`LiouvillianExpAction`,
+    :func:`iterativeSteadyState`, and :func:`evolveOpen`).
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix or None
+        Hamiltonian of the system
+    collapseOperators : list (of Matrix)
+        `list` of collapse operator for Lindblad dissipator terms
+    decayRates : list (of float)
+        `list` of decay rates (if not given assumed to be 1)
+
+    Returns
+    -------
+    LinearOperator
+        Liouvillian super-operator as a LinearOperator
+
+    Examples
+    --------
+    >>> LiouvillianOperator(2*np.pi*sigmaz(), [sigmam()], [1]) @ mat2Vec(densityMatrix(basis(2, 0))).A
+    array([[-1.+0.j],
+           [ 0.+0.j],
+           [ 0.+0.j],
+           [ 1.+0.j]])
+    """
+
+    return _lindbladOperator(_lindbladTerms(Hamiltonian, collapseOperators, decayRates, _double))
+
+def _kroneckerFactors(factors: List[Tuple]) -> List[Tuple]:
+    # factors acting on the same sub-system (i.e. the same dimensions before and after) are multiplied (in the given
+    # order) into a single dense local operator, so that the remaining factors commute
+    merged: Dict[Tuple[int, int], np.ndarray] = {}
+    for operator, dimsBefore, dimsAfter in factors:
+        operator = operator.toarray() if sp.issparse(operator) else np.asarray(operator)
+        key = (dimsBefore, dimsAfter)
+        merged[key] = (merged[key] @ operator) if key in merged else operator
+    return [(operator, dimsBefore, dimsAfter) for (dimsBefore, dimsAfter), operator in merged.items()]
+
+def _kroneckerTrace(terms: List[Tuple], dimension: int) -> complex:
+    # trace of a sum of Kronecker products, where the identities contribute the dimensions not covered by the factors
+    trace = 0
+    for coefficient, factors in terms:
+        factors = _kroneckerFactors(factors)
+        localDimension = np.prod([operator.shape[0] for operator, _, _ in factors])
+        trace += coefficient*np.prod([operator.trace() for operator, _, _ in factors])*(dimension/localDimension)
+    return trace
+
+def KroneckerHamiltonian(terms: List[Tuple], dimension: int) -> slinA.LinearOperator:
+    r"""
+    Creates a matrix-free :class:`LinearOperator <scipy.sparse.linalg.LinearOperator>` for a (composite) Hamiltonian
+    :math:`\sum_{k}c_{k}\prod_{j}\mathbb{I}_{before}\otimes\hat{O}_{kj}\otimes\mathbb{I}_{after}` that stores only the
+    local operators of its terms together with their positions (i.e. the total dimensions of the systems before and
+    after). It acts on a (composite) ket, or on the columns of a matrix, by reshaping it to the sub-system dimensions
+    and contracting only the local operators on the relevant axes (see
+    :func:`applyLocal <quanguru.QuantumToolbox.linearAlgebra.applyLocal>`), so the full-dimensional (composite)
+    operators are never created. The adjoint is also implemented, so that it can be used in the Krylov methods (such
+    as :func:`UnitaryAction` with its `HamiltonianTrace`, see :func:`_kroneckerTrace`) and the iterative eigensolvers
+    (such as :func:`scipy.sparse.linalg.eigsh`).
+
+    Parameters
+    ----------
+    terms : List[Tuple]
+        `list` of (coefficient, factors) tuples of the terms, where the factors are a `list` of (local operator,
+        dimsBefore, dimsAfter) tuples, whose product (in the given order) is the term
+    dimension : int
+        total dimension of the (composite) system
+
+    Returns
+    -------
+    LinearOperator
+        Hamiltonian as a LinearOperator
+
+    Examples
+    --------
+    >>> ham = KroneckerHamiltonian([(0.5, [(sigmaz(), 1, 2)]), (0.2, [(sigmax(), 1, 2), (sigmax(), 2, 1)])], 4)
+    >>> np.allclose(ham @ np.identity(4), (0.5*compositeOp(sigmaz(), dimA=2) +
+    >>>                                    0.2*sp.kron(sigmax(), sigmax())).A)
+    True
+    """
+
+    terms = [(coefficient, _kroneckerFactors(factors)) for coefficient, factors in terms]
+
+    def _apply(vec, adjoint=False):
+        vec = np.asarray(vec).reshape(dimension, -1)
+        out = np.zeros(vec.shape, dtype=complex)
+        for coefficient, factors in terms:
+            part = vec
+            for operator, dimsBefore, dimsAfter in factors:
+                operator = operator.conj().T if adjoint else operator
+                part = (operator @ part.reshape(dimsBefore, operator.shape[0], -1)).reshape(vec.shape)
+            out += (np.conj(coefficient) if adjoint else coefficient)*part
+        return out
+
+    return slinA.LinearOperator((dimension, dimension), matvec=_apply, matmat=_apply,
+                                rmatvec=lambda vec: _apply(vec, adjoint=True),
+                                rmatmat=lambda vec: _apply(vec, adjoint=True), dtype=complex)
+
+def evolveOpen(initialState, totalTime, timeStep: float = 1.0, Hamiltonian: Optional[Matrix] = None, # pylint: disable=dangerous-default-value,unsubscriptable-object,too-many-arguments,too-many-locals # noqa: E501
                collapseOperators: Optional[List] = None, decayRates: Optional[List] = None,
-               calcFunc: Optional[Callable] = None, delStates: Optional[bool] = False, _double: bool = False) -> Matrix: # pylint: disable=dangerous-default-value
-    # TODO : write docstrings
-    LiouExp = LiouvillianExp(Hamiltonian, timeStep=timeStep, collapseOperators=collapseOperators, decayRates=decayRates,
-                             _double = _double)
+               calcFunc: Optional[Callable] = None, delStates: Optional[bool] = False, _double: bool = False,
+               matrixFree: bool = False, method: str = 'exp',
+               observables: Optional[List[Matrix]] = None) -> Union[List[Matrix], np.ndarray]: # pylint: disable=dangerous-default-value
+    r"""
+    Evolves an `initialState` (ket or density matrix) under the Lindblad master equation (see :func:`Liouvillian`) for
+    the time grid :math:`t_{n} = n\cdot\Delta t` (:math:`n = 0, 1, ..., \lfloor T/\Delta t \rfloor`), and returns the
+    density matrices on the grid, or (if `observables` are given) only the expectation values of the `observables`.
+
+    The ``'exp'`` method creates the exponentiated Liouvillian (see :func:`LiouvillianExp`, or its matrix-free action
+    if `matrixFree` is True) and applies it at each time step. The ``'action'`` method computes the whole grid
+    together by :func:`scipy.sparse.linalg.expm_multiply` (with `start`, `stop`, and `num`), which requires only a few
+    (sparse or matrix-free) products of the Liouvillian, and the ``'eigen'`` method diagonalises the Liouvillian once
+    and evaluates :math:`\rho(t_{n}) = \sum_{k}c_{k}e^{\lambda_{k}t_{n}}|v_{k}\rangle\rangle` on the grid, which is
+    used only if the Liouvillian is diagonalisable (the ``'action'`` method is used, if the condition number of the
+    eigenvectors is larger than 1e8). With the ``'eigen'`` method and the `observables`, the states are never created.
+
+    Parameters
+    ----------
+    initialState : Matrix
+        initial ket state or density matrix
+    totalTime : float
+        total time of the evolution
+    timeStep : float
+        time step of the grid (default=1)
+    Hamiltonian : Matrix or None
+        Hamiltonian of the system
+    collapseOperators : list (of Matrix)
+        `list` of collapse operator for Lindblad dissipator terms
+    decayRates : list (of float)
+        `list` of decay rates (if not given assumed to be 1)
+    calcFunc : Callable or None
+        a function called with each density matrix on the grid
+    delStates : bool
+        if True, only the initial density matrix is stored (default=False)
+    matrixFree : bool
+        if True, the Liouvillian is used as a matrix-free operator (see :func:`LiouvillianOperator`) in the 'exp' and
+        'action' methods (default=False)
+    method : str
+        one of 'exp' (default), 'action', or 'eigen'
+    observables : list (of Matrix) or None
+        if given, the expectation values of these operators on the grid are returned instead of the states (and the
+        states are not stored)
+
+    Returns
+    -------
+    List[Matrix] or np.ndarray
+        `list` of the density matrices on the grid, or an array of the expectation values (with a row for each
+        observable), if the `observables` are given
+
+    Raises
+    ------
+    ValueError
+        if the method is not supported
+    """
+
+    if method not in ('exp', 'action', 'eigen'):
+        raise ValueError(f'{method} is not a supported evolveOpen method')
     rhoL = initialState
     if initialState.shape[0] != initialState.shape[1]:
         rhoL = densityMatrix(initialState)
-    resultList = [rhoL]
-    if calcFunc is not None:
-        calcFunc(rhoL)
-    rhoL = mat2Vec(rhoL)
-    for _ in range(int(totalTime/timeStep)):
-        rhoL = LiouExp @ rhoL
-        denMat = vec2Mat(rhoL)
-        if calcFunc is not None:
-            calcFunc(denMat)
+    sparse = sp.issparse(rhoL)
+    steps = int(totalTime/timeStep)
+    states = None
+    if method == 'eigen':
+        liouvillian = Liouvillian(Hamiltonian, collapseOperators, decayRates, _double=_double)
+        liouvillian = np.asarray(liouvillian) if isinstance(liouvillian, np.ndarray) else liouvillian.toarray()
+        eigVals, eigVecs = linA.eig(liouvillian)
+        if np.linalg.cond(eigVecs) > 1e8:
+            method = 'action'
+        else:
+            weights = linA.solve(eigVecs, np.asarray(mat2Vec(rhoL.toarray() if sparse else rhoL)).reshape(-1))
+            exponentials = np.exp(np.outer(eigVals, timeStep*np.arange(steps + 1)))*weights[:, None]
+            if (observables is None) or (calcFunc is not None):
+                states = (eigVecs @ exponentials).T
+    if method == 'action':
+        if matrixFree:
+            terms = _lindbladTerms(Hamiltonian, collapseOperators, decayRates, _double)
+            generator, traceA = _lindbladOperator(terms), _lindbladTrace(terms)
+        else:
+            generator = Liouvillian(Hamiltonian, collapseOperators, decayRates, _double=_double)
+            traceA = generator.diagonal().sum()
+        states = slinA.expm_multiply(generator, np.asarray(mat2Vec(rhoL.toarray() if sparse else rhoL)).reshape(-1),
+                                     start=0, stop=steps*timeStep, num=steps + 1, endpoint=True, **_expmTrace(traceA))
+    elif method == 'exp':
+        states = _evolveOpenSteps(rhoL, steps, timeStep, Hamiltonian, collapseOperators, decayRates, _double,
+                                  matrixFree)
+
+    def dense(matrix):
+        return matrix.toarray() if sp.issparse(matrix) else np.asarray(matrix)
+
+    rows = None if observables is None else np.stack([dense(obs).reshape(-1) for obs in observables])
+    if states is None:
+        values = (rows @ eigVecs) @ exponentials
+    else:
+        resultList, values = [rhoL], []
+        for ind, state in enumerate(states):
+            denMat = state if method == 'exp' else state.reshape(rhoL.shape, order='F')
+            if ind == 0:
+                denMat = rhoL
+            elif sparse and not sp.issparse(denMat):
+                denMat = sp.csc_matrix(denMat)
+            if calcFunc is not None:
+                calcFunc(denMat)
+            if (observables is None) and (not delStates) and (ind > 0):
+                resultList.append(denMat)
+            if rows is not None:
+                values.append(rows @ dense(denMat).reshape(-1, order='F'))
+        if observables is None:
+            return resultList
+        values = np.stack(values, axis=1)
+    return np.real(values) if np.allclose(values.imag, 0, atol=1e-12) else values
+
+def _evolveOpenSteps(rhoL, steps, timeStep, Hamiltonian, collapseOperators, decayRates, # pylint: disable=too-many-arguments
+                     _double, matrixFree):
+    # yields the density matrices of the 'exp' method of evolveOpen (starting from the initial one)
+    if matrixFree:
+        terms = _lindbladTerms(Hamiltonian, collapseOperators, decayRates, _double)
+        generator, traceA = timeStep*_lindbladOperator(terms), timeStep*_lindbladTrace(terms)
+
+        def LiouExp(rho): # pylint: disable=invalid-name
+            sparse = sp.issparse(rho)
+            evolved = slinA.expm_multiply(generator, rho.toarray() if sparse else rho, **_expmTrace(traceA))
+            return sp.csc_matrix(evolved) if sparse else evolved
+    else:
+        liouvillianExp = LiouvillianExp(Hamiltonian, timeStep=timeStep, collapseOperators=collapseOperators,
+                                        decayRates=decayRates, _double = _double)
 
-        if not delStates:
-            resultList.append(denMat)
-    return resultList
+        def LiouExp(rho): # pylint: disable=invalid-name
+            return liouvillianExp @ rho
+    yield rhoL
+    rhoL = mat2Vec(rhoL)
+    for _ in range(steps):
+        rhoL = LiouExp(rhoL)
+        yield vec2Mat(rhoL)
 
 def steadyState(Hamiltonian: Optional[Matrix] = None, collapseOperators: Optional[List] = None,# pylint: disable=dangerous-default-value,unsubscriptable-object # noqa: E501
                decayRates: Optional[List] = None, _double: bool = False) -> Matrix: # pylint: disable=dangerous-default-value
@@ -404,3 +1765,164 @@ def steadyState(Hamiltonian: Optional[Matrix] = None, collapseOperators: Optiona
                           _double=_double)
     vals, vecs = sortedEigens(Liou, mag=True)
     return vals, vecs
+
+def _accepts(function: Callable, keyword: str) -> bool:
+    # used for the keyword arguments that are added or renamed in the newer scipy versions
+    return keyword in signature(function).parameters
+
+def _krylovTolerance(solver: Callable, tolerance: float) -> dict:
+    # the relative tolerance of the scipy Krylov solvers is renamed from tol to rtol (in scipy 1.12)
+    return {('rtol' if _accepts(solver, 'rtol') else 'tol'): tolerance, 'atol': 0.0}
+
+def _expmTrace(traceA) -> dict:
+    # the trace of the generator is given to expm_multiply only if it accepts traceA (scipy 1.9), otherwise it is
+    # computed by expm_multiply, which then requires an explicit (i.e. not a matrix-free) generator
+    return {'traceA': traceA} if (traceA is not None) and _accepts(slinA.expm_multiply, 'traceA') else {}
+
+def _steadyStatePreconditioner(system: Matrix, preconditioner: Union[str, Matrix, None], diagonal: np.ndarray):
+    if preconditioner == 'ilu':
+        return slinA.LinearOperator(system.shape, slinA.spilu(system).solve, dtype=system.dtype)
+    if preconditioner == 'jacobi':
+        diagonal[diagonal == 0] = 1
+        return sp.diags(1/diagonal, format='csc')
+    return preconditioner
+
+def iterativeSteadyState(Hamiltonian: Optional[Matrix] = None, # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+                         collapseOperators: Optional[List] = None, decayRates: Optional[List] = None,
+                         method: str = 'gmres', preconditioner: Union[str, Matrix, None] = 'ilu',
+                         tolerance: float = 1e-10, initialGuess: Optional[Matrix] = None,
+                         maxIterations: Optional[int] = None, timeStep: float = 1.0, _double: bool = False,
+                         matrixFree: bool = False) -> Tuple[Matrix, int]:
+    r"""
+    Calculates the steady state of the Liouvillian (see :func:`Liouvillian`) iteratively, without exponentiating or
+    diagonalising the super-operator, so that it can be used for the Liouville spaces that are too large for
+    :func:`steadyState`.
+
+    The Krylov methods (``'gmres'``, ``'bicgstab'``, ``'lgmres'``) solve the linear system
+    :math:`\hat{\mathcal{L}}'|\rho\rangle\rangle = |e_{0}\rangle\rangle`, where the (redundant) first row of the
+    Liouvillian is replaced by the trace condition :math:`Tr(\rho) = 1`, with an (``'ilu'``, ``'jacobi'``, or a given
+    matrix/LinearOperator) `preconditioner`. The ``'inverse'`` method is the inverse iteration (with a sparse LU
+    decomposition) of the Liouvillian with a small shift, and the ``'power'`` method repeatedly applies
+    :math:`e^{\hat{\mathcal{L}}t}` (for the given `timeStep`) by :func:`scipy.sparse.linalg.expm_multiply`. An
+    `initialGuess` (such as the steady state of a previous sweep point) is used as the starting point of all the
+    methods, so that small changes in the parameters converge in a few iterations. If `matrixFree` is True, the
+    Liouvillian is used as a matrix-free operator (see :func:`LiouvillianOperator`), where the ``'inverse'`` method is
+    not available and the ``'ilu'`` preconditioner is replaced by ``'jacobi'``.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    Hamiltonian : Matrix or None
+        Hamiltonian of the system
+    collapseOperators : list (of Matrix)
+        `list` of collapse operators
+    decayRates : list (of float)
+        `list` of decay rates (if not given assumed to be 1)
+    method : str
+        one of 'gmres' (default), 'bicgstab', 'lgmres', 'inverse', or 'power'
+    preconditioner : str, Matrix, LinearOperator, or None
+        preconditioner of the Krylov methods, 'ilu' (default), 'jacobi', a matrix/LinearOperator, or None
+    tolerance : float
+        relative tolerance of the residual (Krylov methods) or the change in the state (other methods)
+    initialGuess : Matrix or None
+        initial guess as a density matrix or density vector (the maximally mixed state for the 'inverse' and 'power'
+        methods, if None)
+    maxIterations : int or None
+        maximum number of iterations (default of scipy for the Krylov methods and 1000 for the others)
+    timeStep : float
+        time step of the 'power' method (default=1)
+    matrixFree : bool
+        if True, the Liouvillian is used as a matrix-free operator (default=False)
+
+    Returns
+    -------
+    Tuple[Matrix, int]
+        steady state (as a density matrix) and the number of iterations
+
+    Raises
+    ------
+    ValueError
+        if the method is not supported (or it is 'inverse' with `matrixFree`)
+    RuntimeError
+        if the method does not converge in `maxIterations`
+    """
+
+    if (method not in ('gmres', 'bicgstab', 'lgmres', 'inverse', 'power')) or (matrixFree and method == 'inverse'):
+        raise ValueError(f'{method} is not a supported steady-state method')
+    if Hamiltonian is not None:
+        sparse = sp.issparse(Hamiltonian)
+    elif collapseOperators:
+        sparse = sp.issparse(collapseOperators[0])
+    else:
+        raise ValueError('steady state requires a Hamiltonian or collapseOperators')
+    if matrixFree:
+        terms = _lindbladTerms(Hamiltonian, collapseOperators, decayRates, _double)
+        liouvillian = _lindbladOperator(terms)
+    else:
+        liouvillian = sp.csc_matrix(Liouvillian(Hamiltonian, collapseOperators=collapseOperators,
+                                                decayRates=decayRates, _double=_double), dtype=complex)
+    dimension = int(np.sqrt(liouvillian.shape[0]))
+    traceIndices = np.arange(dimension)*(dimension + 1)
+    if initialGuess is None:
+        state = None
+    else:
+        initialGuess = np.asarray(initialGuess) if isinstance(initialGuess, np.ndarray) else initialGuess.toarray()
+        state = initialGuess.reshape(-1, order='F').astype(complex)
+
+    iterations = 0
+    if method in ('gmres', 'bicgstab', 'lgmres') and matrixFree:
+        def _traceRow(vec):
+            out = liouvillian.matvec(vec).reshape(-1)
+            out[0] = np.asarray(vec).reshape(-1)[traceIndices].sum()
+            return out
+        system = slinA.LinearOperator(liouvillian.shape, matvec=_traceRow, dtype=complex)
+        diagonal = _lindbladDiagonal(terms)
+        diagonal[0] = 1
+        preconditioner = 'jacobi' if preconditioner == 'ilu' else preconditioner
+    elif method in ('gmres', 'bicgstab', 'lgmres'):
+        system = liouvillian.tolil()
+        system[0, :] = 0
+        system[0, traceIndices] = 1
+        system = system.tocsc()
+        diagonal = system.diagonal()
+    if method in ('gmres', 'bicgstab', 'lgmres'):
+        vector = np.zeros(liouvillian.shape[0], dtype=complex)
+        vector[0] = 1
+
+        def _count(*_):
+            nonlocal iterations
+            iterations += 1
+        solver = getattr(slinA, method)
+        kwargs: Dict[str, Any] = {'callback_type': 'pr_norm'} if method == 'gmres' else {}
+        if maxIterations is not None:
+            kwargs['maxiter'] = maxIterations
+        state, info = solver(system, vector, x0=state, M=_steadyStatePreconditioner(system, preconditioner, diagonal),
+                             callback=_count, **_krylovTolerance(solver, tolerance), **kwargs)
+        if info != 0:
+            raise RuntimeError(f'{method} did not converge to the steady state ({info})')
+    else:
+        state = np.eye(dimension, dtype=complex).reshape(-1)/dimension if state is None else state
+        if method == 'inverse':
+            shift = np.sqrt(np.finfo(float).eps)*np.abs(liouvillian.data).max()
+            step = slinA.splu((liouvillian - shift*sp.identity(liouvillian.shape[0], format='csc')).tocsc()).solve
+        else:
+            traceA = timeStep*(_lindbladTrace(terms) if matrixFree else liouvillian.diagonal().sum())
+
+            def step(vec):
+                return slinA.expm_multiply(timeStep*liouvillian, vec, **_expmTrace(traceA))
+
+        for iterations in range(1, (1000 if maxIterations is None else maxIterations) + 1):
+            newState = step(state)
+            newState = newState/newState[traceIndices].sum()
+            converged = np.linalg.norm(newState - state) <= tolerance*np.linalg.norm(newState)
+            state = newState
+            if converged:
+                break
+        else:
+            raise RuntimeError(f'{method} did not converge to the steady state in {iterations} iterations')
+
+    denMat = state.reshape(dimension, dimension, order='F')
+    denMat = (denMat + denMat.conj().T)/2
+    denMat = denMat/np.trace(denMat).real
+    return (sp.csc_matrix(denMat) if sparse else denMat), iterations
@@ -14,6 +14,7 @@ r"""
         tensorProd
         trace
         partialTrace
+        applyLocal
         _matMulInputs
         _matPower
 
@@ -31,6 +32,7 @@ r"""
        `tensorProd`              |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
        `trace`                   |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
        `partialTrace`            |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
+       `applyLocal`              |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
        `_matMulInputs`           |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
        `_matPower`               |w| |w| |w| |c|      |w| |w| |c|      |w| |w| |c|        |w| |w| |x|
     =======================    ==================   ==============   ================   ===============
@@ -364,6 +366,53 @@ def partialTrace(keep: ndOrListInt, dims: ndOrListInt, state: Matrix) -> ndarray
     rhoA = np.einsum(rhoA, idx1+idx2, optimize=False)
     return rhoA.reshape(Nkeep, Nkeep)
 
+def applyLocal(operator: Matrix, state: Matrix, dimsBefore: int = 1, dimsAfter: int = 1) -> Matrix:
+    r"""
+    Applies a local `operator` :math:`\hat{O}` of a sub-system to a (composite) ket :math:`\hat{O}|\psi\rangle` or
+    density matrix :math:`\hat{O}\rho\hat{O}^{\dagger}`, where the total dimensions of the systems before and after
+    the sub-system are `dimsBefore` and `dimsAfter`. The state is reshaped to the sub-system dimensions and only the
+    local operator is contracted on the relevant axis, i.e. this is the same as using the composite operator
+    :math:`\mathbb{I}_{before}\otimes\hat{O}\otimes\mathbb{I}_{after}` (see
+    :func:`compositeOp <quanguru.QuantumToolbox.operators.compositeOp>`), but without creating it.
+
+    Keeps sparse/array as sparse/array.
+
+    Parameters
+    ----------
+    operator : Matrix
+        local operator of the sub-system
+    state : Matrix
+        ket or density matrix of the composite system
+    dimsBefore : int
+        total dimension of the systems before the sub-system (default=1)
+    dimsAfter : int
+        total dimension of the systems after the sub-system (default=1)
+
+    Returns
+    -------
+    Matrix
+        ket or density matrix
+
+    Examples
+    --------
+    >>> applyLocal(np.array([[0, 1], [1, 0]]), np.array([[1], [0], [0], [0]]), dimsBefore=2)
+    array([[0],
+           [1],
+           [0],
+           [0]])
+    """
+
+    sparse = sp.issparse(state)
+    operator = np.asarray(operator) if isinstance(operator, ndarray) else operator.toarray()
+    dimension = operator.shape[0]
+    state = np.asarray(state) if isinstance(state, ndarray) else state.toarray()
+    tensor = operator @ state.reshape(dimsBefore, dimension, -1)
+    if state.shape[1] != 1:
+        tensor = tensor.reshape(state.shape[0], dimsBefore, dimension, dimsAfter)
+        tensor = np.einsum('xajb,kj->xakb', tensor, operator.conj(), optimize=True)
+    state = tensor.reshape(state.shape)
+    return sp.csc_matrix(state) if sparse else state
+
 def _matMulInputs(*args: matrixOrMatrixList) -> Matrix:
     r"""
     Calculates the matrix multiplication of the given arbitrary number of inputs in the given order.
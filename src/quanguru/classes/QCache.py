@@ -0,0 +1,267 @@
+r"""
+    Contains the :class:`unitaryCache` class used to re-use the exponentiated (unitary or Liouvillian) matrices, the
+    :class:`operatorCache` class used to re-use the (composite) operators of the terms, and the
+    :class:`unitaryProductTree` class used to re-use the partial products of the step unitaries of a protocol.
+
+    .. currentmodule:: quanguru.classes.QCache
+
+    .. autosummary::
+
+        unitaryCache
+        operatorCache
+        unitaryProductTree
+
+    .. |c| unicode:: U+2705
+    .. |x| unicode:: U+274C
+    .. |w| unicode:: U+2000
+
+    =======================    ==================    ================   ===============
+       **Function Name**        **Docstrings**        **Unit Tests**     **Tutorials**
+    =======================    ==================    ================   ===============
+      `unitaryCache`             |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+      `operatorCache`            |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+      `unitaryProductTree`       |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+    =======================    ==================    ================   ===============
+
+"""
+
+import threading
+from collections import OrderedDict
+from numbers import Number
+
+import scipy.sparse as sp # type: ignore
+
+from ..QuantumToolbox._helpers import _matrixKey #pylint: disable=relative-beyond-top-level
+from .tempConfig import classConfig
+
+class unitaryCache:
+    r"""
+    A (bounded) content-keyed cache for the exponentiated matrices. The keys are created from the contents of the
+    Hamiltonian, collapse operators, decay rates, and the time step (see :meth:`key`), so that, for example, the inner
+    sweep of a 2D sweep that does not change the Hamiltonian re-uses the exponentials of the first pass, instead of
+    re-exponentiating at every sweep point. The storage is at the class level, meaning a single cache is shared by all
+    the protocols (of a process) and it is kept between different runs of simulations.
+
+    The total memory of the cached matrices is bounded by ``memoryBudget`` (in bytes, 16 MB by default, and caching is
+    disabled if it is 0), and the matrices are evicted either in least-recently-used (``'lru'``) or first-in-first-out
+    (``'fifo'``) order, as set by the ``policy``. Number of ``hits``, ``misses``, and ``evictions`` are stored as class
+    attributes and :meth:`stats` returns them together with the current memory usage. The exponentials of the
+    time-dependent Hamiltonians change at every step, so they are not cached (see
+    :meth:`_cacheKey <quanguru.classes.QPro.freeEvolution._cacheKey>`).
+    """
+    #: (**class attribute**) maximum total memory (in bytes) of the cached matrices. Caching is disabled, if it is 0.
+    memoryBudget = classConfig['unitaryCacheMemory']
+    #: (**class attribute**) eviction policy, either 'lru' (least-recently-used) or 'fifo' (first-in-first-out)
+    policy = classConfig['unitaryCachePolicy']
+    #: (**class attribute**) number of times a cached matrix is returned
+    hits = 0
+    #: (**class attribute**) number of times a matrix is not found in the cache
+    misses = 0
+    #: (**class attribute**) number of times a matrix is evicted from the cache
+    evictions = 0
+    #: (**class attribute**) ordered dictionary storing the cached matrices
+    _cache = OrderedDict()
+    #: (**class attribute**) total memory (in bytes) of the cached matrices
+    _memory = 0
+    #: (**class attribute**) lock used to update the cache from the threads of a thread pool
+    _lock = threading.RLock()
+
+    @classmethod
+    def key(cls, *args):
+        r"""
+        Creates a hashable key from the given inputs, which can be (sparse or array) matrices, numbers, strings, or
+        (nested) lists/tuples of these. Matrices are keyed by their content (see
+        :func:`_matrixKey <quanguru.QuantumToolbox._helpers._matrixKey>`).
+        """
+        keys = []
+        for arg in args:
+            if isinstance(arg, (list, tuple)):
+                keys.append(cls.key(*arg))
+            elif (arg is None) or isinstance(arg, (Number, str)):
+                keys.append(arg)
+            else:
+                keys.append(_matrixKey(arg))
+        return tuple(keys)
+
+    @staticmethod
+    def _nbytes(matrix):
+        r"""
+        Returns the memory (in bytes) used by a (sparse or array) matrix.
+        """
+        if sp.issparse(matrix):
+            return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        return matrix.nbytes
+
+    @classmethod
+    def get(cls, key):
+        r"""
+        Returns the cached matrix for the given key, or None if there is no such matrix in the cache (or the key is
+        None, which is used for the matrices that are not cached).
+        """
+        if key is None:
+            return None
+        with cls._lock:
+            matrix = cls._cache.get(key)
+            if matrix is None:
+                cls.misses += 1
+            else:
+                cls.hits += 1
+                if cls.policy == 'lru':
+                    cls._cache.move_to_end(key)
+        return matrix
+
+    @classmethod
+    def add(cls, key, matrix):
+        r"""
+        Adds the matrix to the cache (if it fits into the ``memoryBudget``), and evicts the older matrices (as required
+        by the ``policy``) until the total memory is within the ``memoryBudget``. Returns the given matrix, which is not
+        cached if the key is None.
+        """
+        if key is None:
+            return matrix
+        size = cls._nbytes(matrix)
+        with cls._lock:
+            if (size <= cls.memoryBudget) and (key not in cls._cache):
+                cls._cache[key] = matrix
+                cls._memory += size
+                while cls._memory > cls.memoryBudget:
+                    _, evicted = cls._cache.popitem(last=False)
+                    cls._memory -= cls._nbytes(evicted)
+                    cls.evictions += 1
+        return matrix
+
+    @classmethod
+    def clear(cls):
+        r"""
+        Removes all the matrices from the cache and resets the statistics.
+        """
+        with cls._lock:
+            cls._cache.clear()
+            cls._memory = 0
+            cls.hits = 0
+            cls.misses = 0
+            cls.evictions = 0
+
+    @classmethod
+    def stats(cls):
+        r"""
+        Returns a dictionary of the cache statistics, i.e. number of hits, misses, evictions, cached matrices, and the
+        memory (in bytes) used by the cached matrices.
+        """
+        return {'hits': cls.hits, 'misses': cls.misses, 'evictions': cls.evictions, 'size': len(cls._cache),
+                'memory': cls._memory}
+
+class operatorCache(unitaryCache):
+    r"""
+    A (bounded) cache for the composite operators of the terms (see
+    :meth:`_dimInput <quanguru.classes.QTerms.QTerm._dimInput>`), which are keyed by the operator (function), its
+    dimension and order, and the dimensions before and after its system, i.e. by everything that determines the content
+    of the matrix. Same as the :class:`unitaryCache`, the storage is at the class level, so that the operators are not
+    re-constructed when the same systems are re-created (or their dimensions are swept back and forth), and it stays
+    warm in the workers of the persistent :class:`workerPool <quanguru.classes.QPool.workerPool>` across the runs. The
+    terms get copies of the cached operators, so that the cached matrices are not changed by the in-place updates.
+    """
+    #: (**class attribute**) maximum total memory (in bytes) of the cached operators. Caching is disabled, if it is 0.
+    memoryBudget = classConfig['operatorCacheMemory']
+    #: (**class attribute**) number of times a cached operator is returned
+    hits = 0
+    #: (**class attribute**) number of times an operator is not found in the cache
+    misses = 0
+    #: (**class attribute**) number of times an operator is evicted from the cache
+    evictions = 0
+    #: (**class attribute**) ordered dictionary storing the cached operators
+    _cache = OrderedDict()
+    #: (**class attribute**) total memory (in bytes) of the cached operators
+    _memory = 0
+
+class unitaryProductTree:
+    r"""
+    A segment tree of the partial products of a sequence of (step) unitaries :math:`U_{n-1}...U_{1}U_{0}`, which is used
+    by :class:`qProtocol <quanguru.classes.QPro.qProtocol>` (if its ``treeComposition`` is True) to compose the
+    unitaries of its steps. Each node stores the product of the unitaries in its range, so that, when only some of the
+    steps change (e.g. a single gate angle is swept in a long protocol), only the products on the paths from the changed
+    leaves to the root are re-computed, i.e. :math:`O(\log n)` products per changed step instead of :math:`n-1`. A step
+    is considered to be changed if the content key (see
+    :func:`_matrixKey <quanguru.QuantumToolbox._helpers._matrixKey>`) of its unitary is different than the stored one,
+    so that an in-place change of a unitary is detected and a re-created unitary with the same content does not trigger
+    any re-computation.
+
+    The leaves are (references to) the step unitaries, and the tree stores the :math:`n-1` partial products in addition,
+    so each protocol holds about :math:`2n` matrices of its dimension (the products of sparse unitaries are usually
+    dense), which are released by :meth:`clear`.
+
+    Number of ``compositions``, ``updatedSteps``, and ``multiplications`` are stored as (instance) attributes and
+    :meth:`stats` returns them together with the number of multiplications saved compared to the full re-composition.
+    """
+
+    __slots__ = ['_nodes', '_keys', '_count', '_fullMultiplications', 'compositions', 'updatedSteps', 'multiplications']
+
+    def __init__(self):
+        #: list of the nodes (partial products) of the tree, where the root is at index 1 and the children of the node
+        #: at index i are at 2i and 2i+1, and the leaves (step unitaries) start from the index given by the tree size
+        self._nodes = []
+        #: list of the content keys of the step unitaries (leaves)
+        self._keys = []
+        #: number of the step unitaries (leaves) in the tree
+        self._count = 0
+        #: number of matrix multiplications that the re-composition of the full product would use
+        self._fullMultiplications = 0
+        #: number of times a product is requested by :meth:`product`
+        self.compositions = 0
+        #: number of step unitaries that are changed (or added) in :meth:`product` calls
+        self.updatedSteps = 0
+        #: number of matrix multiplications used by the tree
+        self.multiplications = 0
+
+    def _combine(self, first, second):
+        r"""
+        Returns the product ``second @ first`` of two nodes, where None is an (empty) identity.
+        """
+        if (first is None) or (second is None):
+            return second if first is None else first
+        self.multiplications += 1
+        return second @ first
+
+    def product(self, unitaries):
+        r"""
+        Returns the product :math:`U_{n-1}...U_{1}U_{0}` of the given `list` of unitaries (or None, if it is empty) by
+        re-computing only the partial products that depend on the changed unitaries (i.e. the unitaries with a different
+        content key). The tree is re-built if the number of unitaries changes.
+        """
+        self.compositions += 1
+        self._fullMultiplications += max(0, len(unitaries) - 1)
+        keys = [_matrixKey(unitary) for unitary in unitaries]
+        size = len(self._nodes)//2
+        if len(unitaries) != self._count:
+            self._count = len(unitaries)
+            size = 1 << max(0, self._count - 1).bit_length()
+            self._nodes = [None]*(2*size)
+            changed = list(range(self._count))
+        else:
+            changed = [ind for ind, key in enumerate(keys) if key != self._keys[ind]]
+        self._keys = keys
+        self.updatedSteps += len(changed)
+        for ind in changed:
+            self._nodes[size + ind] = unitaries[ind]
+        # the leaves are at the same depth, so the changed nodes are updated level by level towards the root
+        parents = {(size + ind)//2 for ind in changed}
+        while parents and (size > 1):
+            for node in parents:
+                self._nodes[node] = self._combine(self._nodes[2*node], self._nodes[2*node + 1])
+            parents = {node//2 for node in parents if node > 1}
+        return self._nodes[1] if self._count > 0 else None
+
+    def clear(self):
+        r"""
+        Removes all the stored products and resets the statistics.
+        """
+        self.__init__()
+
+    def stats(self):
+        r"""
+        Returns a dictionary of the tree statistics, i.e. number of compositions, updated steps, multiplications, and
+        the multiplications saved compared to the re-composition of the full product at every composition.
+        """
+        return {'compositions': self.compositions, 'updatedSteps': self.updatedSteps,
+                'multiplications': self.multiplications,
+                'saved': self._fullMultiplications - self.multiplications}
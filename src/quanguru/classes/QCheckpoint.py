@@ -0,0 +1,144 @@
+r"""
+    Contains the :class:`sweepCheckpoint` class used to periodically save the results and states of the completed
+    sweep points into a (local) file, so that an interrupted simulation can be resumed without repeating them.
+
+    .. currentmodule:: quanguru.classes.QCheckpoint
+
+    .. autosummary::
+
+        sweepCheckpoint
+
+    .. |c| unicode:: U+2705
+    .. |x| unicode:: U+274C
+    .. |w| unicode:: U+2000
+
+    =======================    ==================    ================   ===============
+       **Function Name**        **Docstrings**        **Unit Tests**     **Tutorials**
+    =======================    ==================    ================   ===============
+      `sweepCheckpoint`          |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+    =======================    ==================    ================   ===============
+
+"""
+
+import os
+import time
+import pickle
+from collections import defaultdict
+
+from .QRes import qResBlank, qResults
+from .QCache import unitaryCache
+
+class sweepCheckpoint:
+    r"""
+    Checkpoint file of a sweep, which is used (by :func:`nonParalEvol <quanguru.classes.modularSweep.nonParalEvol>` and
+    :func:`paralEvol <quanguru.classes.modularSweep.paralEvol>`) if the ``checkpoint`` (file path) of the simulation is
+    set. The results and states of each completed sweep point are recorded by :meth:`record`, and they are appended to
+    the file (as a single pickle of all the points completed since the last save) at every ``interval`` seconds and at
+    the end (or interruption) of the sweep, so the cost of a save does not grow with the number of completed points.
+
+    The file starts with a signature of the sweep (number of points, and the keys and values of the sweeps), and, when
+    a simulation is resumed (see :meth:`run <quanguru.classes.QSim.Simulation.run>`), the points of a checkpoint with
+    the same signature are not evolved again, but their recorded results are used (see :meth:`restored`) to create the
+    same final results as an uninterrupted run. A partially written (last) save of a killed process is ignored and
+    overwritten.
+    """
+
+    __slots__ = ['path', 'interval', 'completed', 'signature', '_pending', '_saved']
+
+    def __init__(self, path, signature, interval=0):
+        #: path of the checkpoint file
+        self.path = path
+        #: minimum time (in seconds) between two saves
+        self.interval = interval
+        #: dictionary of the recorded (key, results, states) of the completed sweep points
+        self.completed = {}
+        #: signature of the sweep, used to ensure that a checkpoint is resumed only by the same sweep
+        self.signature = signature
+        #: dictionary of the recorded sweep points that are not yet saved
+        self._pending = {}
+        #: time of the last save
+        self._saved = time.perf_counter()
+
+    @staticmethod
+    def _signature(qSim):
+        r"""
+        Returns the signature of the sweep of the given simulation, i.e. the number of sweep points, and the key and
+        (content keys of the) values of each sweep (see :meth:`key <quanguru.classes.QCache.unitaryCache.key>`).
+        """
+        sweeps = [unitaryCache.key(sweep.sweepKey, sweep.combinatorial, list(sweep.sweepList))
+                  for sweep in qSim.Sweep.sweeps.values()]
+        return {'count': qSim.Sweep.indMultip, 'sweeps': sweeps}
+
+    @classmethod
+    def open(cls, qSim, resume=False):
+        r"""
+        Returns the checkpoint of the given simulation (or None, if its ``checkpoint`` is not set). If ``resume`` is
+        True and the file exists, the completed points are loaded from the file, otherwise a new file is created.
+        Raises a ValueError if the checkpoint file is created by a different sweep.
+        """
+        if qSim.checkpoint is None:
+            return None
+        checkpoint = cls(qSim.checkpoint, cls._signature(qSim), qSim.checkpointInterval)
+        if resume and os.path.exists(checkpoint.path):
+            checkpoint._load()
+        else:
+            with open(checkpoint.path, 'wb') as file:
+                pickle.dump(checkpoint.signature, file)
+        return checkpoint
+
+    def _load(self):
+        r"""
+        Loads the completed points from the file, and truncates the file after the last complete save.
+        """
+        with open(self.path, 'rb+') as file:
+            if pickle.load(file) != self.signature:
+                raise ValueError(f'checkpoint {self.path} is created by a different sweep')
+            end = file.tell()
+            while True:
+                try:
+                    self.completed.update(pickle.load(file))
+                except (EOFError, pickle.UnpicklingError):
+                    break
+                end = file.tell()
+            file.truncate(end)
+
+    def record(self, ind, results):
+        r"""
+        Records the results and states of the sweep point ``ind`` from the given dictionary of (single-point) results
+        (see :meth:`_copyAllResBlank <quanguru.classes.QRes.qResults._copyAllResBlank>`), and saves the checkpoint if
+        the ``interval`` is passed since the last save.
+        """
+        self._pending[ind] = self.completed[ind] = [(keyUni, dict(valUni.resultsDict), dict(valUni.states))
+                                                    for keyUni, valUni in results.items()]
+        if time.perf_counter() - self._saved >= self.interval:
+            self.save()
+
+    def save(self):
+        r"""
+        Appends the recorded points that are not yet saved to the file.
+        """
+        if len(self._pending) > 0:
+            with open(self.path, 'ab') as file:
+                pickle.dump(self._pending, file)
+                file.flush()
+                os.fsync(file.fileno())
+            self._pending = {}
+        self._saved = time.perf_counter()
+
+    def restored(self, ind):
+        r"""
+        Returns the recorded results of the sweep point ``ind`` as a dictionary of :class:`qResBlank
+        <quanguru.classes.QRes.qResBlank>` (as the single-point results of the simulation), or None if it is not
+        completed. The results of the (qResults) instances that do not exist anymore are skipped.
+        """
+        if ind not in self.completed:
+            return None
+        results = {}
+        for keyUni, resultsDict, states in self.completed[ind]:
+            if keyUni in qResults._allResults: # pylint: disable=protected-access
+                blank = results[keyUni] = qResBlank()
+                # pylint: disable=protected-access,assigning-non-slot
+                blank._qResBlank__resultsLast = defaultdict(list, resultsDict)
+                blank._qResBlank__statesLast = defaultdict(list, states)
+                # pylint: enable=protected-access,assigning-non-slot
+        return results
@@ -40,6 +40,14 @@ class genericDrive(paramBoundBase):
     def apply(self, time): #pylint:disable=unused-argument
         return 0
 
+    def timeDependency(self, term, time):
+        r"""
+        Sets the frequency of the given term to the value of the drive (see ``apply``) at the given time. It can be used
+        as the ``timeDependency`` of a term (``term.timeDependency = drive.timeDependency``), so that the drive is also
+        evaluated within the steps by the Magnus propagators (see ``propagator``) or by the ODE solver.
+        """
+        term.frequency = self.apply(time)
+
 class qDrive(genericDrive):
     label = 'qDrive'
     #: (**class attribute**) number of instances created internally by the library
@@ -35,13 +35,16 @@ class SpinRotation(Gate): # pylint: disable=too-many-ancestors
     _externalInstances: int = 0
     #: (**class attribute**) number of total instances = _internalInstances + _externalInstances
     _instances: int = 0
-    __slots__ = ['__angle', '__rotationAxis', 'phase', '_rotationOp']
+    __slots__ = ['__angle', '__rotationAxis', 'phase', '_rotationOp', '__localOps']
     def __init__(self, **kwargs):
         super().__init__(_internal=kwargs.pop('_internal', False))
         self.__angle = None
         self.__rotationAxis = None
         self._rotationOp = None
         self.phase = 1
+        #: stores the key (parameters and sub-system dimensions) and the list of the local operators, which are re-used
+        #: by _localOperators as long as the key is the same.
+        self.__localOps = (None, None)
         #self._createUnitary = self._rotMat
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
@@ -69,6 +72,20 @@ class SpinRotation(Gate): # pylint: disable=too-many-ancestors
         else:
             raise ValueError('unknown axis')
 
+    def _localRotation(self, dimension):
+        return evolution.Unitary(self.phase*self.angle*self._rotationOp(dimension, isDim=True))
+
+    def _localOperators(self):
+        sys = list(self.subSys.values())
+        if (self.angle is None) or (self._rotationOp is None) or (len(sys) == 0):
+            return None
+        key = (self.angle, self.phase, self.rotationAxis, self.implementation,
+               tuple((s.dimension, s._dimsBefore, s._dimsAfter) for s in sys)) # pylint: disable=protected-access
+        if self._SpinRotation__localOps[0] != key:
+            localOps = [(self._localRotation(s.dimension), s._dimsBefore, s._dimsAfter) for s in sys] # pylint: disable=protected-access
+            self._SpinRotation__localOps = (key, localOps) # pylint: disable=assigning-non-slot
+        return self._SpinRotation__localOps[1]
+
     def _rotMat(self, collapseOps = None, decayRates = None, openSys=False): #pylint:disable=unused-argument
         if ((self._paramBoundBase__matrix is None) or (self._paramBoundBase__paramUpdated is True)): # pylint: disable=no-member
             sys = list(self.subSys.values())
@@ -98,6 +115,13 @@ class xGate(SpinRotation): # pylint: disable=too-many-ancestors
         #self._createUnitary = self._gateImplements
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
+    def _localRotation(self, dimension):
+        if (self.implementation is None) or (self.implementation.lower() not in ('instant', 'flip')):
+            return super()._localRotation(dimension)
+        rotOp = {'x': spinRotations.xRotation, 'y': spinRotations.yRotation,
+                 'z': spinRotations.zRotation}[self.rotationAxis.lower()]
+        return rotOp(self.angle)
+
     def instantFlip(self, openSys=False):
         if ((self._paramBoundBase__matrix is None) or (self._paramBoundBase__paramUpdated is True)): # pylint: disable=no-member
             sys = list(self.subSys.values())
@@ -0,0 +1,407 @@
+r"""
+    Contains the :class:`workerPool` class, a persistent (multi-processing) pool that is re-used by the
+    :meth:`run <quanguru.classes.QSim.Simulation.run>` calls of the simulations, until it is explicitly closed, the
+    :class:`sharedStates` class used to transport the states from the workers to the main process in shared memory,
+    the :class:`threadBudget` class used to split the cores between the sweep workers and the BLAS threads, and the
+    :class:`sweepExecutor` (and :class:`localExecutor`) classes used to run the sweeps with any
+    ``concurrent.futures.Executor`` compatible backend.
+
+    .. currentmodule:: quanguru.classes.QPool
+
+    .. autosummary::
+
+        workerPool
+        sharedStates
+        threadBudget
+        sweepExecutor
+        localExecutor
+
+    .. |c| unicode:: U+2705
+    .. |x| unicode:: U+274C
+    .. |w| unicode:: U+2000
+
+    =======================    ==================    ================   ===============
+       **Function Name**        **Docstrings**        **Unit Tests**     **Tutorials**
+    =======================    ==================    ================   ===============
+      `workerPool`               |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+      `sharedStates`             |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+      `threadBudget`             |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+      `sweepExecutor`            |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+      `localExecutor`            |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+    =======================    ==================    ================   ===============
+
+"""
+
+import os
+import sys
+import pickle
+import platform
+import warnings
+import threading
+import multiprocessing
+from multiprocessing.pool import Pool, ThreadPool
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+
+import numpy as np # type: ignore
+import scipy.sparse as sp # type: ignore
+
+from .tempConfig import classConfig
+
+try:
+    # shared memory (and its resource tracker) requires python 3.8, and the states are pickled without it
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError: # pragma: no cover
+    shared_memory = resource_tracker = None
+
+try:
+    from threadpoolctl import threadpool_limits # type: ignore
+except ImportError: # pragma: no cover
+    threadpool_limits = None
+
+class workerPool:
+    r"""
+    A long-lived process pool shared by all the simulations (of a process). :meth:`start` creates the pool, and, until
+    :meth:`close` is called, every multi-processing :meth:`run <quanguru.classes.QSim.Simulation.run>` (i.e. with
+    ``p=True`` or ``p=None``) uses this pool instead of creating (and closing) a new one, so that the workers are forked
+    only once. Since the workers are not re-created, their (class-level) caches, i.e. the exponentials in
+    :class:`unitaryCache <quanguru.classes.QCache.unitaryCache>` and the term operators in
+    :class:`operatorCache <quanguru.classes.QCache.operatorCache>`, stay warm across the runs. Additionally, the
+    simulation of a run is pickled only once (instead of for every sweep point), and each worker un-pickles it only
+    once per run and re-uses it for all of its sweep points, as in the single-process sweep.
+
+    Note that the workers are forked when the pool is started, so any later change to the class-level settings (e.g.
+    ``freeEvolution._freqCoef`` or the cache budgets) is not seen by the workers until the pool is re-started.
+    """
+    #: (**class attribute**) the persistent pool, None if it is not started (or closed)
+    _pool = None
+    #: (**class attribute**) number of runs that used the persistent pool
+    runs = 0
+    #: (**class attribute**) number of the pickled simulations, used to create a unique token for each run
+    _tokens = 0
+    #: (**class attribute**) (worker-side) token and the un-pickled simulation of the current run, which are
+    #: thread-local so that each thread of a thread pool uses its own copy of the simulation
+    _worker = threading.local()
+
+    @staticmethod
+    def _setStartMethod():
+        r"""
+        Sets the start method of the multi-processing to fork (if it is not Windows and not already set), and starts the
+        resource tracker before the workers are forked, so that the workers share it (for the :class:`sharedStates`).
+        """
+        if (platform.system() != 'Windows') and (sys.version_info[1] >= 8):
+            try:
+                multiprocessing.set_start_method("fork")
+            except: #pylint:disable=bare-except # noqa: E722
+                pass
+            if resource_tracker is not None:
+                resource_tracker.ensure_running()
+
+    @classmethod
+    def start(cls, coreCount=None):
+        r"""
+        Starts the persistent pool with the given number of processes (``(available number of cores) - 1`` as default),
+        and returns it. If the pool is already started, the existing pool is returned and ``coreCount`` is ignored.
+        """
+        if cls._pool is None:
+            cls._setStartMethod()
+            processes = coreCount if isinstance(coreCount, int) else max(1, multiprocessing.cpu_count()-1)
+            cls._pool = threadBudget.processPool(processes)
+        return cls._pool
+
+    @classmethod
+    def close(cls):
+        r"""
+        Closes (and joins) the persistent pool, so that the later runs create their own pools.
+        """
+        if cls._pool is not None:
+            cls._pool.close()
+            cls._pool.join()
+            cls._pool = None
+
+    @classmethod
+    def active(cls):
+        r"""
+        Returns True if the persistent pool is started (and not closed).
+        """
+        return cls._pool is not None
+
+    @classmethod
+    def owns(cls, pool):
+        r"""
+        Returns True if the given pool is the persistent pool.
+        """
+        return (pool is not None) and (pool is cls._pool)
+
+    @classmethod
+    def processes(cls):
+        r"""
+        Returns the number of processes of the persistent pool, or None if it is not started.
+        """
+        return None if cls._pool is None else cls._pool._processes # pylint: disable=protected-access
+
+    @classmethod
+    def _payload(cls, qSim):
+        r"""
+        Returns a (token, pickled simulation) pair for a new run, which is sent to the workers instead of the
+        simulation itself. The token is unique for each run (of each parent process).
+        """
+        cls._tokens += 1
+        return (os.getpid(), cls._tokens), pickle.dumps(qSim)
+
+    @classmethod
+    def _simulation(cls, token, payload):
+        r"""
+        (Worker-side) Returns the simulation of the run with the given token, which is un-pickled only at the first
+        call of each run (in each worker process or thread).
+        """
+        if getattr(cls._worker, 'token', None) != token:
+            cls._worker.token, cls._worker.simulation = token, pickle.loads(payload)
+        return cls._worker.simulation
+
+class sharedStates:
+    r"""
+    Shared-memory transport of the (stored) states of a multi-processing sweep (see
+    :func:`paralEvol <quanguru.classes.modularSweep.paralEvol>`). The main process pre-allocates a block for each
+    stored state key, with the shape (number of sweep points, number of steps + 1, state shape), and the workers write
+    the states of their sweep points in place (:meth:`write`) and return only a small status record instead of the
+    pickled states, which the main process reads back from the block (:meth:`read`). The states of a sweep point that
+    do not fit into the block (e.g. if the dimension or the number of steps is swept) are returned through the pool as
+    usual. Only the names and the shapes of the blocks are pickled, and the workers attach to the blocks by their names.
+    """
+    #: (**class attribute**) boolean to enable/disable the shared-memory transport of the states
+    enabled = classConfig['sharedStates']
+    #: (**class attribute**) status record used (in the place of the list of states) for the states in shared memory
+    marker = 'sharedStates'
+
+    __slots__ = ['_shapes', '_memory']
+
+    def __init__(self, shapes):
+        #: dictionary of (results name, state key) : (block name, block shape) pairs
+        self._shapes = {}
+        #: dictionary of the attached shared memory blocks (not pickled)
+        self._memory = {}
+        for key, shape in shapes.items():
+            memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)))*16)
+            self._memory[key] = memory
+            self._shapes[key] = (memory.name, tuple(shape))
+
+    def __getstate__(self):
+        return {'_shapes': self._shapes}
+
+    def __setstate__(self, state):
+        self._shapes = state['_shapes']
+        self._memory = {}
+
+    @classmethod
+    def create(cls, qSim):
+        r"""
+        Creates the blocks for the states stored by the protocols of the given simulation, or returns None if the
+        transport is disabled (or shared memory is not available, i.e. before python 3.8) or no state is stored.
+        """
+        if shared_memory is None:
+            return None
+        shapes = {}
+        for protocol in qSim.subSys.keys():
+            if (not cls.enabled) or protocol.simulation.delStates or (protocol.initialState is None):
+                continue
+            name = (protocol.superSys.name if protocol._internal else protocol.name) + 'Results' # pylint: disable=protected-access
+            dim = protocol.initialState.shape[0]
+            stateShape = (dim, dim) if protocol._isOpen else protocol.initialState.shape # pylint: disable=protected-access
+            shapes[(qSim.qRes.name, name)] = (qSim.Sweep.indMultip, qSim.stepCount + 1) + tuple(stateShape)
+        return cls(shapes) if len(shapes) > 0 else None
+
+    def _block(self, key):
+        r"""
+        Returns the (complex) array view of the block for the given key, attaching to the shared memory if required.
+        """
+        name, shape = self._shapes[key]
+        if key not in self._memory:
+            self._memory[key] = shared_memory.SharedMemory(name=name)
+        return np.ndarray(shape, dtype=complex, buffer=self._memory[key].buf)
+
+    def write(self, keyUni, valUni, ind):
+        r"""
+        (Worker-side) Writes the states of the sweep point ``ind`` (of the results ``valUni`` with the name ``keyUni``)
+        that fit into the blocks, and replaces them by status records.
+        """
+        for key, states in valUni.states.items():
+            if (keyUni, key) not in self._shapes:
+                continue
+            shape = self._shapes[(keyUni, key)][1]
+            if (len(states) != shape[1]) or any(state.shape != shape[2:] for state in states):
+                continue
+            block = self._block((keyUni, key))
+            for step, state in enumerate(states):
+                block[ind, step] = state.toarray() if sp.issparse(state) else state
+            dtype = np.result_type(*(state.dtype for state in states))
+            valUni.states[key] = (self.marker, sp.issparse(states[0]), dtype.str)
+
+    def read(self, keyUni, valUni, ind):
+        r"""
+        Replaces the status records in the states of the sweep point ``ind`` (of the results ``valUni`` with the name
+        ``keyUni``) by the states (copied) from the blocks.
+        """
+        for key, states in valUni.states.items():
+            if isinstance(states, tuple) and (states[0] == self.marker):
+                values = np.array(self._block((keyUni, key))[ind], dtype=states[2])
+                valUni.states[key] = [sp.csc_matrix(value) if states[1] else value for value in values]
+
+    def close(self, unlink=False):
+        r"""
+        Closes the attached blocks, and also removes (unlinks) them if ``unlink`` is True, which is done by the main
+        process at the end of the run.
+        """
+        for memory in self._memory.values():
+            memory.close()
+            if unlink:
+                memory.unlink()
+        self._memory = {}
+
+class threadBudget:
+    r"""
+    Splits the cores between the sweep-level parallelism (number of worker processes or threads) and the BLAS threads
+    used by each matrix operation (exponentiation, multiplication, etc.), so that the workers and their BLAS threads do
+    not over-subscribe the cores (e.g. 63 forked workers, each with a multi-threaded BLAS). The BLAS threads are limited
+    by `threadpoolctl <https://github.com/joblib/threadpoolctl>`_ (a requirement of the package), and they are not
+    limited (with a warning for the thread backend) if it is not installed.
+
+    The split (:meth:`split`) is set from the system dimension and the number of sweep points: a BLAS thread is used for
+    every ``blockDimension`` of the (largest) system dimension, and the remaining cores are used by the sweep workers,
+    which are at most the number of sweep points.
+    """
+    #: (**class attribute**) system dimension per BLAS thread, i.e. smaller systems use a single BLAS thread
+    blockDimension = 256
+    #: (**class attribute**) boolean to give the (missing threadpoolctl) warning only once
+    _warned = False
+
+    @classmethod
+    def split(cls, dimension, sweepSize, cores=None):
+        r"""
+        Returns the number of sweep workers and the number of BLAS threads (per worker) for the given system dimension,
+        number of sweep points, and the number of cores (all the available cores as default).
+        """
+        cores = max(1, multiprocessing.cpu_count() if cores is None else cores)
+        blasThreads = min(cores, max(1, int(dimension)//cls.blockDimension))
+        workers = max(1, min(int(sweepSize), cores//blasThreads))
+        return workers, max(1, cores//workers)
+
+    @classmethod
+    def limit(cls, threads):
+        r"""
+        Limits the number of BLAS threads (of the current process) to the given number, and returns the
+        ``threadpool_limits`` object (which can be used as a context manager to restore the previous limits), or None
+        (with a warning, given only once) if threadpoolctl is not installed.
+        """
+        if threadpool_limits is None:
+            if not cls._warned:
+                cls._warned = True
+                warnings.warn('threadpoolctl is not installed, so the BLAS threads of the thread workers are not ' +
+                              'limited')
+            return None
+        return threadpool_limits(limits=threads, user_api='blas')
+
+    @staticmethod
+    def _initialiseWorker(threads):
+        r"""
+        Initializer of the worker processes, which limits their BLAS threads to the given number (if threadpoolctl is
+        installed).
+        """
+        if threadpool_limits is not None:
+            threadpool_limits(limits=threads, user_api='blas')
+
+    @classmethod
+    def processPool(cls, processes, cores=None):
+        r"""
+        Creates a process pool, where the BLAS threads of each worker process are limited to its share of the cores.
+        """
+        cores = max(1, multiprocessing.cpu_count() if cores is None else cores)
+        threads = max(1, cores//max(1, processes))
+        return multiprocessing.Pool(processes=processes, initializer=cls._initialiseWorker, #pylint:disable=consider-using-with
+                                    initargs=(threads,))
+
+class sweepExecutor:
+    r"""
+    A common interface for the backends that run the (chunks of) sweep points, which are either the
+    ``multiprocessing`` pools (process or thread) or any ``concurrent.futures.Executor`` compatible object (i.e. with a
+    ``submit`` method returning futures), such as the process/thread pool executors of the standard library, the
+    :class:`localExecutor`, or the executors of the cluster schedulers. The work units are the (pickled) simulation and
+    lists of sweep indices (see :func:`chunkTimeEvol <quanguru.classes.modularSweep.chunkTimeEvol>`), and the results
+    are merged into the :class:`qResults <quanguru.classes.QRes.qResults>` in the main process, so the same sweep code
+    runs on any backend.
+    """
+
+    __slots__ = ['executor']
+
+    def __init__(self, executor):
+        #: the wrapped pool or executor
+        self.executor = executor
+
+    @classmethod
+    def wrap(cls, executor):
+        r"""
+        Returns the given object if it is already a :class:`sweepExecutor`, or wraps it.
+        """
+        return executor if isinstance(executor, cls) else cls(executor)
+
+    @staticmethod
+    def isExecutor(obj):
+        r"""
+        Returns True if the given object is an ``Executor`` (or compatible) object, but not a ``multiprocessing`` pool.
+        """
+        return isinstance(obj, Executor) or (callable(getattr(obj, 'submit', None)) and not isinstance(obj, Pool))
+
+    @property
+    def workers(self):
+        r"""
+        Number of workers of the pool/executor (or the number of available cores, if it is not known).
+        """
+        for attr in ['_processes', '_max_workers']:
+            if isinstance(getattr(self.executor, attr, None), int):
+                return getattr(self.executor, attr)
+        return multiprocessing.cpu_count()
+
+    @property
+    def sharedMemory(self):
+        r"""
+        True if the workers are the processes of this machine, so that the states can be transported in shared memory
+        (see :class:`sharedStates`), and False if shared memory is not available (before python 3.8).
+        """
+        if shared_memory is None:
+            return False
+        return ((isinstance(self.executor, Pool) and not isinstance(self.executor, ThreadPool)) or
+                isinstance(self.executor, ProcessPoolExecutor))
+
+    def unordered(self, func, items):
+        r"""
+        Returns an iterator of the ``func(item)`` for the given items, in their completion order.
+        """
+        if not self.isExecutor(self.executor):
+            return self.executor.imap_unordered(func, items, chunksize=1)
+        futures = [self.executor.submit(func, item) for item in items]
+        if all(isinstance(future, Future) for future in futures):
+            return (future.result() for future in as_completed(futures))
+        return (future.result() for future in futures)
+
+    def ordered(self, func, items, chunksize=1):
+        r"""
+        Returns an iterator of the ``func(item)`` for the given items, in their order.
+        """
+        if not self.isExecutor(self.executor):
+            return self.executor.imap(func, items, chunksize=chunksize)
+        return (future.result() for future in [self.executor.submit(func, item) for item in items])
+
+class localExecutor(Executor):
+    r"""
+    A local (single-process) stand-in for the executors of the cluster schedulers, which runs the submitted work units
+    immediately in the current process, but after a pickle round-trip of the function, its arguments, and its result,
+    i.e. exactly as they would be sent to and received from a remote worker.
+    """
+
+    def submit(self, fn, *args, **kwargs): # pylint: disable=arguments-differ
+        future = Future()
+        try:
+            fn, args, kwargs = pickle.loads(pickle.dumps((fn, args, kwargs)))
+            future.set_result(pickle.loads(pickle.dumps(fn(*args, **kwargs))))
+        except BaseException as exc: # pylint: disable=broad-except
+            future.set_exception(exc)
+        return future
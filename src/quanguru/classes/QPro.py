@@ -28,14 +28,23 @@ r"""
     =======================    ==================    ================   ===============
 
 """
+import scipy.sparse as sp # type: ignore
+
 from ..QuantumToolbox import evolution as lio #pylint: disable=relative-beyond-top-level
+from ..QuantumToolbox._helpers import _matrixKey #pylint: disable=relative-beyond-top-level
 from ..QuantumToolbox.operators import identity #pylint: disable=relative-beyond-top-level
+from ..QuantumToolbox.linearAlgebra import applyLocal #pylint: disable=relative-beyond-top-level
+from ..QuantumToolbox.states import mat2Vec, vec2Mat #pylint: disable=relative-beyond-top-level
 
 from .base import qBase, addDecorator
 from .baseClasses import updateBase
 from .QSimBase import _parameter
 from .QSimComp import QSimComp
 from .QSweep import Sweep
+from .QCache import unitaryCache, unitaryProductTree
+from .QPropagators import analyticPropagators
+from .modularSweep import _hasTimeDependency
+from .tempConfig import classConfig
 
 class genericProtocol(QSimComp): # pylint: disable = too-many-instance-attributes
     label = 'genericProtocol'
@@ -57,8 +66,19 @@ class genericProtocol(QSimComp): # pylint: disable = too-many-instance-attribute
         cls.numberOfExponentiations += 1
         return cls.numberOfExponentiations
 
+    #: (**class attribute**) to store number of diagonalisations, incremented by _increaseDiagonalisationCount method
+    numberOfDiagonalisations = 0
+
+    @classmethod
+    def _increaseDiagonalisationCount(cls):
+        r"""
+        This is a classmethod (used internally) to increment the `numberOfDiagonalisations` count.
+        """
+        cls.numberOfDiagonalisations += 1
+        return cls.numberOfDiagonalisations
+
     __slots__ = ['__currentState', '__inProtocol', '__fixed', '__ratio', '__updates', '__dissipator', '_openSys',
-                 '_getUnitary', 'timeDependency', '__identity', 'sampleStates', 'stepSample']
+                 '_getUnitary', 'timeDependency', '__identity', 'sampleStates', 'stepSample', '__floquet']
 
     def __init__(self, **kwargs):
         super().__init__(_internal=kwargs.pop('_internal', False))
@@ -103,6 +123,9 @@ class genericProtocol(QSimComp): # pylint: disable = too-many-instance-attribute
         self.__dissipator = {}
         #: boolean to determine if it is an open-system simulation.
         self._openSys = False
+        #: stores the (content) key of the last one-period unitary and its eigenvalues and eigenvectors, which are
+        #: re-used by :meth:`floquetEigens` as long as the unitary is the same.
+        self.__floquet = (None, None, None)
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
     @property
@@ -193,25 +216,50 @@ class genericProtocol(QSimComp): # pylint: disable = too-many-instance-attribute
         self.simulation._qBase__subSys[self] = self.superSys # pylint: disable=protected-access
 
     def unitary(self):
-        collapseOps = None if not self._isOpen else [ds.jOperMatrix for ds in self._dissipator.keys()]
-        decayRates = None if not self._isOpen else list(self._dissipator.values())
+        # collapse operators of self are collected by getUnitary
         if self.superSys is not None:
             self.superSys._timeDependency() # pylint: disable=no-member
 
         if self._paramUpdated:
             if not self.fixed:
-                self._paramBoundBase__matrix = self.getUnitary(collapseOps, decayRates) # pylint: disable=assigning-non-slot
+                self._paramBoundBase__matrix = self.getUnitary() # pylint: disable=assigning-non-slot
         elif self._paramBoundBase__matrix is None: # pylint: disable=no-member
-            self._paramBoundBase__matrix = self.getUnitary(collapseOps, decayRates) # pylint: disable=assigning-non-slot
+            self._paramBoundBase__matrix = self.getUnitary() # pylint: disable=assigning-non-slot
         return self._paramBoundBase__matrix # pylint: disable=no-member
 
-    def getUnitary(self, collapseOps = None, decayRates = None):
+    def floquetEigens(self):
+        r"""
+        Returns the eigenvalues and eigenvectors of the unitary of this protocol, which is the one-period (Floquet)
+        unitary when the protocol is repeated at every step of the simulation (see
+        :func:`FloquetEigens <quanguru.QuantumToolbox.evolution.FloquetEigens>`). The decomposition is re-used until the
+        unitary changes (e.g. in a parameter sweep).
+        """
+        unitary = self.unitary()
+        key = _matrixKey(unitary)
+        if self._genericProtocol__floquet[0] != key:
+            self._increaseDiagonalisationCount()
+            self._genericProtocol__floquet = (key, *lio.FloquetEigens(unitary)) # pylint: disable=assigning-non-slot
+        return self._genericProtocol__floquet[1:]
+
+    @property
+    def quasiEnergies(self):
+        r"""
+        Returns the (sorted) quasi-energies of this protocol, whose period is the step size of its simulation (see
+        :meth:`floquetEigens`).
+        """
+        return lio.quasiEnergies(self.floquetEigens()[0], self.simulation.stepSize)
+
+    def _collapseOps(self, collapseOps = None, decayRates = None):
         if collapseOps is None:
             collapseOps = None if not self._isOpen else [ds.jOperMatrix for ds in self._dissipator.keys()]
             decayRates = None if not self._isOpen else list(self._dissipator.values())
         else:
             collapseOps = collapseOps + [ds.jOperMatrix for ds in self._dissipator.keys()]
             decayRates = decayRates + list(self._dissipator.values())
+        return collapseOps, decayRates
+
+    def getUnitary(self, collapseOps = None, decayRates = None):
+        collapseOps, decayRates = self._collapseOps(collapseOps, decayRates)
         if self.superSys is not None:
             self.superSys._timeDependency() # pylint: disable=no-member
 
@@ -223,6 +271,47 @@ class genericProtocol(QSimComp): # pylint: disable = too-many-instance-attribute
         self._paramUpdatedToFalse()
         return self._paramBoundBase__matrix # pylint: disable=no-member
 
+    @property
+    def _applyOnly(self):
+        r"""
+        boolean to determine if the state is propagated without forming the unitary of this protocol, which depends on
+        the ``propagator`` of the simulation and is only possible for the protocols that implement ``_applyUnitary``.
+        """
+        return False
+
+    def applyUnitary(self, state, collapseOps = None, decayRates = None, hc = False):
+        r"""
+        Returns the given state propagated by this protocol (or its hermitian conjugate, if ``hc=True``). By default,
+        this is ``unitary() @ state``, and, if ``_applyOnly`` is ``True``, the unitary is not created at all and the
+        ``_applyUnitary`` (in place of ``_createUnitary``) is used to act on the state.
+        """
+        if not self._applyOnly:
+            unitary = self.unitary() if collapseOps is None else self.getUnitary(collapseOps, decayRates)
+            return (self._hc if hc else unitary) @ state
+
+        collapseOps, decayRates = self._collapseOps(collapseOps, decayRates)
+        if self.superSys is not None:
+            self.superSys._timeDependency() # pylint: disable=no-member
+
+        for update in self._genericProtocol__updates:
+            update.setup()
+        lc = 1
+        td = False
+        if len(self.timeDependency.sweeps) > 0:
+            lc = self.timeDependency.indMultip
+            td = True
+
+        for ind in (reversed(range(lc)) if hc else range(lc)):
+            if td:
+                self.timeDependency.runSweep(self.timeDependency._indicesForSweep(ind, *self.timeDependency.inds))
+            state = self._applyUnitary(state, collapseOps, decayRates, hc=hc) # pylint: disable=no-member
+        for update in self._genericProtocol__updates:
+            update.setback()
+        # nothing is stored in apply-only mode, so a (possibly) stored unitary is no longer valid.
+        self._paramBoundBase__matrix = None # pylint: disable=assigning-non-slot
+        self._paramUpdatedToFalse()
+        return state
+
     def _paramUpdatedToFalse(self):
         self._paramBoundBase__paramUpdated = False # pylint: disable=assigning-non-slot
 
@@ -270,11 +359,28 @@ class qProtocol(genericProtocol):
     #: (**class attribute**) number of total instances = _internalInstances + _externalInstances
     _instances: int = 0
 
-    __slots__ = []
+    #: (**class attribute**) if True, the step unitaries are composed by the :attr:`productTree`, which re-computes
+    #: only the products depending on the updated steps, but stores about twice as many (dense) matrices as the
+    #: steps. It is opt-in (False by default), and the unitaries are composed by a plain product otherwise.
+    treeComposition = classConfig['productTree']
+
+    __slots__ = ['__productTree']
     def __init__(self, **kwargs):
         super().__init__(_internal=kwargs.pop('_internal', False))
+        #: segment tree of the partial products of the step unitaries, so that only the products depending on the
+        #: updated steps are re-computed when composing the unitary of the protocol (if ``treeComposition`` is True).
+        self.__productTree = unitaryProductTree()
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
+    @property
+    def productTree(self):
+        r"""
+        Returns the :class:`unitaryProductTree <quanguru.classes.QCache.unitaryProductTree>` used to compose the step
+        unitaries of this protocol (if ``treeComposition`` is True), whose ``stats()`` gives the number of compositions
+        and (saved) multiplications.
+        """
+        return self._qProtocol__productTree
+
     def _paramUpdatedToFalse(self):
         super()._paramUpdatedToFalse()
         for step in self.subSys.values():
@@ -328,14 +434,38 @@ class qProtocol(genericProtocol):
         return vals
 
     def _defCreateUnitary(self, collapseOps = None, decayRates = None):
-        unitary = self._identity(openSys=self._isOpen) # pylint: disable=no-member
+        if not self.treeComposition:
+            # the products stored by an earlier (tree) composition are released
+            self._qProtocol__productTree.clear()
+            unitary = self._identity(openSys=self._isOpen) # pylint: disable=no-member
+            for step in self.steps.values():
+                vals = self._puValues(step, [])
+                unitary = step.getUnitary(collapseOps, decayRates) @ unitary
+                self._puValues(step, vals)
+            return unitary
+        unitaries = []
         for step in self.steps.values():
             vals = self._puValues(step, [])
-            unitary = step.getUnitary(collapseOps, decayRates) @ unitary
+            unitaries.append(step.getUnitary(collapseOps, decayRates))
             self._puValues(step, vals)
-        return unitary
+        # only the partial products of the updated steps are re-computed
+        unitary = self._qProtocol__productTree.product(unitaries)
+        return self._identity(openSys=self._isOpen) if unitary is None else unitary # pylint: disable=no-member
+
+    @property
+    def _applyOnly(self):
+        return any(step._applyOnly for step in self.steps.values())
+
+    def _defApplyUnitary(self, state, collapseOps = None, decayRates = None, hc = False):
+        steps = list(self.steps.values())
+        for step in (reversed(steps) if hc else steps):
+            vals = self._puValues(step, [])
+            state = step.applyUnitary(state, collapseOps, decayRates, hc=hc)
+            self._puValues(step, vals)
+        return state
 
 qProtocol._createUnitary = qProtocol._defCreateUnitary
+qProtocol._applyUnitary = qProtocol._defApplyUnitary
 
 class copyStep(qBase):
     label = 'copyStep'
@@ -377,6 +507,13 @@ class copyStep(qBase):
         self.superSys.unitary()
         return self.superSys._hc if self.hc else self.superSys._paramBoundBase__matrix #pylint:disable=protected-access
 
+    def applyUnitary(self, state, collapseOps = None, decayRates = None, hc = False):
+        return self.superSys.applyUnitary(state, collapseOps, decayRates, hc=(self.hc != hc))
+
+    @property
+    def _applyOnly(self):
+        return self.superSys._applyOnly # pylint: disable=protected-access
+
     @property
     def _isOpen(self):
         return self.superSys._isOpen # pylint: disable=protected-access
@@ -390,23 +527,253 @@ class freeEvolution(genericProtocol):
     #: (**class attribute**) number of total instances = _internalInstances + _externalInstances
     _instances: int = 0
 
-    __slots__ = []
+    #: (**class attribute**) names of the Magnus and commutator-free propagators (see :meth:`magnusExponentiation`)
+    _magnusPropagators = ('magnus2', 'magnus4', 'cf4')
+    #: (**class attribute**) options (method and tolerances) of the ODE solver used by :meth:`integrate`
+    odeOptions = classConfig['odeOptions']
+
+    #: (**class attribute**) tolerance of the (estimated) Trotter error of a step, and the order and the number of
+    #: substeps of the 'trotter' propagator, which are chosen by the error estimate if they are None
+    trotterOptions = classConfig['trotterOptions']
+    #: (**class attribute**) number of threads used by the 'sectors' propagator to exponentiate the blocks
+    sectorWorkers = classConfig['sectorWorkers']
+
+    __slots__ = ['__eigens', '__odeSolver', '__trotter', '__jumpThreshold', 'conserved', 'matrixFree']
 
     def __init__(self, **kwargs):
         super().__init__(_internal=kwargs.pop('_internal', False))
+        #: stores the key (content) of the last diagonalised Hamiltonian together with its eigenvalues and eigenvectors,
+        #: which are used by the 'eigen' propagator to create the unitary for any step size without re-diagonalising.
+        self.__eigens = (None, None, None)
+        #: stores the ODE solver (and the time of the last returned state) used by :meth:`integrate`
+        self.__odeSolver = (None, None)
+        #: stores the key (content) of the last split Hamiltonian and time step together with the order and number of
+        #: substeps used by the 'trotter' propagator
+        self.__trotter = (None, None, None)
+        #: stores the (rescaled) threshold of the squared norm for the next jump of the current quantum trajectory
+        self.__jumpThreshold = None
+        #: if True, the 'krylov' propagator uses the matrix-free (Kronecker-structured) Hamiltonian of the system (see
+        #: :func:`KroneckerHamiltonian <quanguru.QuantumToolbox.evolution.KroneckerHamiltonian>`) for the closed-system
+        #: evolution, so the composite matrices of the terms are never created.
+        self.matrixFree = False
+        #: a (diagonal) conserved operator (or its diagonal) of the Hamiltonian, whose eigen-spaces are used as the
+        #: sectors of the 'sectors' propagator. The sectors are detected automatically, if it is None (or for the
+        #: open systems).
+        self.conserved = None
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
+    def __getstate__(self):
+        # the ODE solver (which wraps local functions) is not pickled, and a new one is created by the next integrate
+        state = super().__getstate__()
+        state['_freeEvolution__odeSolver'] = (None, None)
+        return state
+
+    def _cacheKey(self, *args):
+        r"""
+        Returns the :meth:`key <quanguru.classes.QCache.unitaryCache.key>` of the given inputs, or None (i.e. the
+        exponential is not cached) if the Hamiltonian is time-dependent, meaning a term of the system has a
+        ``timeDependency`` (e.g. a :class:`qDrive <quanguru.classes.QDrive.qDrive>`) or the protocol has a
+        ``timeDependency`` sweep, since such a Hamiltonian gives a new key at every step.
+        """
+        if len(self.timeDependency.sweeps) > 0:
+            return None
+        try:
+            if _hasTimeDependency(self.superSys):
+                return None
+        except AttributeError:
+            # systems without (new) terms are not checked for time-dependency, and are not cached
+            return None
+        return unitaryCache.key(*args)
+
     _freqCoef = 1 #2 * np.pi
     def matrixExponentiation(self, collapseOps = None, decayRates = None):
-        self._increaseExponentiationCount()
         hamiltonian = self.superSys.totalHam if hasattr(self.superSys, 'totalHam') else self.superSys.totalHamiltonian #pylint:disable=no-member
-        unitary = lio.LiouvillianExp(self._freqCoef * hamiltonian, # pylint: disable=no-member
-                                     timeStep=((self.simulation.stepSize*self.ratio)/self.simulation.samples),
-                                     collapseOperators=collapseOps, decayRates=decayRates)
+        timeStep = (self.simulation.stepSize*self.ratio)/self.simulation.samples
+        # exponentials of the same (content) Hamiltonian, collapse operators, rates and time step are re-used
+        key = self._cacheKey('expm', self._freqCoef, hamiltonian, collapseOps, decayRates, timeStep)
+        unitary = unitaryCache.get(key)
+        if unitary is None:
+            # closed-form propagators (if enabled and the system is recognised) are used for the closed-system evolution
+            if not collapseOps:
+                unitary = analyticPropagators.unitary(self.superSys, self._freqCoef * hamiltonian, timeStep)
+            if unitary is None:
+                self._increaseExponentiationCount()
+                unitary = lio.LiouvillianExp(self._freqCoef * hamiltonian, timeStep=timeStep, # pylint: disable=no-member
+                                             collapseOperators=collapseOps, decayRates=decayRates)
+            unitaryCache.add(key, unitary)
         self._paramBoundBase__matrix = unitary # pylint: disable=assigning-non-slot
         return unitary
 
-freeEvolution._createUnitary = freeEvolution.matrixExponentiation
+    def eigenExponentiation(self, collapseOps = None, decayRates = None): #pylint:disable=unused-argument
+        superSys = self.superSys
+        hamiltonian = superSys.totalHam if hasattr(superSys, 'totalHam') else superSys.totalHamiltonian #pylint:disable=no-member
+        hamiltonian = self._freqCoef * hamiltonian
+        key = _matrixKey(hamiltonian)
+        if self._freeEvolution__eigens[0] != key:
+            self._increaseDiagonalisationCount()
+            self._freeEvolution__eigens = (key, *lio.hermitianEigens(hamiltonian)) # pylint: disable=assigning-non-slot
+        unitary = lio.UnitaryEigen(*self._freeEvolution__eigens[1:], sparse=sp.issparse(hamiltonian),
+                                   timeStep=((self.simulation.stepSize*self.ratio)/self.simulation.samples))
+        self._paramBoundBase__matrix = unitary # pylint: disable=assigning-non-slot
+        return unitary
+
+    def magnusExponentiation(self, collapseOps = None, decayRates = None):
+        method = self.simulation.propagator
+        timeStep = (self.simulation.stepSize*self.ratio)/self.simulation.samples
+        endTime = self.simulation._currentTime
+        hamiltonians = [self._hamiltonianAt(endTime - (1 - node)*timeStep) for node in lio.magnusNodes(method)]
+        # parameters are set back to their values at the end of the step
+        self.superSys._timeDependency(endTime) # pylint: disable=no-member
+        key = self._cacheKey(method, hamiltonians, collapseOps, decayRates, timeStep)
+        unitary = unitaryCache.get(key)
+        if unitary is None:
+            self._increaseExponentiationCount()
+            unitary = unitaryCache.add(key, lio.MagnusExp(hamiltonians, timeStep, collapseOps, decayRates, method))
+        self._paramBoundBase__matrix = unitary # pylint: disable=assigning-non-slot
+        return unitary
+
+    def sectorExponentiation(self, collapseOps = None, decayRates = None):
+        r"""
+        Creates the unitary (or exponentiated Liouvillian) by exponentiating the block of each symmetry sector
+        independently (see :func:`SectorExp <quanguru.QuantumToolbox.evolution.SectorExp>`), where the sectors are
+        the eigen-spaces of the :attr:`conserved` operator (if given, for the closed systems) or detected automatically
+        (see :func:`symmetrySectors <quanguru.QuantumToolbox.evolution.symmetrySectors>`). The blocks are
+        exponentiated by ``sectorWorkers`` threads, and the resulting (block-diagonal) matrix is in the full basis.
+        """
+        superSys = self.superSys
+        hamiltonian = superSys.totalHam if hasattr(superSys, 'totalHam') else superSys.totalHamiltonian #pylint:disable=no-member
+        hamiltonian = self._freqCoef * hamiltonian
+        timeStep = (self.simulation.stepSize*self.ratio)/self.simulation.samples
+        # sectors are found (and the conserved operator is checked) before the cache, since they are cheap to find
+        if collapseOps:
+            generator = lio.Liouvillian(hamiltonian, collapseOps, decayRates)
+            sectors = lio.symmetrySectors(generator)
+        else:
+            generator = -1j*hamiltonian
+            sectors = lio.symmetrySectors(generator, self.conserved)
+        key = self._cacheKey('sectors', hamiltonian, collapseOps, decayRates, timeStep)
+        unitary = unitaryCache.get(key)
+        if unitary is None:
+            self._increaseExponentiationCount()
+            unitary = unitaryCache.add(key, lio.SectorExp(generator, sectors, timeStep, self.sectorWorkers))
+        self._paramBoundBase__matrix = unitary # pylint: disable=assigning-non-slot
+        return unitary
+
+    def _defCreateUnitary(self, collapseOps = None, decayRates = None):
+        if self.simulation.propagator == 'sectors':
+            return self.sectorExponentiation(collapseOps, decayRates)
+        if self.simulation.propagator in self._magnusPropagators:
+            return self.magnusExponentiation(collapseOps, decayRates)
+        # eigen-decomposition is used only for the Hermitian Hamiltonians, i.e. not for the Liouvillians.
+        if (self.simulation.propagator == 'eigen') and (not collapseOps):
+            return self.eigenExponentiation()
+        return self.matrixExponentiation(collapseOps, decayRates)
+
+    @genericProtocol._paramUpdated.getter
+    def _paramUpdated(self): # pylint: disable=invalid-overridden-method
+        # Magnus integrators use the Hamiltonians within the step, which are not reflected into the parameters at the
+        # end of the step, so the unitary is re-created (or taken from the unitaryCache) at every step.
+        if self.simulation.propagator in self._magnusPropagators:
+            self._paramBoundBase__paramUpdated = True # pylint: disable=assigning-non-slot
+        return self._paramBoundBase__paramUpdated # pylint: disable=no-member
+
+    @property
+    def _applyOnly(self):
+        return self.simulation.propagator in ('krylov', 'trotter')
+
+    def applyUnitary(self, state, collapseOps = None, decayRates = None, hc = False):
+        # hermitian conjugate of an exponentiated Liouvillian is not its inverse, so it uses the unitary
+        if hc and (self._isOpen or (collapseOps is not None)):
+            if collapseOps is None:
+                self.unitary()
+            else:
+                self.getUnitary(collapseOps, decayRates)
+            return self._hc @ state
+        return super().applyUnitary(state, collapseOps, decayRates, hc)
+
+    def matrixExponentiationAction(self, state, collapseOps = None, decayRates = None, hc = False):
+        timeStep = (self.simulation.stepSize*self.ratio)/self.simulation.samples
+        superSys = self.superSys
+        if self.matrixFree and (not collapseOps) and hasattr(superSys, '_kroneckerTerms'):
+            kroneckerTerms, dimension = superSys._kroneckerTerms, superSys._totalDim # pylint: disable=no-member,protected-access
+            terms = [(self._freqCoef*coef, factors) for coef, factors in kroneckerTerms]
+            return lio.UnitaryAction(lio.KroneckerHamiltonian(terms, dimension), state,
+                                     timeStep=(-timeStep if hc else timeStep),
+                                     HamiltonianTrace=lio._kroneckerTrace(terms, dimension)) # pylint: disable=protected-access
+        hamiltonian = superSys.totalHam if hasattr(superSys, 'totalHam') else superSys.totalHamiltonian #pylint:disable=no-member
+        return lio.LiouvillianExpAction(self._freqCoef * hamiltonian, state, timeStep=(-timeStep if hc else timeStep),
+                                        collapseOperators=collapseOps, decayRates=decayRates)
+
+    def _hamiltonianAt(self, time):
+        self.superSys._timeDependency(time) # pylint: disable=no-member
+        superSys = self.superSys
+        hamiltonian = superSys.totalHam if hasattr(superSys, 'totalHam') else superSys.totalHamiltonian #pylint:disable=no-member
+        return self._freqCoef * hamiltonian
+
+    def trajectoryStep(self, state, rng, restart = False):
+        r"""
+        Returns the given (normalised) ket evolved for a time step of this protocol along a quantum-jump trajectory (see
+        :func:`quantumJumpStep <quanguru.QuantumToolbox.evolution.quantumJumpStep>`) by using the ``jOperMatrix`` and
+        ``jRate`` of the dissipators and the given random number generator ``rng``. The trajectory is continued over
+        the consecutive calls, and a new one is started (i.e. a new jump threshold is drawn) if ``restart=True``.
+        """
+        collapseOps, decayRates = self._collapseOps()
+        state, threshold = lio.quantumJumpStep(self._hamiltonianAt(self.simulation._currentTime), state,
+                                               (self.simulation.stepSize*self.ratio)/self.simulation.samples,
+                                               collapseOps, decayRates, rng,
+                                               None if restart else self._freeEvolution__jumpThreshold)
+        self._freeEvolution__jumpThreshold = threshold # pylint: disable=assigning-non-slot
+        return state
+
+    def integrate(self, state, initialTime = None, collapseOps = None, decayRates = None):
+        r"""
+        Returns the given state evolved for a time step of this protocol by integrating the Schrödinger (or the master)
+        equation with an adaptive step-size ODE solver (see ``odeOptions`` and
+        :func:`evolveODE <quanguru.QuantumToolbox.evolution.evolveODE>`). The ``timeDependency`` functions of the terms
+        are called at the times chosen by the solver, so a time-dependent Hamiltonian is not approximated as
+        piecewise-constant. The same solver is continued over the consecutive calls, and a new one is created (starting
+        from the given state) if an ``initialTime`` is given.
+        """
+        collapseOps, decayRates = self._collapseOps(collapseOps, decayRates)
+        if (collapseOps is None) and (state.shape[0] == state.shape[1]):
+            collapseOps, decayRates = [], []
+        if (initialTime is not None) or (self._freeEvolution__odeSolver[0] is None):
+            initialTime = self.simulation._currentTime if initialTime is None else initialTime
+            solver = lio._odeSolver(self._hamiltonianAt, state, initialTime, collapseOps, decayRates, # pylint: disable=protected-access
+                                    **self.odeOptions)
+            self._freeEvolution__odeSolver = (solver, initialTime) # pylint: disable=assigning-non-slot
+        solver, time = self._freeEvolution__odeSolver
+        time += (self.simulation.stepSize*self.ratio)/self.simulation.samples
+        state = lio._odeStep(solver, time, state.shape, sp.issparse(state)) # pylint: disable=protected-access
+        self._freeEvolution__odeSolver = (solver, time) # pylint: disable=assigning-non-slot
+        # parameters are set back to their values at the time of the returned state
+        self.superSys._timeDependency(time) # pylint: disable=no-member
+        return state
+
+    def trotterAction(self, state, collapseOps = None, decayRates = None, hc = False):
+        timeStep = (self.simulation.stepSize*self.ratio)/self.simulation.samples
+        terms = self.superSys._termMatrices # pylint: disable=no-member,protected-access
+        diagonal, groups = lio.splitHamiltonian([self._freqCoef * ham for ham in terms])
+        key = unitaryCache.key(diagonal, groups, timeStep)
+        if self._freeEvolution__trotter[0] != key:
+            order, substeps = self.trotterOptions['order'], self.trotterOptions['substeps']
+            if (order is None) or (substeps is None):
+                estOrder, estSubsteps = lio.trotterParameters(diagonal, groups, timeStep,
+                                                              self.trotterOptions['tolerance'])
+                order = estOrder if order is None else order
+                substeps = estSubsteps if substeps is None else substeps
+            self._freeEvolution__trotter = (key, order, substeps) # pylint: disable=assigning-non-slot
+        return lio.TrotterAction(diagonal, groups, state, timeStep=(-timeStep if hc else timeStep),
+                                 order=self._freeEvolution__trotter[1], substeps=self._freeEvolution__trotter[2])
+
+    def _defApplyUnitary(self, state, collapseOps = None, decayRates = None, hc = False):
+        # split-operator is used only for the closed systems, i.e. not for the Liouvillians.
+        if (self.simulation.propagator == 'trotter') and (not collapseOps) and hasattr(self.superSys, '_termMatrices'):
+            return self.trotterAction(state, hc=hc)
+        return self.matrixExponentiationAction(state, collapseOps, decayRates, hc)
+
+freeEvolution._createUnitary = freeEvolution._defCreateUnitary
+freeEvolution._applyUnitary = freeEvolution._defApplyUnitary
 
 class Gate(genericProtocol):
     label = 'Gate'
@@ -417,6 +784,14 @@ class Gate(genericProtocol):
     #: (**class attribute**) number of total instances = _internalInstances + _externalInstances
     _instances: int = 0
 
+    #: (**class attribute**) boolean to determine if the gates (that have local operators, see
+    #: :meth:`_localOperators`) are applied to the states locally, i.e. by contracting only the local operators with
+    #: the reshaped states (see :func:`applyLocal <quanguru.QuantumToolbox.linearAlgebra.applyLocal>`), instead of
+    #: creating their unitaries in the full Hilbert space. It is opt-in (``classConfig['localGates']`` is False), since
+    #: a protocol with such a gate then applies its steps one by one, i.e. it does not compose its unitary by the
+    #: (opt-in) product tree and it is not evolved by its Floquet modes.
+    localApplication = classConfig['localGates']
+
     __slots__ = ['__implementation']
 
     def __init__(self, **kwargs):
@@ -424,6 +799,27 @@ class Gate(genericProtocol):
         self.__implementation = None
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
+    def _localOperators(self):
+        r"""
+        Returns a list of (operator, dimsBefore, dimsAfter) tuples of the local operators of the gate (applied in the
+        given order) or None, if the gate does not have such local operators, which is the case for the generic gate.
+        """
+        return None
+
+    @property
+    def _applyOnly(self):
+        return self.localApplication and (self._localOperators() is not None)
+
+    def _localApplyUnitary(self, state, collapseOps = None, decayRates = None, hc = False): #pylint:disable=unused-argument
+        localOps = self._localOperators()
+        dimension = localOps[0][1]*localOps[0][0].shape[0]*localOps[0][2]
+        # open-system states are vectorised density matrices
+        vectorised = (dimension > 1) and (state.shape == (dimension**2, 1))
+        state = vec2Mat(state) if vectorised else state
+        for operator, dimsBefore, dimsAfter in (reversed(localOps) if hc else localOps):
+            state = applyLocal(operator.conj().T if hc else operator, state, dimsBefore, dimsAfter)
+        return mat2Vec(state) if vectorised else state
+
     @property
     def system(self):
         return list(self.subSys.values())
@@ -453,6 +849,8 @@ class Gate(genericProtocol):
     def implementation(self, typeStr):
         self._Gate__implementation = typeStr # pylint: disable=assigning-non-slot
 
+Gate._applyUnitary = Gate._localApplyUnitary
+
 class Update(updateBase):
     label = 'Update'
     #: (**class attribute**) number of instances created internally by the library
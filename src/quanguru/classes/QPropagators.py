@@ -0,0 +1,205 @@
+r"""
+    Contains the :class:`analyticPropagators` class, a registry of the closed-form propagators that are used (by
+    :class:`freeEvolution <quanguru.classes.QPro.freeEvolution>`) instead of the matrix exponentiation when the
+    structure of a quantum system is recognised.
+
+    .. currentmodule:: quanguru.classes.QPropagators
+
+    .. autosummary::
+
+        analyticPropagators
+
+    .. |c| unicode:: U+2705
+    .. |x| unicode:: U+274C
+    .. |w| unicode:: U+2000
+
+    =======================    ==================    ================   ===============
+       **Function Name**        **Docstrings**        **Unit Tests**     **Tutorials**
+    =======================    ==================    ================   ===============
+      `analyticPropagators`      |w| |w| |w| |c|       |w| |w| |c|        |w| |w| |x|
+    =======================    ==================    ================   ===============
+
+"""
+
+from collections import OrderedDict
+
+from ..QuantumToolbox import evolution as lio #pylint: disable=relative-beyond-top-level
+from ..QuantumToolbox import operators as qOps #pylint: disable=relative-beyond-top-level
+from .tempConfig import classConfig
+
+#: operators with diagonal matrix representations
+_diagonalOperators = (qOps.number, qOps.sigmaz, qOps.Jz)
+#: operators of a (single) qubit rotation
+_rotationOperators = (qOps.sigmax, qOps.sigmay, qOps.sigmaz, qOps.Jx, qOps.Jy, qOps.Jz)
+#: (unordered) operator pairs of the (rotating-wave) Jaynes-Cummings coupling
+_jcCouplings = (frozenset((qOps.destroy, qOps.Jp)), frozenset((qOps.create, qOps.Jm)),
+                frozenset((qOps.destroy, qOps.sigmap)), frozenset((qOps.create, qOps.sigmam)))
+
+def _isQuantumSystem(qsys):
+    r"""
+    Returns True if the given object has the (term) structure of a :class:`QuantumSystem`.
+    """
+    return hasattr(qsys, '_QuantumSystem__compSys') and hasattr(qsys, 'terms')
+
+def _termOperators(term):
+    r"""
+    Returns a list of (operator, order) pairs of the given term.
+    """
+    if isinstance(term.operator, (list, tuple)):
+        return list(zip(term.operator, term.order))
+    return [(term.operator, term.order)]
+
+def _singleTerms(qsys):
+    r"""
+    Returns the list of (operator, order) pairs of the terms of a single (i.e. not composite) system, or None if any
+    frequency is not real or if there is no term.
+    """
+    terms = list(qsys.terms.values())
+    if (len(terms) == 0) or any(not isinstance(term.frequency, (int, float)) for term in terms):
+        return None
+    return [pair for term in terms for pair in _termOperators(term)]
+
+def _allSingleTerms(qsys):
+    r"""
+    Returns the (operator, order) pairs of the terms of the given system and (recursively) of its sub-systems, or None
+    if the system has any coupling term or if any frequency is not real.
+    """
+    if not _isQuantumSystem(qsys):
+        return None
+    if not qsys._QuantumSystem__compSys: #pylint:disable=protected-access
+        return _singleTerms(qsys)
+    if len(qsys.terms) > 0:
+        return None
+    pairs = []
+    for subSys in qsys.subSys.values():
+        subPairs = _allSingleTerms(subSys)
+        if subPairs is None:
+            return None
+        pairs.extend(subPairs)
+    return pairs
+
+def _isHarmonicOscillator(qsys):
+    r"""
+    Matches a single (free) harmonic oscillator, i.e. a non-composite system with only the (first-order) number terms.
+    """
+    pairs = _allSingleTerms(qsys) if _isQuantumSystem(qsys) and not qsys._QuantumSystem__compSys else None #pylint:disable=protected-access
+    return (pairs is not None) and all((op is qOps.number) and (order == 1) for op, order in pairs)
+
+def _isDiagonal(qsys):
+    r"""
+    Matches (composite) systems without any coupling and only with number, :math:`\hat{\sigma}_{z}`, and
+    :math:`\hat{J}_{z}` terms, i.e. with diagonal Hamiltonians.
+    """
+    pairs = _allSingleTerms(qsys)
+    return (pairs is not None) and all(op in _diagonalOperators for op, _ in pairs)
+
+def _isQubitRotation(qsys):
+    r"""
+    Matches a single qubit with (first-order) Pauli/spin-1/2 terms and real frequencies.
+    """
+    if (not _isQuantumSystem(qsys)) or qsys._QuantumSystem__compSys or (qsys.dimension != 2): #pylint:disable=protected-access
+        return False
+    pairs = _singleTerms(qsys)
+    return (pairs is not None) and all((op in _rotationOperators) and (order == 1) for op, order in pairs)
+
+def _isJaynesCummings(qsys):
+    r"""
+    Matches the (resonant or detuned) Jaynes-Cummings model, i.e. a composite of a cavity (with number terms) and a
+    qubit (with :math:`\hat{\sigma}_{z}`/:math:`\hat{J}_{z}` terms) coupled only by the rotating-wave terms.
+    """
+    if (not _isQuantumSystem(qsys)) or (not qsys._QuantumSystem__compSys) or (len(qsys.subSys) != 2): #pylint:disable=protected-access
+        return False
+    if len(qsys.terms) == 0:
+        return False
+    for term in qsys.terms.values():
+        if ((not isinstance(term.frequency, (int, float))) or (not isinstance(term.operator, (list, tuple))) or
+                (list(term.order) != [1, 1]) or (frozenset(term.operator) not in _jcCouplings)):
+            return False
+    pairs = [_allSingleTerms(subSys) for subSys in qsys.subSys.values()]
+    if any((subPairs is None) or (len(subPairs) == 0) for subPairs in pairs):
+        return False
+    operators = [{op for op, _ in subPairs} for subPairs in pairs]
+    cavity, qubit = {qOps.number}, {qOps.sigmaz, qOps.Jz}
+    return any((ops1 <= cavity) and (ops2 <= qubit) for ops1, ops2 in (operators, operators[::-1]))
+
+def _twoLevelUnitary(hamiltonian, timeStep):
+    r"""
+    Returns the closed-form unitary of a Hamiltonian with (at most) two-dimensional symmetry sectors, or None if there
+    is a larger sector.
+    """
+    sectors = lio.symmetrySectors(hamiltonian)
+    if any(len(sector) > 2 for sector in sectors):
+        return None
+    return lio.UnitaryTwoLevel(hamiltonian, sectors, timeStep)
+
+class analyticPropagators:
+    r"""
+    A registry of closed-form propagators. Each entry pairs a ``matcher``, which recognises a quantum system from the
+    operators, orders, and frequencies of its terms, with a ``propagator``, which creates the unitary from the
+    Hamiltonian (matrix) and the time step (and returns None, if it is not applicable after all). The entries are
+    tried in the order they are registered, and the first match is used by :meth:`unitary`. Free harmonic
+    oscillators, diagonal Hamiltonians, qubit rotations, and the Jaynes-Cummings model are registered by default.
+
+    The registry is at the class level and can be extended by :meth:`register` (or reduced by :meth:`unregister`).
+    The closed forms are opt-in, i.e. they are used (by the ``'expm'`` propagator) only if ``enabled`` is set to True
+    (default is ``classConfig['analyticPropagators']``, which is False), since they change the numerics of ``'expm'``.
+    Number of times each propagator is used is stored in the ``uses`` dictionary.
+    """
+    #: (**class attribute**) boolean to enable/disable the use of the closed-form propagators
+    enabled = classConfig['analyticPropagators']
+    #: (**class attribute**) dictionary of the number of times each propagator is used
+    uses = {}
+    #: (**class attribute**) ordered dictionary of the registered (matcher, propagator) pairs
+    _registry = OrderedDict()
+
+    @classmethod
+    def register(cls, name, matcher, propagator):
+        r"""
+        Registers (or replaces) a closed-form ``propagator(hamiltonian, timeStep)`` to be used for the quantum systems
+        for which ``matcher(qsys)`` returns True.
+        """
+        cls._registry[name] = (matcher, propagator)
+        cls.uses.setdefault(name, 0)
+
+    @classmethod
+    def unregister(cls, name):
+        r"""
+        Removes the propagator with the given name from the registry.
+        """
+        cls._registry.pop(name)
+
+    @classmethod
+    def match(cls, qsys):
+        r"""
+        Returns the name of the first registered propagator that matches the given quantum system, or None.
+        """
+        for name, (matcher, _) in cls._registry.items():
+            if matcher(qsys):
+                return name
+        return None
+
+    @classmethod
+    def unitary(cls, qsys, hamiltonian, timeStep):
+        r"""
+        Returns the closed-form unitary for the given quantum system and its Hamiltonian (matrix), or None if the
+        closed forms are disabled or no registered propagator applies.
+        """
+        name = cls.match(qsys) if cls.enabled else None
+        if name is None:
+            return None
+        unitary = cls._registry[name][1](hamiltonian, timeStep)
+        if unitary is not None:
+            cls.uses[name] += 1
+        return unitary
+
+    @classmethod
+    def resetUses(cls):
+        r"""
+        Sets the number of uses of every propagator to zero.
+        """
+        cls.uses = {name: 0 for name in cls._registry}
+
+analyticPropagators.register('harmonicOscillator', _isHarmonicOscillator, lio.UnitaryDiagonal)
+analyticPropagators.register('diagonal', _isDiagonal, lio.UnitaryDiagonal)
+analyticPropagators.register('qubitRotation', _isQubitRotation, lio.UnitaryRotation)
+analyticPropagators.register('JaynesCummings', _isJaynesCummings, _twoLevelUnitary)
@@ -294,6 +294,21 @@ class qResults(qResBase):
         for key1, val1, in valUni.states.items():
             qResults._allResults[keyUni]._qResBase__states[key1].append(val1) # pylint: disable=no-member
 
+    @staticmethod
+    def _organiseAt(keyUni, valUni, ind, count):
+        r"""
+        Counterpart of :meth:`~_organise` for the results that are streamed in their completion order (see
+        :func:`paralEvol <quanguru.classes.modularSweep.paralEvol>`), which writes the results/states of the sweep point
+        ``ind`` into its position in the (``count`` long) lists, so that the results do not need to be collected first.
+        """
+        qRes = qResults._allResults[keyUni]
+        stores = (qRes._qResBase__results, qRes._qResBase__states) # pylint: disable=no-member,protected-access
+        for store, values in zip(stores, (valUni.resultsDict, valUni.states)):
+            for key, val in values.items():
+                if len(store[key]) < count:
+                    store[key].extend([None]*(count - len(store[key])))
+                store[key][ind] = val
+
     def _organiseSingleProcRes(self):
         r"""
         organising the single-process results by simply calling :meth:`~_organise` on every qResults instance in
@@ -22,14 +22,15 @@
 
 """
 
-import sys
-import platform
 import multiprocessing
+from multiprocessing.pool import ThreadPool
 
 from .base import _recurseIfList, named
 from .QSimBase import timeBase
 from .QSweep import Sweep
-from .modularSweep import runSimulation
+from .QPool import workerPool, threadBudget, sweepExecutor
+from .tempConfig import classConfig
+from .modularSweep import runSimulation, _changedOnly
 from .modularSweep import timeEvolBase
 # pylint: disable = cyclic-import
 
@@ -66,7 +67,8 @@ class Simulation(timeBase):
     #: class, but by re-assigning this class attribute, you can change the evolution method for all the future instances
     _evolFuncDefault = timeEvolBase
 
-    __slots__ = ['Sweep', 'timeDependency', 'evolFunc', '__index']
+    __slots__ = ['Sweep', 'timeDependency', 'evolFunc', '__index', 'batched', 'trajectories', 'seed', 'floquet',
+                 'progress', 'sweepCost', 'chunkSize', 'checkpoint', 'checkpointInterval']
 
     # TODO init error decorators or error decorators for some methods
     def __init__(self, system=None, **kwargs):
@@ -100,11 +102,56 @@ class Simulation(timeBase):
         #: by matrix exponentiation or the time-dependency is not incorporated by ``timeDependency``.
         self.evolFunc = Simulation._evolFuncDefault
 
+        #: if True, the sweep points are evolved together by the vectorised sweep engine (see
+        #: :func:`batchedEvol <quanguru.classes.modularSweep.batchedEvol>`) instead of one by one (or by a process
+        #: pool), which is used only for time-independent closed systems and falls back to the default otherwise.
+        self.batched = False
+
+        #: if set (to an integer), the open systems are evolved by this number of quantum-jump trajectories at each
+        #: sweep point and the averages of the compute results are stored (see
+        #: :func:`trajectoryEvol <quanguru.classes.modularSweep.trajectoryEvol>`), instead of evolving density matrices.
+        self.trajectories = None
+        #: seed (or entropy) used to spawn the independent random number streams of the trajectories, a random one is
+        #: used for each run if None.
+        self.seed = None
+
+        #: if True, the unitaries of the (periodic) protocols are diagonalised once at each sweep point and the states
+        #: of all the steps are obtained together from the Floquet modes (see
+        #: :func:`floquetEvol <quanguru.classes.modularSweep.floquetEvol>`), instead of a matrix-vector product at
+        #: every step. It is used only for closed systems without time-dependency and falls back to the default
+        #: otherwise.
+        self.floquet = False
+
+        #: optional callback called (in the main process) after each completed sweep point (or chunk of points, in
+        #: multi-processing) with the number of completed points, total number of points, and the estimated remaining
+        #: time in seconds.
+        self.progress = None
+        #: optional function of the sweep index returning the (relative) cost estimate of a sweep point, which is used
+        #: by :func:`paralEvol <quanguru.classes.modularSweep.paralEvol>` to start the costly points first. If None,
+        #: the cost is estimated from the swept dimensions.
+        self.sweepCost = None
+        #: number of sweep points sent to a worker at once in multi-processing. If None, the chunks are adaptive, i.e.
+        #: larger at the start and smaller towards the end of the sweep.
+        self.chunkSize = None
+
+        #: path of the (local) file where the results and states of the completed sweep points are saved periodically
+        #: (see :class:`sweepCheckpoint <quanguru.classes.QCheckpoint.sweepCheckpoint>`), so that an interrupted run
+        #: can be resumed (see :meth:`run`). No checkpoint is saved, if it is None.
+        self.checkpoint = None
+        #: minimum time (in seconds) between two saves of the checkpoint
+        self.checkpointInterval = classConfig['checkpointInterval']
+
         if system is not None:
             self.addQSystems(system)
 
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
+    def __getstate__(self):
+        # callbacks are used only in the main process (and they are usually local functions), so they are not pickled
+        state = super().__getstate__()
+        state['progress'] = state['sweepCost'] = None
+        return state
+
     @property
     def _currentTime(self):
         r"""
@@ -327,31 +374,44 @@ class Simulation(timeBase):
                     self.qRes.states[protocol.name+'Results'].append(protocol.currentState)
         super()._computeBase__compute(states) # pylint: disable=no-member
 
-    def run(self, p=None, coreCount=None, resetRes=True):
+    def run(self, p=None, coreCount=None, resetRes=True, resume=False):
         r"""
         Call this function to run the simulation. It runs certain other preparation before running the simulation.
 
         Parameters
         ----------
-        p : Boolean
-            If ``True`` uses multiprocessing to run sweeps
+        p : Boolean or str
+            If ``True`` uses multiprocessing to run sweeps (in the persistent
+            :class:`workerPool <quanguru.classes.QPool.workerPool>`, if it is started), and if ``'threads'`` uses a
+            thread pool (with the cores split between the threads and the BLAS threads). It can also be any
+            ``concurrent.futures.Executor`` compatible object, e.g. a process/thread pool executor or the executor of
+            a cluster scheduler
         coreCount: int
-            Number of cores used for multiprocessing, uses `` (avaliable number of cores) - 1`` as default.
+            Number of cores used for multiprocessing, uses `` (avaliable number of cores) - 1`` as default (or all the
+            cores for ``'threads'``).
         resetRes: Boolean
             If ``False``, does not delete the results from the previous run of the simulation. ``True`` by default.
+        resume: Boolean or str
+            If ``True``, the sweep points that are completed in the ``checkpoint`` file (of an interrupted run of the
+            same sweep) are not evolved again, but their saved results are used. If it is a path, it is used as the
+            ``checkpoint``. A new checkpoint is started, if the file does not exist. ``False`` by default.
         """
+        if isinstance(resume, str):
+            self.checkpoint = resume
         if len(self.subSys.values()) == 0:
             self.addQSystems(self.superSys)
         self._freeEvol()
-        for qSys in self.subSys.values():
-            qSys._constructMatrices() # pylint: disable=protected-access
+        for protocol, qSys in self.subSys.items():
+            # matrices of the systems of the matrix-free protocols are created only on demand
+            if not getattr(protocol, 'matrixFree', False):
+                qSys._constructMatrices() # pylint: disable=protected-access
         for protocol in self.subSys.keys():
             protocol.prepare()
-        self.Sweep.prepare()
+        self.Sweep.prepare(changedOnly=_changedOnly(self))
         if resetRes:
             for qres in self.qRes.allResults.values():
                 qres._reset() # pylint: disable=protected-access
-        _poolMemory.run(self, p, coreCount)
+        _poolMemory.run(self, p, coreCount, bool(resume))
         for key, val in self.qRes.states.items():
             self.qRes.allResults[key]._qResBase__states[key] = val
         # TODO Test this
@@ -372,46 +432,88 @@ class _poolMemory: # pylint: disable=too-few-public-methods
     #: boolean to ensure that the library does not try setting set_start_method to fork when a simulation is re-run.
     reRun = False
 
+    @staticmethod
+    def _workload(qSim):
+        r"""
+        Returns the (largest) system dimension and the number of parallel work units (trajectories of each sweep point,
+        or the sweep points) of the simulation, which are used to split the cores (see
+        :meth:`split <quanguru.classes.QPool.threadBudget.split>`).
+        """
+        dimension = max((getattr(qsys, 'dimension', 1) for qsys in qSim.subSys.values()), default=1)
+        return dimension, (qSim.trajectories or qSim.Sweep.indMultip)
+
+    @classmethod
+    def _budgetedPool(cls, qSim):
+        r"""
+        Creates a process pool with the number of workers split (see
+        :meth:`split <quanguru.classes.QPool.threadBudget.split>`) from the system dimension and the sweep size, using
+        all but one of the available cores, and the BLAS threads of each worker limited to the rest of its share.
+        """
+        cores = max(1, multiprocessing.cpu_count()-1)
+        workers, _ = threadBudget.split(*cls._workload(qSim), cores)
+        return threadBudget.processPool(workers, cores)
+
     @classmethod
-    def run(cls, qSim, p, coreCount): # pylint: disable=too-many-branches
+    def run(cls, qSim, p, coreCount, resume=False): # pylint: disable=too-many-branches
         r"""
-        This is the only method in the class, and it carries the tasks described in the class description.
+        This is the only method in the class, and it carries the tasks described in the class description. If the
+        persistent :class:`workerPool <quanguru.classes.QPool.workerPool>` is started, it is used (and not closed)
+        unless ``p`` is False or a pool. If ``p`` is an ``Executor`` (see
+        :class:`sweepExecutor <quanguru.classes.QPool.sweepExecutor>`), it is used as it is (and not shut down). If
+        ``p`` is ``'threads'``, the sweep is run by a thread pool, and the cores (``coreCount``, or all the available
+        cores) are split between the threads and the BLAS threads of each matrix operation (see
+        :class:`threadBudget <quanguru.classes.QPool.threadBudget>`). The default process pools (``p=True`` without a
+        ``coreCount``, or with ``'all'``) are split in the same way, and the BLAS threads of the worker processes are
+        limited to their share of the cores.
         """
-        if ((platform.system() != 'Windows') and (cls.reRun is False)):
+        if cls.reRun is False:
             cls.reRun = True
-            if sys.version_info[1] >= 8:
-                try:
-                    #multiprocessing.get_start_method() != 'fork'
-                    multiprocessing.set_start_method("fork")
-                except: #pylint:disable=bare-except # noqa: E722
-                    pass
-
-        if p is True:
+            workerPool._setStartMethod() # pylint: disable=protected-access
+
+        blasLimits = None
+        if workerPool.active() and ((p is True) or (p is None)):
+            _pool = workerPool.start()
+            workerPool.runs += 1
+        elif p is True:
             if coreCount is None:
                 if _poolMemory.coreCount is None:
-                    _pool = multiprocessing.Pool(processes=multiprocessing.cpu_count()-1) #pylint:disable=consider-using-with
+                    _pool = cls._budgetedPool(qSim)
                 else:
-                    _pool = multiprocessing.Pool(processes=_poolMemory.coreCount) #pylint:disable=consider-using-with
+                    _pool = threadBudget.processPool(_poolMemory.coreCount)
             elif isinstance(coreCount, int):
-                _pool = multiprocessing.Pool(processes=coreCount) #pylint:disable=consider-using-with
+                _pool = threadBudget.processPool(coreCount)
             elif coreCount.lower() == 'all':
-                _pool = multiprocessing.Pool(processes=multiprocessing.cpu_count()-1) #pylint:disable=consider-using-with
+                _pool = cls._budgetedPool(qSim)
             else:
                 # FIXME should raise error
                 print('error')
         elif p is False:
             _pool = None
+        elif sweepExecutor.isExecutor(p):
+            # executors are created (and shut down) by the user
+            _pool = p
+        elif isinstance(p, str) and (p.lower() == 'threads'):
+            # threads share the BLAS of the process, so its threads are limited for the duration of the run
+            workers, blasThreads = threadBudget.split(*cls._workload(qSim),
+                                                      coreCount if isinstance(coreCount, int) else None)
+            _pool = ThreadPool(processes=workers) #pylint:disable=consider-using-with
+            blasLimits = threadBudget.limit(blasThreads)
         elif p is not None:
             # FIXME if p is not a pool, this should raise error
-            _pool = multiprocessing.Pool(processes=p._processes) # pylint: disable=protected-access,consider-using-with
+            _pool = threadBudget.processPool(p._processes) # pylint: disable=protected-access
         elif p is None:
             if _poolMemory.coreCount is not None:
-                _pool = multiprocessing.Pool(processes=_poolMemory.coreCount) #pylint:disable=consider-using-with
+                _pool = threadBudget.processPool(_poolMemory.coreCount)
             else:
                 _pool = None
-        runSimulation(qSim, _pool)
-
-        if _pool is not None:
-            _poolMemory.coreCount = _pool._processes # pylint: disable=protected-access
+        try:
+            runSimulation(qSim, _pool, resume)
+        finally:
+            if blasLimits is not None:
+                blasLimits.restore_original_limits()
+
+        if (_pool is not None) and (not workerPool.owns(_pool)) and (_pool is not p):
+            if not isinstance(_pool, ThreadPool):
+                _poolMemory.coreCount = _pool._processes # pylint: disable=protected-access
             _pool.close()
             _pool.join()
@@ -31,7 +31,7 @@ from typing import Any, cast
 from numpy import ndarray, integer
 from scipy.sparse import spmatrix
 
-from quanguru.classes.exceptions import checkNotVal
+from quanguru.classes.exceptions import checkNotVal, checkVal
 from .baseClasses import computeBase, paramBoundBase
 from .tempConfig import classConfig
 
@@ -312,7 +312,10 @@ class timeBase(stateBase):
     #: (**class attribute**) number of total instances = _internalInstances + _externalInstances
     _instances: int = 0
 
-    __slots__ = ['__totalTime', '__stepSize', '__samples', '__stepCount', '__bound']
+    #: (**class attribute**) names of the available methods to propagate the states of protocols (see ``propagator``)
+    _propagators = ('expm', 'krylov', 'eigen', 'magnus2', 'magnus4', 'cf4', 'trotter', 'sectors')
+
+    __slots__ = ['__totalTime', '__stepSize', '__samples', '__stepCount', '__bound', '__propagator']
 
     def __init__(self, **kwargs):
         super().__init__(_internal=kwargs.pop('_internal', False))
@@ -324,6 +327,8 @@ class timeBase(stateBase):
         self.__samples = _parameter(1)
         #: _parameter storing the number of steps, i.e totalTime/stepSize.
         self.__stepCount = _parameter()
+        #: _parameter storing the name of the method used to propagate the states, by default classConfig['propagator']
+        self.__propagator = _parameter(classConfig['propagator'])
         #: if bound to another object, meaning the _parameters of this gets their value from the others _parameters,
         #: this attribute is a reference to another. Else None.
         self.__bound = None
@@ -413,6 +418,40 @@ class timeBase(stateBase):
     def samples(self, num):
         setAttrParam(self, '_timeBase__samples', num)
 
+    @property
+    def propagator(self):
+        r"""
+        gets and sets ``_timeBase__propagator.value``, which is the name of the method used to propagate the states of
+        the protocols, and also sets :meth:`_paramUpdated <quanguru.classes.computeBase.paramBoundBase._paramUpdated>`
+        to ``True``. ``'expm'`` (default) creates the (exponentiated) unitary of a protocol and multiplies it with the
+        state, where the unitary of a recognised closed system is created by its closed form instead of the
+        exponentiation only if the closed forms are enabled (see :class:`analyticPropagators
+        <quanguru.classes.QPropagators.analyticPropagators>`, disabled by default), whereas ``'krylov'`` computes only
+        the action of the exponential on the state (see :func:`LiouvillianExpAction
+        <quanguru.QuantumToolbox.evolution.LiouvillianExpAction>`) without ever forming the unitary. ``'eigen'``
+        diagonalises the Hamiltonian once (for each distinct Hamiltonian) and creates the unitary for any step size
+        from the eigen-decomposition, so that sweeps of ``stepSize``, ``totalTime``, or ``samples`` do not require any
+        further exponentiation (open systems still use ``'expm'``). ``'magnus2'``, ``'magnus4'``, and ``'cf4'`` use the
+        Hamiltonians at the quadrature nodes within each step (see
+        :func:`MagnusExp <quanguru.QuantumToolbox.evolution.MagnusExp>`) to integrate time-dependent Hamiltonians with
+        much larger step sizes. ``'trotter'`` computes (without creating the unitary) the action of a Trotter-Suzuki
+        product of the exponentials of the diagonal and non-diagonal term groups (see
+        :func:`TrotterAction <quanguru.QuantumToolbox.evolution.TrotterAction>`, open systems use ``'krylov'``).
+        ``'sectors'`` exponentiates the block of each symmetry sector (e.g. of the excitation number or the parity)
+        of the Hamiltonian or Liouvillian independently (see
+        :meth:`sectorExponentiation <quanguru.classes.QPro.freeEvolution.sectorExponentiation>`). Explicitly setting
+        the propagator of a protocol breaks its bound, so that a Simulation can use a different method for each
+        protocol.
+        """
+        return self._timeBase__propagator.value
+
+    @propagator.setter
+    def propagator(self, method):
+        checkVal(method in self._propagators, True, f"propagator has to be one of {self._propagators}, not {method}")
+        if method != self._timeBase__propagator.value:
+            self._paramUpdated = True
+        self._timeBase__propagator.value = method
+
     def _copyVals(self, other, keys):
         r"""
         Method to copy the values for given attributes (as keys) from ``other`` to ``self``.
@@ -496,6 +535,10 @@ class timeBase(stateBase):
                         getattr(self, key)._bound = getattr(other, key) # pylint: disable=protected-access
                 except AttributeError:
                     print('not bounding', key)
+            # explicitly set propagators are kept even when re-bounding, so that a step can keep its own method
+            if ((self._timeBase__propagator._bound is None) or # pylint: disable=protected-access # noqa: W504
+                    (re and (self._timeBase__propagator._bound is not False))): # pylint: disable=protected-access
+                self._timeBase__propagator._bound = other._timeBase__propagator # pylint: disable=protected-access
 
     def delMatrices(self, _exclude=[]): # pylint: disable=dangerous-default-value
         if self not in _exclude:
@@ -88,11 +88,12 @@ class QSimComp(computeBase):
         """
         return self._QSimComp__simulation
 
-    def runSimulation(self, p=None, coreCount=None):
+    def runSimulation(self, p=None, coreCount=None, resume=False):
         r"""
-        an alternative to run the simulation, equivalent to ``self.simulation.run()``
+        an alternative to run the simulation, equivalent to ``self.simulation.run()`` (see
+        :meth:`Simulation.run <quanguru.classes.QSim.Simulation.run>` for ``p``, ``coreCount``, and ``resume``)
         """
-        return self._QSimComp__simulation.run(p=p, coreCount=coreCount)
+        return self._QSimComp__simulation.run(p=p, coreCount=coreCount, resume=resume)
 
     @property
     def _initialStateInput(self):
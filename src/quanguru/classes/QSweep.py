@@ -25,6 +25,7 @@ r"""
 """
 
 from functools import reduce
+import numpy as np # type: ignore
 from numpy import arange, logspace
 
 from .base import qBase, _recurseIfList
@@ -58,7 +59,8 @@ class _sweep(updateBase): # pylint: disable=too-many-instance-attributes
     #: (**class attribute**) number of total instances = _internalInstances + _externalInstances
     _instances: int = 0
 
-    __slots__ = ['sweepMax', 'sweepMin', 'sweepStep', '_sweepList', 'logSweep', 'combinatorial', '_sweepIndex']
+    __slots__ = ['sweepMax', 'sweepMin', 'sweepStep', '_sweepList', 'logSweep', 'combinatorial', '_sweepIndex',
+                 'refineKey', 'refineBudget', 'refineTolerance', 'refineMetric', 'refinedList']
 
     #@sweepInitError
     def __init__(self, **kwargs):
@@ -89,8 +91,28 @@ class _sweep(updateBase): # pylint: disable=too-many-instance-attributes
         #: ind from modularSweep. This whole ordeal is due to make sure that python list indexing and modular arithmetic
         #: properly agrees for the sweep functionality. I feel it can be improved but will leave as it is for now.
         self._sweepIndex = -1
+        #: key of the (scalar) result in the ``resultsDict`` used to adaptively refine the ``sweepList`` (see
+        #: :meth:`refinePoints` and :func:`adaptiveEvol <quanguru.classes.modularSweep.adaptiveEvol>`). The sweep is
+        #: not refined, if it is None.
+        self.refineKey = None
+        #: maximum number of points of the refined sweep (including the ``sweepList``), which is 4 times the length of
+        #: the ``sweepList``, if it is None.
+        self.refineBudget = None
+        #: the intervals with (normalised) variation below this value are not refined
+        self.refineTolerance = 0
+        #: optional function used to reduce the result (of the ``refineKey``) of a sweep point to a scalar, the mean of
+        #: its real part is used, if it is None.
+        self.refineMetric = None
+        #: sorted list of the swept values (coordinates) of the results of the last (adaptively) refined run
+        self.refinedList = None
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
+    def __getstate__(self):
+        # the metric is used only in the main process (and it is usually a local function), so it is not pickled
+        state = super().__getstate__()
+        state['refineMetric'] = None
+        return state
+
     @property
     def index(self):
         r"""
@@ -164,6 +186,31 @@ class _sweep(updateBase): # pylint: disable=too-many-instance-attributes
         val = self.sweepList[self.index]
         self._runUpdate(val)
 
+    def refinePoints(self, coordinates, results, count):
+        r"""
+        Returns (at most ``count``) new values to be inserted into the (sorted) ``coordinates`` with the given (scalar)
+        ``results``. The variation of each interval is its length in the (coordinate, result) plane, where both are
+        normalised by their ranges (and the coordinates are in log-scale for the ``logSweep``), so it is large where
+        the result changes fast. The mid-points of the intervals with a variation above the mean (and the
+        ``refineTolerance``) are returned, starting from the largest variation.
+        """
+        coordinates, results = np.asarray(coordinates, dtype=float), np.asarray(results, dtype=float)
+        scale = np.log10(coordinates) if self.logSweep else coordinates
+        xSpan, ySpan = np.ptp(scale), np.ptp(results)
+        variations = np.hypot(np.diff(scale)/(xSpan if xSpan > 0 else 1), np.diff(results)/(ySpan if ySpan > 0 else 1))
+        if len(variations) == 0:
+            return []
+        newValues = []
+        for ind in np.argsort(-variations, kind='stable'):
+            if (len(newValues) >= count) or (variations[ind] < variations.mean()) or \
+               (variations[ind] <= self.refineTolerance):
+                break
+            left, right = coordinates[ind], coordinates[ind+1]
+            mid = np.sqrt(left*right) if self.logSweep else (left + right)/2
+            if left < mid < right:
+                newValues.append(mid)
+        return newValues
+
     def runSweep(self, ind):
         r"""
         Wraps the ``_updateBase__function``, so that this will be the function that is always called to run the
@@ -192,7 +239,7 @@ class Sweep(qBase):
     #: (**class attribute**) number of total instances = _internalInstances + _externalInstances
     _instances: int = 0
 
-    __slots__ = ['__inds', '__indMultip']
+    __slots__ = ['__inds', '__indMultip', '__plan', '__lastPoint']
 
     # TODO init errors
     def __init__(self, **kwargs):
@@ -207,6 +254,16 @@ class Sweep(qBase):
         r"""
         the multiplication of all the indices in ``inds``. This value is used as the loop range by modularSweep.
         """
+        self.__plan = None
+        r"""
+        the sweep plan compiled by :meth:`prepare`, i.e. a tuple of the ``_sweep`` objects, the table of their indices
+        (a row for each sweep point), the first ``_sweep`` that changes relative to the previous point (for each point),
+        the list of the ``_sweep`` objects with a custom ``sweepFunction``, and the ``changedOnly`` boolean.
+        """
+        self.__lastPoint = -1
+        r"""
+        the last sweep point run by :meth:`runPoint`, and it is -1 if the values of the sweeps are not known.
+        """
         self._named__setKwargs(**kwargs) # pylint: disable=no-member
 
     @property
@@ -309,18 +366,80 @@ class Sweep(qBase):
         super().addSubSys(newSweep)
         return newSweep
 
-    def prepare(self):
+    def prepare(self, changedOnly=False):
         r"""
         This method is called inside ``run`` method of ``Simulation`` object/s to update ``inds`` and ``indMultip``
         attributes/properties. The reason for this a bit argued in :meth:`indMultip`, but it is basically to ensure that
         any changes to ``sweepList/s`` or ``combinatorial/s`` are accurately used/reflected (especially on re-runs).
+
+        It also compiles the sweep plan used by :meth:`runPoint`, i.e. the indices (of every ``_sweep``) of all the
+        sweep points are computed at once (instead of :meth:`_indicesForSweep` at each point) together with the
+        ``_sweep`` objects whose index changes relative to the previous point. If ``changedOnly`` is True, only the
+        changed sweeps are run at each point, which is valid only if nothing else (e.g. a time-dependency) changes the
+        swept parameters between the sweep points.
         """
+        self._Sweep__lastPoint = -1 # pylint: disable=assigning-non-slot
+        self._Sweep__plan = None # pylint: disable=assigning-non-slot
         if len(self.subSys) > 0:
             self._Sweep__inds = [] # pylint: disable=assigning-non-slot
             for indx, sweep in enumerate(self.subSys.values()):
                 if ((sweep.combinatorial is True) or (indx == 0)):
                     self._Sweep__inds.insert(0, len(sweep.sweepList))
             self._Sweep__indMultip = reduce(lambda x, y: x*y, self._Sweep__inds) # pylint: disable=assigning-non-slot
+            self._Sweep__plan = self._compilePlan(changedOnly) # pylint: disable=assigning-non-slot
+
+    def _compilePlan(self, changedOnly):
+        r"""
+        Creates the sweep plan (see :meth:`prepare`). The index of each ``_sweep`` is the index of the list (of
+        combinatorial sweeps) it belongs to, as in :meth:`runSweep`, and the indices of the lists are obtained (as in
+        :meth:`_indicesForSweep`) by un-raveling the sweep point into the (reversed) ``inds``. The later lists change
+        faster, so the sweeps that change relative to the previous point are always the ones after a column, which is
+        recorded for each point.
+        """
+        sweeps = tuple(self.sweeps.values())
+        lists = np.unravel_index(np.arange(self.indMultip), tuple(reversed(self.inds)))
+        columns, indx = [], 0
+        for sweep in sweeps:
+            if sweep.combinatorial is True:
+                indx += 1
+            columns.append(lists[indx])
+        table = np.stack(columns, axis=1).astype(np.min_scalar_type(max(self.inds)))
+        changes = np.zeros(len(table), dtype=np.min_scalar_type(len(sweeps)))
+        changes[1:] = np.argmax(table[1:] != table[:-1], axis=1)
+        custom = [col for col, sweep in enumerate(sweeps) if sweep.sweepFunction is not _sweep._defSweep] # pylint: disable=protected-access
+        return (sweeps, table, changes, custom, changedOnly)
+
+    @property
+    def indexTable(self):
+        r"""
+        returns the table of the indices (a row for each sweep point and a column for each ``_sweep``) of the compiled
+        sweep plan (see :meth:`prepare`), or None if there is no plan. There is no setter.
+        """
+        return None if self._Sweep__plan is None else self._Sweep__plan[1]
+
+    def runPoint(self, ind):
+        r"""
+        Runs the sweeps for the sweep point ``ind`` using the compiled plan (see :meth:`prepare`). If the plan is
+        compiled with ``changedOnly``, only the ``_sweep`` objects whose index is different than the last point
+        (pre-computed for the consecutive points) and the ones with a custom ``sweepFunction`` are run.
+        """
+        if self._Sweep__plan is None:
+            self.runSweep(self._indicesForSweep(ind, *self.inds))
+            return
+        sweeps, table, changes, custom, changedOnly = self._Sweep__plan
+        last = self._Sweep__lastPoint
+        if (not changedOnly) or (last < 0):
+            columns = range(len(sweeps))
+        elif last == ind - 1:
+            first = int(changes[ind])
+            columns = [col for col in custom if col < first] + list(range(first, len(sweeps)))
+        else:
+            changed = table[ind] != table[last]
+            columns = [col for col in range(len(sweeps)) if changed[col] or (col in custom)]
+        row = table[ind].tolist()
+        for col in columns:
+            sweeps[col].runSweep(row[col])
+        self._Sweep__lastPoint = ind # pylint: disable=assigning-non-slot
 
     def runSweep(self, indList):
         r"""
@@ -330,6 +449,8 @@ class Sweep(qBase):
         **should be created in an order** such that ``_sweep`` objects that run simultaneously **have to be** added to
         ``subSys`` one after the other. Also, for nested Sweeps, the indList should be a properly nested list.
         """
+        # the values are set without the plan, so the next point of the plan runs all the sweeps
+        self._Sweep__lastPoint = -1 # pylint: disable=assigning-non-slot
         indx = 0
         for sweep in self.sweeps.values():
             if sweep.combinatorial is True:
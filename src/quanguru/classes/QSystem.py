@@ -34,6 +34,7 @@ from .exceptions import checkVal, checkNotVal, checkCorType
 from ..QuantumToolbox.linearAlgebra import tensorProd #pylint: disable=relative-beyond-top-level
 from ..QuantumToolbox.states import superPos #pylint: disable=relative-beyond-top-level
 from ..QuantumToolbox.operators import number, Jz
+from ..QuantumToolbox.evolution import KroneckerHamiltonian
 
 def _initStDec(_createInitialState):
     r"""
@@ -214,6 +215,34 @@ class QuantumSystem(QSimComp): # pylint:disable=too-many-instance-attributes
         """
         return sum(val.totalHamiltonian for val in self.terms.values() if val.operator is not None)
 
+    @property
+    def _termMatrices(self):
+        r"""
+        returns the list of the term Hamiltonians of ``self`` and its sub-systems, which sum up to the total Hamiltonian
+        """
+        return [mat for val in self.subSys.values() for mat in val._termMatrices] +\
+               [val.totalHamiltonian for val in self.terms.values() if val.operator is not None]
+
+    @property
+    def _kroneckerTerms(self):
+        r"""
+        returns the terms of ``self`` and its sub-systems as (coefficient, local factors) tuples (see
+        :meth:`QTerm._kroneckerTerms <quanguru.classes.QTerms.QTerm._kroneckerTerms>`), which sum up to the total
+        Hamiltonian
+        """
+        return [term for val in self.subSys.values() for term in val._kroneckerTerms] +\
+               [(val.frequency*coef, factors) for val in self.terms.values() if val.operator is not None
+                for coef, factors in val._kroneckerTerms]
+
+    @property
+    def hamiltonianOperator(self):
+        r"""
+        returns the total Hamiltonian of ``self`` as a matrix-free (Kronecker-structured) LinearOperator (see
+        :func:`KroneckerHamiltonian <quanguru.QuantumToolbox.evolution.KroneckerHamiltonian>`), which stores only the
+        local operators of the terms, i.e. the full matrices are created (and stored) only by ``totalHamiltonian``.
+        """
+        return KroneckerHamiltonian(self._kroneckerTerms, self._totalDim)
+
     # dimension methods and properties
     @property
     def _totalDim(self):
@@ -21,6 +21,7 @@
 
 from .baseClasses import paramBoundBase
 from .QSimBase import setAttr
+from .QCache import operatorCache
 from .exceptions import checkCorType, checkVal, checkNotVal
 from ..QuantumToolbox import compositeOp, _matMulInputs, _matPower
 from ..QuantumToolbox import operators as qOps #pylint: disable=relative-beyond-top-level
@@ -281,12 +282,25 @@ class QTerm(paramBoundBase):
     def _dimInput(qsys, oper, order):
         r"""
         Static method to create the composite operator for a given quantum system and operator.
-        This method is used in _constructMatrices, where the system and operator are passed.
+        This method is used in _constructMatrices, where the system and operator are passed, and the created operators
+        are re-used from the :class:`operatorCache <quanguru.classes.QCache.operatorCache>`. A copy of the cached
+        operator is returned, so that an in-place change of the matrix of a term does not change the other terms.
+        """
+        key = (oper, qsys.dimension, order, qsys._dimsBefore, qsys._dimsAfter)
+        matrix = operatorCache.get(key)
+        if matrix is None:
+            matrix = operatorCache.add(key, compositeOp(QTerm._localMatrix(qsys, oper, order), dimB=qsys._dimsBefore,
+                                                        dimA=qsys._dimsAfter))
+        return matrix.copy()
+
+    @staticmethod
+    def _localMatrix(qsys, oper, order):
+        r"""
+        Static method to create the (local) operator for a given quantum system and operator, i.e. without the
+        dimensions of the other systems in a composite system.
         """
         dim = qsys.dimension
         checkNotVal(dim, 1, f'{qsys.name} is not given a dimension')
-        dimB = qsys._dimsBefore
-        dimA = qsys._dimsAfter
         if not callable(oper):
             raise TypeError(f'{qsys.name} term/s is not given a (callable) operator')
 
@@ -298,8 +312,27 @@ class QTerm(paramBoundBase):
         else:
             QTerm._isCorrectPauliDim(qsys, oper, dim)
             operMat = _matPower(oper(), order)
-        operCompMat = compositeOp(operMat, dimB=dimB, dimA=dimA)
-        return operCompMat
+        return operMat
+
+    @property
+    def _kroneckerTerms(self):
+        r"""
+        Returns the term (without its frequency) as a list of (coefficient, factors) tuples, where the factors are the
+        local operators together with the dimensions before and after their systems (see
+        :func:`KroneckerHamiltonian <quanguru.QuantumToolbox.evolution.KroneckerHamiltonian>`). This is the
+        matrix-free counterpart of :meth:`_constructMatrices`, and the composite matrices are not created.
+        """
+        if all(hasattr(self.qSystem, attr) for attr in ["dimension", "_dimsBefore", "_dimsAfter"]):
+            if len(self.subSys) == 0:
+                return [(1, [(self._localMatrix(self.qSystem, self.operator, self.order), self.qSystem._dimsBefore,
+                              self.qSystem._dimsAfter)])]
+            return [term for ter in self.subSys.values() for term in ter._kroneckerTerms] #pylint:disable=protected-access
+        # a coupling is the product of its sub-terms (which are expanded if any of them is a sum)
+        terms = [(1, [])]
+        for ter in self.subSys.values():
+            terms = [(coef1*coef2, factors1 + factors2) for coef1, factors1 in terms
+                     for coef2, factors2 in ter._kroneckerTerms] #pylint:disable=protected-access
+        return terms
 
     def _constructMatrices(self):
         r"""
@@ -13,6 +13,10 @@ r"""
         QPro
         QRes
         QSweep
+        QCache
+        QPool
+        QCheckpoint
+        QPropagators
         QGates
         QDrive
         environment
@@ -30,6 +34,10 @@ from .QPro import qProtocol, Gate, freeEvolution, copyStep
 from .QSweep import Sweep
 from .QRes import qResults
 from .QSim import Simulation
+from .QCache import unitaryCache, operatorCache, unitaryProductTree
+from .QPool import workerPool, sharedStates, threadBudget, sweepExecutor, localExecutor
+from .QCheckpoint import sweepCheckpoint
+from .QPropagators import analyticPropagators
 from .QGates import *
 from .QDrive import *
 from .environment import thermalBath, dissipatorObj
@@ -6,13 +6,21 @@
     .. autosummary::
 
         runSimulation
+        adaptiveEvol
         nonParalEvol
+        batchedEvol
+        trajectoryEvol
+        floquetEvol
         paralEvol
         parallelTimeEvol
+        chunkTimeEvol
         _runSweepAndPrep
         timeDependent
         timeEvolDefault
         timeEvolBase
+        timeEvolODE
+        timeEvolMCWF
+        timeEvolFloquet
 
     .. |c| unicode:: U+2705
     .. |x| unicode:: U+274C
@@ -22,58 +30,445 @@
        **Function Name**        **Docstrings**       **Examples**     **Unit Tests**     **Tutorials**
     =======================    ==================   ==============   ================   ===============
       `runSimulation`            |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
+      `adaptiveEvol`             |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
       `nonParalEvol`             |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
-      `paralEvol`                |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
+      `batchedEvol`              |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+      `trajectoryEvol`           |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+      `floquetEvol`              |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+      `paralEvol`                |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
       `parallelTimeEvol`         |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
+      `chunkTimeEvol`            |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
       `_runSweepAndPrep`         |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
       `timeDependent`            |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
       `timeEvolDefault`          |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
       `timeEvolBase`             |w| |w| |w| |x|      |w| |w| |x|      |w| |w| |x|        |w| |w| |x|
+      `timeEvolODE`              |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+      `timeEvolMCWF`             |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
+      `timeEvolFloquet`          |w| |w| |w| |c|      |w| |w| |x|      |w| |w| |c|        |w| |w| |x|
     =======================    ==================   ==============   ================   ===============
 
 """
 
+import time
+from collections import defaultdict
 from functools import partial
-from ..QuantumToolbox import densityMatrix, mat2Vec, vec2Mat
 
-def runSimulation(qSim, p):
+import numpy as np # type: ignore
+import scipy.sparse as sp # type: ignore
+
+from ..QuantumToolbox import densityMatrix, mat2Vec, vec2Mat, evolveBatch, FloquetEvolve
+from .QPool import workerPool, sharedStates, sweepExecutor
+from .QCheckpoint import sweepCheckpoint
+
+def runSimulation(qSim, p, resume=False):
     # NOTE determine if more samples of a protocol step are requested.
     for protocol, _ in qSim.subSys.items():
         if hasattr(protocol, 'steps'):
             if any((step.simulation.samples > 1 for step in protocol.steps.values())):
                 protocol.stepSample = True
 
+    if any(sweep.refineKey is not None for sweep in qSim.Sweep.sweeps.values()):
+        adaptiveEvol(qSim, p)
+        return
+    _sweepEvol(qSim, p, resume)
+
+def _sweepEvol(qSim, p, resume=False):
+    if qSim.batched and batchedEvol(qSim):
+        return
+    if qSim.trajectories and trajectoryEvol(qSim, p):
+        return
+    # the sweep points are checkpointed only by the engines that evolve them one by one
+    checkpoint = sweepCheckpoint.open(qSim, resume)
+    if qSim.floquet and floquetEvol(qSim, p, checkpoint):
+        return
     if p is None:
-        nonParalEvol(qSim)
+        nonParalEvol(qSim, checkpoint)
     else:
-        paralEvol(qSim, p)
+        paralEvol(qSim, p, checkpoint)
+
+def adaptiveEvol(qSim, p=None):
+    r"""
+    Adaptive sweep engine used (instead of evolving a fixed ``sweepList``) if the ``refineKey`` of the (single) sweep
+    is set. The ``sweepList`` is evolved first (by any of the engines, in parallel if a pool ``p`` is given), then new
+    values are inserted (see :meth:`refinePoints <quanguru.classes.QSweep._sweep.refinePoints>`) where the (scalar)
+    result of the ``refineKey`` changes fastest, and only the new values are evolved, until the ``refineBudget`` is
+    reached or no interval needs to be refined. The results/states of all the evaluated values are sorted by their
+    coordinates, which are stored in the ``refinedList`` of the sweep, and they have the same structure as a run over
+    the ``refinedList`` (the ``sweepList`` itself is not changed). The results of the previous runs are not kept, and
+    a ``checkpoint`` is not supported (each round is a different sweep), so a ValueError is raised if it is set.
+    """
+    sweeps = list(qSim.Sweep.sweeps.values())
+    if len(sweeps) != 1:
+        raise ValueError('adaptive sweep refinement requires a single sweep')
+    if qSim.checkpoint is not None:
+        raise ValueError('adaptive sweep refinement does not support checkpoints')
+    sweep = sweeps[0]
+    coarse = sweep.sweepList
+    budget = sweep.refineBudget if sweep.refineBudget is not None else 4*len(coarse)
+    points, values, coordinates = {}, list(coarse), []
+    try:
+        while len(values) > 0:
+            sweep.sweepList = values
+            qSim.Sweep.prepare(changedOnly=_changedOnly(qSim))
+            qSim.qRes._reset() # pylint: disable=protected-access
+            _sweepEvol(qSim, p)
+            # pylint: disable=protected-access
+            for ind, value in enumerate(values):
+                points[value] = {keyUni: ({key: val[ind] for key, val in qRes._qResBase__results.items()},
+                                          {key: val[ind] for key, val in qRes._qResBase__states.items()})
+                                 for keyUni, qRes in qSim.qRes.allResults.items()}
+            # pylint: enable=protected-access
+            coordinates = sorted(points)
+            values = sweep.refinePoints(coordinates, [_refineResult(sweep, points[value]) for value in coordinates],
+                                        budget - len(points))
+    finally:
+        sweep.sweepList = coarse
+        qSim.Sweep.prepare(changedOnly=_changedOnly(qSim))
+    sweep.refinedList = coordinates
+    for keyUni, qRes in qSim.qRes.allResults.items():
+        for ind, store in enumerate(('_qResBase__results', '_qResBase__states')):
+            merged = defaultdict(list)
+            keys = {key for value in coordinates for key in points[value].get(keyUni, ({}, {}))[ind]}
+            for key in keys:
+                merged[key] = [points[value].get(keyUni, ({}, {}))[ind].get(key) for value in coordinates]
+            setattr(qRes, store, merged)
+        qRes._qResBase__resultsLast = qRes._qResBase__results # pylint: disable=protected-access
+        qRes._qResBase__statesLast = qRes._qResBase__states # pylint: disable=protected-access
+
+def _refineResult(sweep, point):
+    r"""
+    Returns the scalar (see ``refineMetric`` of the ``sweep``) of the ``refineKey`` result of a sweep point.
+    """
+    for results, _ in point.values():
+        if sweep.refineKey in results:
+            value = results[sweep.refineKey]
+            return sweep.refineMetric(value) if callable(sweep.refineMetric) else np.mean(np.real(value))
+    raise KeyError(f'{sweep.refineKey} is not in the results')
 
 # This is the single process function
-def nonParalEvol(qSim):
+def nonParalEvol(qSim, checkpoint=None):
+    progress = _progressReporter(qSim)
+    try:
+        for ind in range(qSim.Sweep.indMultip):
+            restored = checkpoint.restored(ind) if checkpoint is not None else None
+            if restored is None:
+                _runSweepAndPrep(qSim, ind)
+                if checkpoint is not None:
+                    checkpoint.record(ind, qSim.qRes._copyAllResBlank()) # pylint: disable=protected-access
+                qSim.qRes._organiseSingleProcRes() # pylint: disable=protected-access
+            else:
+                for keyUni, valUni in restored.items():
+                    qSim.qRes._organise(keyUni, valUni) # pylint: disable=protected-access
+            progress(1)
+    finally:
+        if checkpoint is not None:
+            checkpoint.save()
+    qSim.qRes._finaliseAll(qSim.Sweep.inds) # pylint: disable=protected-access
+
+def _progressReporter(qSim):
+    r"""
+    Returns a function that counts the completed sweep points and calls the ``qSim.progress`` callback (if it is set)
+    with the number of completed points, total number of points, and the estimated remaining time (in seconds).
+    """
+    total, start, done = qSim.Sweep.indMultip, time.perf_counter(), [0]
+
+    def report(count):
+        done[0] += count
+        if callable(qSim.progress):
+            qSim.progress(done[0], total, (time.perf_counter() - start)*(total - done[0])/done[0])
+    return report
+
+def _hasTimeDependency(qsystem):
+    if any(callable(term.timeDependency) for term in qsystem.terms.values()):
+        return True
+    return any(_hasTimeDependency(sys) for sys in qsystem.subSys.values())
+
+def _protocolTimeDependency(protocol):
+    if len(getattr(getattr(protocol, 'timeDependency', None), 'sweeps', {})) > 0:
+        return True
+    return any(_protocolTimeDependency(step) for step in getattr(protocol, 'steps', {}).values())
+
+def _changedOnly(qSim):
+    r"""
+    Returns True if nothing but the sweep changes the swept parameters between the sweep points, i.e. if there is no
+    ``timeDependency`` sweep (of the simulation or its protocols) and no time-dependent term, so that the compiled
+    sweep plan runs only the changed sweeps at each point (see :meth:`prepare <quanguru.classes.QSweep.Sweep.prepare>`).
+    """
+    if len(qSim.timeDependency.sweeps) > 0:
+        return False
+    for protocol, qsystem in qSim.subSys.items():
+        try:
+            if _protocolTimeDependency(protocol) or _hasTimeDependency(qsystem):
+                return False
+        except AttributeError:
+            # systems without (new) terms are not checked for time-dependency
+            return False
+    return True
+
+def _batchable(qSim):
+    from .QPro import freeEvolution # pylint: disable=import-outside-toplevel,cyclic-import
+    if (qSim.evolFunc is not timeEvolBase) or (len(qSim.timeDependency.sweeps) > 0):
+        return False
+    for protocol, qsystem in qSim.subSys.items():
+        if ((type(protocol) is not freeEvolution) or protocol._isOpen or # pylint: disable=protected-access,unidiomatic-typecheck
+                (len(protocol.timeDependency.sweeps) > 0) or _hasTimeDependency(qsystem)):
+            return False
+    return True
+
+def _batchedStates(qSim, protocolStates, ind):
+    for protocol, states in protocolStates.items():
+        state = states[ind, qSim._Simulation__index+1].reshape(-1, 1) # pylint: disable=protected-access
+        protocol.currentState = sp.csc_matrix(state) if sp.issparse(protocol.initialState) else state
+
+def batchedEvol(qSim):
+    r"""
+    Vectorised sweep engine used (instead of :func:`nonParalEvol` or :func:`paralEvol`) if ``qSim.batched`` is True.
+    It first runs the sweep only to collect the Hamiltonians, initial states, and time steps of all the sweep points,
+    evolves all of them together by :func:`evolveBatch <quanguru.QuantumToolbox.evolution.evolveBatch>` (a batched
+    eigen-decomposition of the stacked Hamiltonians), and then runs the sweep again with an ``evolFunc`` that just sets
+    these states, so that the compute functions are called and the results are organised exactly as in
+    :func:`nonParalEvol`. It returns False (and does nothing) if the simulation is not suitable for batching, i.e. if
+    any protocol is not a closed-system :class:`freeEvolution <quanguru.classes.QPro.freeEvolution>` or there is any
+    time-dependency, a custom ``evolFunc``, or the dimensions or the number of steps change in the sweep.
+    """
+    if not _batchable(qSim):
+        return False
+
+    hamiltonians = {protocol: [] for protocol in qSim.subSys}
+    initialStates = {protocol: [] for protocol in qSim.subSys}
+    timeSteps = {protocol: [] for protocol in qSim.subSys}
+    stepCounts = set()
     for ind in range(qSim.Sweep.indMultip):
-        _runSweepAndPrep(qSim, ind)
-        qSim.qRes._organiseSingleProcRes() # pylint: disable=protected-access
+        if len(qSim.Sweep.inds) > 0:
+            qSim.Sweep.runPoint(ind)
+        stepCounts.add(qSim.stepCount)
+        for protocol in qSim.subSys.keys():
+            ham = protocol._freqCoef * protocol.superSys.totalHamiltonian # pylint: disable=protected-access
+            hamiltonians[protocol].append(ham.toarray() if sp.issparse(ham) else np.asarray(ham))
+            state = protocol.initialState
+            initialStates[protocol].append((state.toarray() if sp.issparse(state) else np.asarray(state)).ravel())
+            timeSteps[protocol].append((protocol.simulation.stepSize*protocol.ratio)/protocol.simulation.samples)
+    if (len(stepCounts) != 1) or any(len({ham.shape for ham in hams}) != 1 for hams in hamiltonians.values()):
+        return False
+
+    stepCount = stepCounts.pop()
+    protocolStates = {protocol: evolveBatch(np.stack(hamiltonians[protocol]), np.stack(initialStates[protocol]),
+                                            np.array(timeSteps[protocol]), stepCount) for protocol in qSim.subSys}
+    evolFunc = qSim.evolFunc
+    try:
+        for ind in range(qSim.Sweep.indMultip):
+            qSim.evolFunc = partial(_batchedStates, protocolStates=protocolStates, ind=ind)
+            _runSweepAndPrep(qSim, ind)
+            qSim.qRes._organiseSingleProcRes() # pylint: disable=protected-access
+    finally:
+        qSim.evolFunc = evolFunc
+    qSim.qRes._finaliseAll(qSim.Sweep.inds) # pylint: disable=protected-access
+    return True
+
+def _trajectoryResults(qSim, ind, seed, trajectory):
+    # each trajectory has its own random number stream, which depends only on the seed, sweep index, and trajectory
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(ind, trajectory)))
+    qSim.evolFunc = partial(timeEvolMCWF, rng=rng)
+    _runSweepAndPrep(qSim, ind, kets=True)
+    return {name: {key: np.array(val) for key, val in qres._qResBase__resultsLast.items()} # pylint: disable=protected-access
+            for name, qres in qSim.qRes.allResults.items()}
+
+def trajectoryEvol(qSim, p=None):
+    r"""
+    Quantum-jump (Monte Carlo wave-function) sweep engine used (instead of :func:`nonParalEvol` or :func:`paralEvol`)
+    if ``qSim.trajectories`` is set. At each sweep point, it runs ``qSim.trajectories`` trajectories (in parallel, if a
+    pool ``p`` is given) with :func:`timeEvolMCWF`, where the open systems are evolved as kets, and stores the
+    (online) average of the ``compute`` results over the trajectories in the same layout as :func:`nonParalEvol`, but
+    the states are not stored. The random number stream of each trajectory is spawned from the ``qSim.seed`` (see
+    :class:`numpy.random.SeedSequence`) by the sweep index and the trajectory number, so the results are reproducible
+    and do not depend on the number of processes. It returns False (and does nothing) if there is no open
+    :class:`freeEvolution <quanguru.classes.QPro.freeEvolution>` with a ket initial state, or there is any other
+    open protocol, ``timeDependency`` sweep, or a custom ``evolFunc``.
+    """
+    from .QPro import freeEvolution # pylint: disable=import-outside-toplevel,cyclic-import
+    if (qSim.evolFunc is not timeEvolBase) or (len(qSim.timeDependency.sweeps) > 0):
+        return False
+    openProtocols = [protocol for protocol in qSim.subSys.keys() if protocol._isOpen] # pylint: disable=protected-access
+    if ((len(openProtocols) == 0) or any(((type(protocol) is not freeEvolution) or # pylint: disable=unidiomatic-typecheck
+                                          (protocol.initialState.shape[1] != 1)) for protocol in openProtocols)):
+        return False
+
+    seed = np.random.SeedSequence(qSim.seed).entropy
+    evolFunc = qSim.evolFunc
+    try:
+        for ind in range(qSim.Sweep.indMultip):
+            runTrajectory = partial(_trajectoryResults, qSim, ind, seed)
+            if p is None:
+                results = map(runTrajectory, range(qSim.trajectories))
+            else:
+                executor = sweepExecutor.wrap(p)
+                chunk = max(1, qSim.trajectories // (4*executor.workers))
+                results = executor.ordered(runTrajectory, range(qSim.trajectories), chunksize=chunk)
+            averages = defaultdict(dict)
+            for result in results:
+                for name, resDict in result.items():
+                    for key, val in resDict.items():
+                        avg, count = averages[name].get(key, (0, 0))
+                        averages[name][key] = (avg + ((val - avg)/(count + 1)), count + 1)
+            qSim.qRes._resetLast() # pylint: disable=protected-access
+            for name, avgDict in averages.items():
+                resultsLast = qSim.qRes.allResults[name]._qResBase__resultsLast # pylint: disable=protected-access
+                for key, (avg, _) in avgDict.items():
+                    resultsLast[key] = list(avg)
+            qSim.qRes._organiseSingleProcRes() # pylint: disable=protected-access
+    finally:
+        qSim.evolFunc = evolFunc
     qSim.qRes._finaliseAll(qSim.Sweep.inds) # pylint: disable=protected-access
+    return True
+
+def floquetEvol(qSim, p=None, checkpoint=None):
+    r"""
+    Floquet (stroboscopic) sweep engine used (instead of :func:`nonParalEvol` or :func:`paralEvol`) if
+    ``qSim.floquet`` is True. The unitary of each protocol is the same at every step of the simulation, i.e. it is
+    the one-period unitary, so it is diagonalised once at each sweep point (see
+    :meth:`floquetEigens <quanguru.classes.QPro.genericProtocol.floquetEigens>`), and the states of all the steps are
+    obtained together by :func:`FloquetEvolve <quanguru.QuantumToolbox.evolution.FloquetEvolve>` (see
+    :func:`timeEvolFloquet`), instead of a matrix-vector product at every step. The sweep (in parallel, if a pool
+    ``p`` is given), compute functions, and the results are exactly as in :func:`nonParalEvol`. It returns False
+    (and does nothing) if the simulation is not periodic, i.e. if there is any open protocol, step samples,
+    time-dependent term, ``timeDependency`` sweep of the simulation, or a custom ``evolFunc``.
+    """
+    if (qSim.evolFunc is not timeEvolBase) or (len(qSim.timeDependency.sweeps) > 0):
+        return False
+    for protocol, qsystem in qSim.subSys.items():
+        if ((not hasattr(protocol, 'floquetEigens')) or protocol._isOpen or protocol.stepSample or # pylint: disable=protected-access
+                protocol._applyOnly or _hasTimeDependency(qsystem)): # pylint: disable=protected-access
+            return False
+
+    evolFunc = qSim.evolFunc
+    qSim.evolFunc = partial(timeEvolFloquet, states={})
+    try:
+        if p is None:
+            nonParalEvol(qSim, checkpoint)
+        else:
+            paralEvol(qSim, p, checkpoint)
+    finally:
+        qSim.evolFunc = evolFunc
+    return True
 
 # multi-processing functions
-def paralEvol(qSim, p):
-    results = p.map(partial(parallelTimeEvol, qSim), range(qSim.Sweep.indMultip), chunksize=1)
-    qSim.qRes._organiseMultiProcRes(results, qSim.Sweep.inds) # pylint: disable=protected-access
+def paralEvol(qSim, p, checkpoint=None):
+    r"""
+    Multi-processing sweep (with any pool or executor, see
+    :class:`sweepExecutor <quanguru.classes.QPool.sweepExecutor>`) where the sweep points are ordered by their
+    (estimated) costs (see :func:`_sweepCosts`), grouped into chunks of decreasing costs (see :func:`_sweepChunks`),
+    and the results of each chunk are written into their sweep positions (see
+    :meth:`_organiseAt <quanguru.classes.QRes.qResults._organiseAt>`) as soon as the chunk is completed, in any order.
+    The simulation is pickled only once for the run, and each worker un-pickles it once and re-uses it for all of its
+    sweep points (see :func:`chunkTimeEvol`). The stored states are transported in shared memory blocks pre-allocated
+    for all the sweep points (see :class:`sharedStates <quanguru.classes.QPool.sharedStates>`), instead of
+    being pickled back through the pool, if the workers are the processes of this machine. The completed points of a
+    resumed ``checkpoint`` (see :class:`sweepCheckpoint <quanguru.classes.QCheckpoint.sweepCheckpoint>`) are not sent
+    to the workers.
+    """
+    executor = sweepExecutor.wrap(p)
+    count = qSim.Sweep.indMultip
+    progress = _progressReporter(qSim)
+    pending = list(range(count))
+    if (checkpoint is not None) and (len(checkpoint.completed) > 0):
+        pending = [ind for ind in pending if ind not in checkpoint.completed]
+        for ind in checkpoint.completed:
+            for keyUni, valUni in checkpoint.restored(ind).items():
+                qSim.qRes._organiseAt(keyUni, valUni, ind, count) # pylint: disable=protected-access
+        progress(len(checkpoint.completed))
+    costs = _sweepCosts(qSim)
+    chunks = _sweepChunks(sorted(pending, key=lambda ind: -costs[ind]), costs, executor.workers, qSim.chunkSize)
+    token, payload = workerPool._payload(qSim) # pylint: disable=protected-access
+    # threads (or remote workers) do not share the memory of this process, so the states are returned as they are
+    transport = sharedStates.create(qSim) if executor.sharedMemory else None
+    try:
+        for results in executor.unordered(partial(chunkTimeEvol, token, payload, transport), chunks):
+            for ind, res in results:
+                for keyUni, valUni in res.items():
+                    if transport is not None:
+                        transport.read(keyUni, valUni, ind)
+                    qSim.qRes._organiseAt(keyUni, valUni, ind, count) # pylint: disable=protected-access
+                if checkpoint is not None:
+                    checkpoint.record(ind, res)
+            progress(len(results))
+    finally:
+        if transport is not None:
+            transport.close(unlink=True)
+        if checkpoint is not None:
+            checkpoint.save()
+    qSim.qRes._finaliseAll(qSim.Sweep.inds) # pylint: disable=protected-access
+
+def _sweepCosts(qSim):
+    r"""
+    Returns a list of the (relative) cost estimates of the sweep points. The ``qSim.sweepCost`` function (of the sweep
+    index) is used if it is set, otherwise the cost of a point is the product of the cubes of its swept dimensions (or
+    1 if no dimension is swept), i.e. the scaling of the matrix exponentiation.
+    """
+    if callable(qSim.sweepCost):
+        return [qSim.sweepCost(ind) for ind in range(qSim.Sweep.indMultip)]
+    costs, table = np.ones(qSim.Sweep.indMultip, dtype=int), qSim.Sweep.indexTable
+    if table is not None:
+        for col, sweep in enumerate(qSim.Sweep.sweeps.values()):
+            if sweep.sweepKey == 'dimension':
+                costs = costs*np.asarray(sweep.sweepList)[table[:, col]]**3
+    return costs.tolist()
+
+def _sweepChunks(order, costs, processes, chunkSize=None):
+    r"""
+    Groups the (ordered) sweep indices into chunks. If the ``chunkSize`` is not given, the chunks are adaptive (guided
+    self-scheduling), i.e. the total cost of each chunk is a fraction (1/(2*processes)) of the remaining total cost, so
+    that there are fewer chunks (less communication) at the start and smaller ones at the end (less idle time), and a
+    costly point is not grouped with others.
+    """
+    if chunkSize is not None:
+        return [order[ind:ind+chunkSize] for ind in range(0, len(order), chunkSize)]
+    chunks, remaining, chunkCost, target = [], float(sum(costs[ind] for ind in order)), 0, 0
+    for ind in order:
+        if (len(chunks) == 0) or (chunkCost + costs[ind] > target):
+            chunks.append([])
+            chunkCost, target = 0, remaining/(2*processes)
+        chunks[-1].append(ind)
+        chunkCost += costs[ind]
+        remaining -= costs[ind]
+    return chunks
 
 # need this to avoid return part, which is only needed in multi-processing
 def parallelTimeEvol(qSim, ind):
     _runSweepAndPrep(qSim, ind)
     return qSim.qRes._copyAllResBlank() # pylint: disable=protected-access
 
+def chunkTimeEvol(token, payload, transport, inds):
+    r"""
+    Evolves a chunk of sweep points in a worker (see :func:`paralEvol`) and returns a list of (sweep index, results)
+    pairs. The pickled simulation (``payload``) is un-pickled only once per run (identified by the ``token``) in each
+    worker (see :class:`workerPool <quanguru.classes.QPool.workerPool>`), and the same simulation is used for all the
+    sweep points of the worker, as in :func:`nonParalEvol`. The states are written into the shared memory of the
+    ``transport`` (see :class:`sharedStates <quanguru.classes.QPool.sharedStates>`), if it is given.
+    """
+    qSim = workerPool._simulation(token, payload) # pylint: disable=protected-access
+    results = []
+    try:
+        for ind in inds:
+            res = parallelTimeEvol(qSim, ind)
+            if transport is not None:
+                for keyUni, valUni in res.items():
+                    transport.write(keyUni, valUni, ind)
+            results.append((ind, res))
+    finally:
+        if transport is not None:
+            transport.close()
+    return results
+
 # These two functions, respectively, run Sweep and timeDependent (sweep) parameter updates
 # In the timeDependet case, evolFunc of first function is the second function
-def _runSweepAndPrep(qSim, ind):
+def _runSweepAndPrep(qSim, ind, kets=False):
     if len(qSim.Sweep.inds) > 0:
-        qSim.Sweep.runSweep(qSim.Sweep._indicesForSweep(ind, *qSim.Sweep.inds))
+        qSim.Sweep.runPoint(ind)
 
     for protocol in qSim.subSys.keys():
         if callable(qSim.evolFunc):
-            protocol.currentState = protocol.initialState if not protocol._isOpen else densityMatrix(protocol.initialState)# pylint: disable=protected-access,line-too-long
+            closed = kets or not protocol._isOpen # pylint: disable=protected-access
+            protocol.currentState = protocol.initialState if closed else densityMatrix(protocol.initialState)
 
     qSim.qRes._resetLast() # pylint: disable=protected-access
     qSim._computeBase__calculate("pre")
@@ -144,21 +539,66 @@ def timeEvolDefault(qSim, td):
                     qsystem._computeBase__compute(protocol.currentState) # pylint: disable=protected-access
                     calledFor.append(qsystem)
 
-def timeEvolBase(qSim):
-    for protocol in qSim.subSys.keys(): #pylint:disable=too-many-nested-blocks
+def _timeEvolProtocol(protocol):
+    if protocol._isOpen: # pylint: disable=protected-access
+        state = mat2Vec(protocol.currentState)
+        state = protocol.applyUnitary(state)
+        protocol.currentState = vec2Mat(state)
+    else:
+        protocol.sampleStates = []
+        if protocol.stepSample:
+            for step in protocol.steps.values():
+                for _ in range(step.simulation.samples):
+                    protocol.currentState = step.applyUnitary(protocol.currentState)
+                    protocol.sampleStates.append(protocol.currentState)
+        else:
+            protocol.currentState = protocol.applyUnitary(protocol.currentState)
+
+def timeEvolODE(qSim):
+    r"""
+    An ``evolFunc`` that integrates the free evolutions with an adaptive step-size ODE solver (see
+    :meth:`freeEvolution.integrate <quanguru.classes.QPro.freeEvolution.integrate>`), instead of exponentiating the
+    (piecewise-constant) Hamiltonian at every step, and other protocols are evolved as in :func:`timeEvolBase`. The
+    solvers are (re-)started from the current states at the first step of each run.
+    """
+    initialTime = (qSim._currentTime - qSim.stepSize) if qSim._Simulation__index == 0 else None # pylint: disable=protected-access
+    for protocol in qSim.subSys.keys():
+        if hasattr(protocol, 'integrate'):
+            protocol.currentState = protocol.integrate(protocol.currentState, initialTime)
+        else:
+            _timeEvolProtocol(protocol)
+
+def timeEvolMCWF(qSim, rng=None):
+    r"""
+    An ``evolFunc`` that evolves the (ket) states of the open free evolutions along a quantum-jump trajectory (see
+    :meth:`freeEvolution.trajectoryStep <quanguru.classes.QPro.freeEvolution.trajectoryStep>`) by using the given
+    random number generator, and other protocols are evolved as in :func:`timeEvolBase`. A new trajectory is started
+    at the first step of each run. It is used by :func:`trajectoryEvol`.
+    """
+    restart = qSim._Simulation__index == 0 # pylint: disable=protected-access
+    for protocol in qSim.subSys.keys():
         if protocol._isOpen: # pylint: disable=protected-access
-            state = mat2Vec(protocol.currentState)
-            state = protocol.unitary() @ state
-            protocol.currentState = vec2Mat(state)
+            protocol.currentState = protocol.trajectoryStep(protocol.currentState, rng, restart)
         else:
-            protocol.sampleStates = []
-            if protocol.stepSample:
-                for step in protocol.steps.values():
-                    for _ in range(step.simulation.samples):
-                        protocol.currentState = step.unitary() @ protocol.currentState
-                        protocol.sampleStates.append(protocol.currentState)
-            else:
-                protocol.currentState = protocol.unitary() @ protocol.currentState
+            _timeEvolProtocol(protocol)
+
+def timeEvolFloquet(qSim, states):
+    r"""
+    An ``evolFunc`` that sets the current states of the (periodic) protocols from their stroboscopic states, which are
+    calculated (and stored in the given ``states`` dictionary) at the first step of each run by
+    :func:`FloquetEvolve <quanguru.QuantumToolbox.evolution.FloquetEvolve>` for all the steps. It is used by
+    :func:`floquetEvol`.
+    """
+    index = qSim._Simulation__index # pylint: disable=protected-access
+    for protocol in qSim.subSys.keys():
+        if index == 0:
+            states[protocol] = FloquetEvolve(*protocol.floquetEigens(), protocol.currentState, qSim.stepCount)
+        state = states[protocol][index + 1].reshape(-1, 1)
+        protocol.currentState = sp.csc_matrix(state) if sp.issparse(protocol.initialState) else state
+
+def timeEvolBase(qSim):
+    for protocol in qSim.subSys.keys():
+        _timeEvolProtocol(protocol)
         #protocol.sampleStates = []
         #qSim.subSys[protocol]._computeBase__compute([protocol.currentState]) # pylint: disable=protected-access
         #sampleCompute = qSim is protocol.simulation
@@ -1,3 +1,15 @@
 classConfig = {
-    'delStates': False
+    'delStates': False,
+    'propagator': 'expm',
+    'unitaryCacheMemory': 2**24,
+    'unitaryCachePolicy': 'lru',
+    'operatorCacheMemory': 2**26,
+    'odeOptions': {'method': 'DOP853', 'rtol': 1e-8, 'atol': 1e-10},
+    'trotterOptions': {'tolerance': 1e-8, 'order': None, 'substeps': None},
+    'sectorWorkers': 1,
+    'analyticPropagators': False,
+    'localGates': False,
+    'productTree': False,
+    'sharedStates': True,
+    'checkpointInterval': 60
 }
@@ -221,3 +221,16 @@ def test_matrixPowerRaising(sp):
         assert np.allclose(la._matPower(oper1, 3), (oper1@oper1@oper1))
         assert np.allclose(la._matPower(oper2, 3), (oper2@oper2@oper2))
         assert np.allclose(la._matPower(oper3, 3), (oper3@oper3@oper3))
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_applyLocalMatchesCompositeOperator(sparse):
+    # contracting a local operator with the reshaped ket/density matrix is the same as using the composite operator
+    rng = np.random.default_rng(5)
+    operator = rng.normal(size=(3, 3)) + 1j*rng.normal(size=(3, 3))
+    composite = sp.kron(sp.kron(sp.identity(2), operator), sp.identity(4)).toarray()
+    ket = rng.normal(size=(24, 1)) + 1j*rng.normal(size=(24, 1))
+    density = ket @ ket.conj().T
+    for state, expected in [[ket, composite @ ket], [density, composite @ density @ la.hc(composite)]]:
+        result = la.applyLocal(operator, sp.csc_matrix(state) if sparse else state, dimsBefore=2, dimsAfter=4)
+        assert sp.issparse(result) == sparse
+        assert np.allclose(result.toarray() if sparse else result, expected)
@@ -1,6 +1,10 @@
 import numpy as np
 import pytest
+import scipy.sparse as sp
 import quanguru.QuantumToolbox.evolution as evo#pylint: disable=import-error
+import quanguru.QuantumToolbox.operators as ops#pylint: disable=import-error
+import quanguru.QuantumToolbox.states as states#pylint: disable=import-error
+from quanguru.QuantumToolbox.Hamiltonians import JCHam #pylint: disable=import-error
 
 sigmaOpers = ["sigmaMinusReference", "sigmaPlusReference", "sigmaZReference"]
 
@@ -35,3 +39,271 @@ dissipatorExpects = [np.array([[-1, 0, 0, 0], [0, -0.5, 0, 0], [0, 0, -0.5, 0],
 def test_dissipator(op, expect, referenceValues):
     # test the dissipator for sigma -, +, and Z operators by comparing expected results
     assert np.allclose(evo.dissipator(referenceValues[op]), expect)
+
+def test_UnitaryActionMatchesUnitary(helpers):
+    # action of the exponential on a (sparse or array) ket should be the same as multiplying it with the Unitary
+    state, dim, _ = helpers.generateRndPureState()
+    hamiltonian = ops.number(dim) + 0.3*(ops.destroy(dim) + ops.create(dim))
+    evolved = evo.UnitaryAction(hamiltonian, state, timeStep=0.7)
+    assert isinstance(evolved, type(state))
+    assert np.allclose(evolved.A, (evo.Unitary(hamiltonian, 0.7) @ state).A)
+    assert np.allclose(evo.UnitaryAction(hamiltonian.A, state.A, timeStep=0.7), evolved.A)
+
+def test_LiouvillianExpActionMatchesLiouvillianExp(helpers):
+    # action of the exponentiated Liouvillian on a vectorised density matrix
+    state, dim, _ = helpers.generateRndPureState()
+    hamiltonian = ops.number(dim) + 0.3*(ops.destroy(dim) + ops.create(dim))
+    vecState = states.mat2Vec(states.densityMatrix(state))
+    liouExp = evo.LiouvillianExp(hamiltonian, 0.7, [ops.destroy(dim)], [0.2])
+    evolved = evo.LiouvillianExpAction(hamiltonian, vecState, 0.7, [ops.destroy(dim)], [0.2])
+    assert np.allclose(evolved.A, (liouExp @ vecState).A)
+
+def test_UnitaryEigenMatchesUnitary(helpers):
+    # unitary created from the eigen-decomposition should be the same as the exponentiated one for any timeStep
+    dim, _ = helpers.generateRndDimAndExc(0)
+    hamiltonian = ops.number(dim) + 0.3*(ops.destroy(dim) + ops.create(dim))
+    eigVals, eigVecs = evo.hermitianEigens(hamiltonian)
+    for timeStep in [0.1, 0.7, 2.5]:
+        assert np.allclose(evo.UnitaryEigen(eigVals, eigVecs, timeStep), evo.Unitary(hamiltonian, timeStep).A)
+    assert np.allclose(evo.UnitaryEigen(eigVals, eigVecs, 0.7, sparse=True).A, evo.Unitary(hamiltonian, 0.7).A)
+
+def test_evolveODEMatchesExponentiation(helpers):
+    # integrated states of a time-independent Hamiltonian should be the same as the exponentiated ones
+    dim, exc = helpers.generateRndDimAndExc(0)
+    hamiltonian = ops.number(dim) + 0.3*(ops.destroy(dim) + ops.create(dim))
+    ket = states.basis(dim, exc)
+    timeList = [0, 0.4, 1.1, 1.5]
+    for time, state in zip(timeList, evo.evolveODE(hamiltonian, ket, timeList)):
+        assert np.allclose(state.A, (evo.Unitary(hamiltonian, time) @ ket).A)
+    rho = states.densityMatrix(ket)
+    collapseOps, decayRates = [ops.destroy(dim)], [0.2]
+    for time, state in zip(timeList, evo.evolveODE(hamiltonian, rho, timeList, collapseOps, decayRates)):
+        liouvillian = evo.LiouvillianExp(hamiltonian, time, collapseOps, decayRates)
+        assert np.allclose(state.A, states.vec2Mat(liouvillian @ states.mat2Vec(rho)).A)
+
+@pytest.mark.parametrize("method, order", [('magnus2', 2), ('magnus4', 4), ('cf4', 4)])
+def test_MagnusExpConvergenceOrder(method, order):
+    # halving the step size of a driven qubit should reduce the error by 2**order
+    hamiltonian = lambda time: 0.5*ops.sigmaz() + 2*np.cos(3*time)*ops.sigmax()
+    ket = states.basis(2, 0)
+    ref = evo.evolveODE(hamiltonian, ket, [0, 2], rtol=1e-12, atol=1e-13)[-1].A
+    errors = []
+    for stepCount in [20, 40]:
+        timeStep, state = 2/stepCount, ket
+        for ind in range(stepCount):
+            hams = [hamiltonian((ind + node)*timeStep) for node in evo.magnusNodes(method)]
+            state = evo.MagnusExp(hams, timeStep, method=method) @ state
+        errors.append(np.abs(state.A - ref).max())
+    assert np.isclose(np.log2(errors[0]/errors[1]), order, atol=0.3)
+
+def test_splitHamiltonianGroups():
+    # diagonal terms are summed into a diagonal, and non-Hermitian terms are grouped with their Hermitian conjugates
+    dim = 4
+    cavity = ops.number(dim)
+    lowering, raising = ops.compositeOp(ops.destroy(dim), 1, 2), ops.compositeOp(ops.create(dim), 1, 2)
+    terms = [ops.compositeOp(cavity, 1, 2), ops.compositeOp(ops.sigmaz(), dim, 1),
+             lowering @ ops.compositeOp(ops.sigmap(), dim, 1), raising @ ops.compositeOp(ops.sigmam(), dim, 1),
+             ops.compositeOp(ops.sigmax(), dim, 1)]
+    diagonal, groups = evo.splitHamiltonian(terms)
+    assert np.allclose(diagonal, (terms[0] + terms[1]).diagonal())
+    assert len(groups) == 2
+    for group in groups:
+        assert np.allclose(group.A, group.A.conj().T)
+    assert np.allclose(np.diag(diagonal) + sum(groups).A, sum(terms).A)
+
+@pytest.mark.parametrize("order", [1, 2, 4])
+def test_TrotterActionConvergesToUnitary(order):
+    # more substeps should approach the exact unitary with the given order
+    hamiltonians = [0.7*ops.sigmaz(), 1.3*ops.sigmax(), 0.4*ops.sigmay()]
+    diagonal, groups = evo.splitHamiltonian(hamiltonians)
+    ket = states.basis(2, 0)
+    ref = (evo.Unitary(sum(hamiltonians), 0.5) @ ket).A
+    errors = [np.abs(evo.TrotterAction(diagonal, groups, ket, 0.5, order, substeps).A - ref).max()
+              for substeps in [4, 8]]
+    assert np.isclose(np.log2(errors[0]/errors[1]), order, atol=0.3)
+    order, substeps = evo.trotterParameters(diagonal, groups, 0.5, 1e-9)
+    assert np.abs(evo.TrotterAction(diagonal, groups, ket, 0.5, order, substeps).A - ref).max() < 1e-9
+
+def test_evolveBatchMatchesUnitary():
+    # each item of the batch should be evolved by the unitary of its own Hamiltonian and time step
+    dim = 5
+    hamiltonians = [ops.number(dim) + coupling*(ops.destroy(dim) + ops.create(dim)) for coupling in [0.1, 0.5, 1.2]]
+    kets = [states.basis(dim, exc) for exc in [0, 2, 4]]
+    timeSteps = [0.1, 0.2, 0.3]
+    batch = evo.evolveBatch(np.stack([ham.A for ham in hamiltonians]), np.stack([ket.A.ravel() for ket in kets]),
+                            np.array(timeSteps), 4)
+    assert batch.shape == (3, 5, dim)
+    for ham, ket, timeStep, evolved in zip(hamiltonians, kets, timeSteps, batch):
+        for step in range(5):
+            assert np.allclose(evolved[step], (evo.Unitary(ham, step*timeStep) @ ket).A.ravel())
+
+def test_quantumJumpStepAveragesToLiouvillian():
+    # ensemble average of the trajectories should approximate the density matrix evolution, and each state is normalised
+    dim = 3
+    ham = ops.number(dim) + 0.4*(ops.destroy(dim) + ops.create(dim))
+    ket = states.basis(dim, 2)
+    rng = np.random.default_rng(11)
+    average = np.zeros((dim, dim), dtype=complex)
+    for _ in range(200):
+        state, threshold = ket, None
+        for _ in range(4):
+            state, threshold = evo.quantumJumpStep(ham, state, 0.25, [ops.destroy(dim)], [0.8], rng, threshold)
+        assert np.isclose(np.linalg.norm(state.A), 1)
+        average += (state @ state.conj().T).A/200
+    ref = evo.LiouvillianExp(ham, 1, [ops.destroy(dim)], [0.8]) @ states.mat2Vec(states.densityMatrix(ket))
+    assert np.allclose(average, states.vec2Mat(ref).A, atol=0.1)
+
+@pytest.mark.parametrize("method, preconditioner", [['gmres', 'ilu'], ['gmres', 'jacobi'], ['bicgstab', 'ilu'],
+                                                    ['lgmres', 'ilu'], ['inverse', None], ['power', None]])
+def test_iterativeSteadyStateIsNullVectorOfLiouvillian(method, preconditioner):
+    # steady state should be the (trace normalised) null vector of the Liouvillian, and warm-starting from the steady
+    # state of a slightly different rate should not need more iterations
+    dim = 5
+    ham = ops.number(dim) + 0.7*(ops.destroy(dim) + ops.create(dim))
+    collapseOps = [ops.destroy(dim), ops.create(dim)]
+    _, _, vecs = np.linalg.svd(evo.Liouvillian(ham, collapseOps, [1.0, 0.3]).A)
+    ref = states.vec2Mat(vecs[-1].conj().reshape(-1, 1))
+    ref = ref/np.trace(ref)
+    rho, iterations = evo.iterativeSteadyState(ham, collapseOps, [1.0, 0.3], method, preconditioner)
+    assert np.allclose(rho.A, ref, atol=1e-8)
+    assert np.isclose(np.trace(rho.A), 1)
+    _, warmIterations = evo.iterativeSteadyState(ham, collapseOps, [1.02, 0.3], method, preconditioner,
+                                                 initialGuess=rho)
+    assert warmIterations <= iterations
+    with pytest.raises(ValueError):
+        evo.iterativeSteadyState(ham, collapseOps, [1.0, 0.3], 'jacobi')
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_LiouvillianOperatorMatchesLiouvillian(sparse):
+    # matrix-free operator (and its adjoint) should act as the explicit super-operator, also on a generic (A, B) term
+    dim = 4
+    rng = np.random.default_rng(3)
+    randomOps = [rng.normal(size=(dim, dim)) + 1j*rng.normal(size=(dim, dim)) for _ in range(4)]
+    ham = randomOps[0] + randomOps[0].conj().T
+    collapseOps = [randomOps[1], (randomOps[2], randomOps[3])]
+    ref = evo.Liouvillian(ham, collapseOps[:1], [0.4]) + 0.9*evo.dissipator(*collapseOps[1])
+    if sparse:
+        ham = sp.csc_matrix(ham)
+        collapseOps = [sp.csc_matrix(randomOps[1]), (sp.csc_matrix(randomOps[2]), sp.csc_matrix(randomOps[3]))]
+    operator = evo.LiouvillianOperator(ham, collapseOps, [0.4, 0.9])
+    assert np.allclose(operator @ np.eye(dim**2), ref)
+    assert np.allclose(operator.H @ np.eye(dim**2), np.asarray(ref).conj().T)
+
+def test_matrixFreeOptionsMatchExplicitLiouvillian():
+    # Krylov propagation, open evolution, and steady state should not depend on the matrix-free option
+    dim = 5
+    ham = ops.number(dim) + 0.7*(ops.destroy(dim) + ops.create(dim))
+    collapseOps = [ops.destroy(dim), ops.create(dim)]
+    vec = states.mat2Vec(states.densityMatrix(states.basis(dim, 3)))
+    assert np.allclose(evo.LiouvillianExpAction(ham, vec, 0.7, collapseOps, [1, 0.3]).A,
+                       evo.LiouvillianExpAction(ham, vec, 0.7, collapseOps, [1, 0.3], matrixFree=True).A)
+    for ref, rho in zip(evo.evolveOpen(states.basis(dim, 3), 2, 0.5, ham, collapseOps, [1, 0.3]),
+                        evo.evolveOpen(states.basis(dim, 3), 2, 0.5, ham, collapseOps, [1, 0.3], matrixFree=True)):
+        assert np.allclose(ref.A, rho.A)
+    for method in ['gmres', 'power']:
+        assert np.allclose(evo.iterativeSteadyState(ham, collapseOps, [1, 0.3], method)[0].A,
+                           evo.iterativeSteadyState(ham, collapseOps, [1, 0.3], method, matrixFree=True)[0].A)
+
+@pytest.mark.parametrize("method, matrixFree", [['exp', True], ['action', False], ['action', True], ['eigen', False]])
+def test_evolveOpenMethodsMatchStepwiseExponential(method, matrixFree):
+    # all the methods should give the same states on the time grid, and the observables should be their expectations
+    dim = 4
+    ham = ops.number(dim) + 0.7*(ops.destroy(dim) + ops.create(dim))
+    collapseOps = [ops.destroy(dim), ops.create(dim)]
+    observables = [ops.number(dim), ops.destroy(dim) + ops.create(dim)]
+    refStates = evo.evolveOpen(states.basis(dim, 3), 1, 0.1, ham, collapseOps, [1, 0.3])
+    evolved = evo.evolveOpen(states.basis(dim, 3), 1, 0.1, ham, collapseOps, [1, 0.3], method=method,
+                             matrixFree=matrixFree)
+    assert len(evolved) == len(refStates) == 11
+    for ref, rho in zip(refStates, evolved):
+        assert np.allclose(ref.A, rho.A)
+    values = evo.evolveOpen(states.basis(dim, 3), 1, 0.1, ham, collapseOps, [1, 0.3], method=method,
+                            matrixFree=matrixFree, observables=observables)
+    assert values.shape == (2, 11)
+    assert np.allclose(values, [[(obs @ rho).diagonal().sum() for rho in refStates] for obs in observables])
+    with pytest.raises(ValueError):
+        evo.evolveOpen(states.basis(dim, 3), 1, 0.1, ham, collapseOps, [1, 0.3], method='krylov')
+
+def test_symmetrySectorsAndSectorExp():
+    # JC Hamiltonian conserves the excitation number, whose sectors are found automatically, block-wise exponential
+    # should be the full unitary, and a restricted state should be evolved by its own block
+    ham = JCHam(1, 1.2, 0.5, 6)
+    excitations = sp.kron(ops.sigmap() @ ops.sigmam(), ops.identity(6)) + sp.kron(ops.identity(2), ops.number(6))
+    sectors = evo.symmetrySectors(ham)
+    assert len(sectors) == 7
+    assert {tuple(sec) for sec in sectors} == {tuple(sec) for sec in evo.symmetrySectors(ham, excitations)}
+    for workers in [1, 2]:
+        assert np.allclose(evo.SectorExp(-1j*ham, sectors, 0.3, workers).A, evo.Unitary(ham, 0.3).A)
+    ket = states.basis(12, 2) + states.basis(12, 9)
+    sector = [sec for sec in sectors if 2 in sec][0]
+    evolved = evo.Unitary(ham[sector][:, sector], 0.3) @ evo.sectorRestrict(ket, sector)
+    assert np.allclose(evo.sectorEmbed(evolved, sector, 12).A, (evo.Unitary(ham, 0.3) @ ket).A)
+    with pytest.raises(ValueError):
+        evo.symmetrySectors(ham, sp.kron(ops.sigmaz(), ops.identity(6)))
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_closedFormUnitariesMatchUnitary(sparse):
+    # closed-form unitaries of diagonal, rotation (squares to identity), and JC (two-level sectors) Hamiltonians
+    toArr = lambda mat: mat.toarray() if sp.issparse(mat) else mat # pylint: disable=unnecessary-lambda-assignment
+    convert = (lambda mat: sp.csc_matrix(mat)) if sparse else toArr # pylint: disable=unnecessary-lambda-assignment
+    diagonal = convert(sp.kron(1.3*ops.number(4), ops.identity(3)) + sp.kron(ops.identity(4), 0.7*ops.Jz(1)))
+    rotation = convert(0.3*ops.sigmax() - 0.4*ops.sigmay() + 0.2*ops.sigmaz())
+    jaynesCummings = convert(JCHam(1, 1.2, 0.5, 6))
+    unitaries = [evo.UnitaryDiagonal(diagonal, 0.7), evo.UnitaryRotation(rotation, 0.7),
+                 evo.UnitaryTwoLevel(jaynesCummings, evo.symmetrySectors(sp.csc_matrix(jaynesCummings)), 0.7)]
+    for unitary, ham in zip(unitaries, [diagonal, rotation, jaynesCummings]):
+        assert sp.issparse(unitary) == sparse
+        assert np.allclose(toArr(unitary), evo.Unitary(sp.csc_matrix(ham), 0.7).toarray())
+    with pytest.raises(ValueError):
+        evo.UnitaryTwoLevel(jaynesCummings, [np.arange(12)], 0.7)
+
+def test_FloquetEvolveMatchesRepeatedUnitary():
+    # stroboscopic states and expectation values from the Floquet modes are the same as the repeated application of
+    # the period unitary, also for a degenerate unitary
+    for unitary in [evo.Unitary(ops.Jy(2.5), 0.7) @ evo.Unitary(ops.Jz(2.5)@ops.Jz(2.5), 0.3),
+                    evo.Unitary(sp.kron(ops.sigmax(), ops.identity(3)), 0.4)]:
+        state = states.normalise(states.basis(6, 1) + 0.5j*states.basis(6, 4))
+        eigenValues, eigenVectors = evo.FloquetEigens(unitary)
+        floquetStates = evo.FloquetEvolve(eigenValues, eigenVectors, state, 20)
+        expectations = evo.FloquetEvolve(eigenValues, eigenVectors, state, 20, [ops.number(6)])
+        for step in range(21):
+            assert np.allclose(floquetStates[step], state.toarray().ravel())
+            assert np.isclose(expectations[0, step], (state.conj().T @ ops.number(6) @ state).toarray()[0, 0])
+            state = unitary @ state
+    assert np.allclose(evo.quasiEnergies(evo.Unitary(ops.number(3), 2), 2), [2-np.pi, 0, 1])
+
+def test_KroneckerHamiltonianActionAndTrace():
+    # matrix-free Hamiltonian (with repeated factors on the same system) and its adjoint are the same as the composite
+    # matrix, and its trace gives the same Krylov propagation as the explicit Hamiltonian
+    terms = [(0.5, [(ops.sigmaz(), 1, 3)]), (0.2, [(ops.destroy(3), 2, 1), (ops.sigmap(), 1, 3)]),
+             (0.2, [(ops.create(3), 2, 1), (ops.sigmam(), 1, 3)]),
+             (0.3, [(ops.number(3), 2, 1), (ops.number(3), 2, 1)])]
+    hamiltonian = evo.KroneckerHamiltonian(terms, 6)
+    full = (0.5*sp.kron(ops.sigmaz(), ops.identity(3)) + 0.2*sp.kron(ops.sigmap(), ops.destroy(3)) +
+            0.2*sp.kron(ops.sigmam(), ops.create(3)) + 0.3*sp.kron(ops.identity(2), ops.number(3)**2)).toarray()
+    assert np.allclose(hamiltonian @ np.identity(6), full)
+    assert np.allclose(hamiltonian.H @ np.identity(6), full.conj().T)
+    assert np.isclose(evo._kroneckerTrace(terms, 6), full.trace()) #pylint: disable=protected-access
+    ket = states.basis(6, 4)
+    evolved = evo.UnitaryAction(hamiltonian, ket.toarray(), 0.7, evo._kroneckerTrace(terms, 6)) #pylint: disable=protected-access
+    assert np.allclose(evolved, (evo.Unitary(sp.csc_matrix(full), 0.7) @ ket).toarray())
+
+def test_expmMultiplyWithoutTraceKeyword(monkeypatch):
+    # traceA of expm_multiply (scipy >= 1.9) is given only if it is accepted, so that the explicit generators give the
+    # same results with the older scipy versions
+    expmMultiply = evo.slinA.expm_multiply
+    def expmMultiplyWithoutTrace(A, B, start=None, stop=None, num=None, endpoint=None):
+        return expmMultiply(A, B, start=start, stop=stop, num=num, endpoint=endpoint)
+    dim = 5
+    ham = ops.number(dim) + 0.7*(ops.destroy(dim) + ops.create(dim))
+    collapseOps = [ops.destroy(dim), ops.create(dim)]
+    ket = states.basis(dim, 3)
+    refKet = evo.LiouvillianExpAction(ham, ket, 0.7, HamiltonianTrace=ham.diagonal().sum())
+    refRho = evo.iterativeSteadyState(ham, collapseOps, [1, 0.3], 'power')[0]
+    refStates = evo.evolveOpen(ket, 1, 0.1, ham, collapseOps, [1, 0.3], method='action')
+    monkeypatch.setattr(evo.slinA, 'expm_multiply', expmMultiplyWithoutTrace)
+    assert not evo._accepts(evo.slinA.expm_multiply, 'traceA') #pylint: disable=protected-access
+    assert np.allclose(evo.LiouvillianExpAction(ham, ket, 0.7, HamiltonianTrace=ham.diagonal().sum()).A, refKet.A)
+    assert np.allclose(evo.iterativeSteadyState(ham, collapseOps, [1, 0.3], 'power')[0].A, refRho.A)
+    for ref, rho in zip(refStates, evo.evolveOpen(ket, 1, 0.1, ham, collapseOps, [1, 0.3], method='action')):
+        assert np.allclose(ref.A, rho.A)
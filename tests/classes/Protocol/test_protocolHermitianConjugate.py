@@ -13,3 +13,27 @@ def test_HermitianConjugateCopyStep():
     spinSys.simStepSize = 1
 
     assert np.allclose(ProtocolY.unitary().A, (ry.unitary() @ spinSys.unitary() @ qg.hc(ry.unitary()) ).A)
+
+def test_gatesAppliedLocally():
+    # gates on a qubit of a composite system are applied locally (without the full-space unitary) both to the kets and
+    # to the (vectorised) density matrices, and give the same states as the full-space unitaries
+    cav = qg.Cavity(dimension=3, frequency=1)
+    qub = qg.Qubit(frequency=1)
+    comp = cav + qub
+    rx = qg.SpinRotation(system=qub, angle=0.4, rotationAxis='x')
+    flip = qg.xGate(system=qub, angle=np.pi/2, implementation='instant')
+    protocol = qg.qProtocol(system=comp, steps=[rx, flip.hc])
+    ket = qg.normalise(qg.basis(6, 1) + 0.5j*qg.basis(6, 4))
+    unitary = qg.hc(flip.unitary()) @ rx.unitary()
+    assert not protocol._applyOnly # pylint: disable=protected-access
+    assert np.allclose(protocol.applyUnitary(ket).A, (unitary @ ket).A)
+    localApplication = qg.Gate.localApplication
+    qg.Gate.localApplication = True
+    try:
+        assert rx._applyOnly and protocol._applyOnly # pylint: disable=protected-access
+        assert np.allclose(protocol.applyUnitary(ket).A, (unitary @ ket).A)
+        density = qg.densityMatrix(ket)
+        assert np.allclose(rx.applyUnitary(qg.mat2Vec(density)).A,
+                           qg.mat2Vec(rx.unitary() @ density @ qg.hc(rx.unitary())).A)
+    finally:
+        qg.Gate.localApplication = localApplication
@@ -0,0 +1,184 @@
+import pickle
+import numpy as np
+import pytest
+import scipy.sparse as sp
+import quanguru as qg
+from quanguru.classes.environment import dissipatorObj
+from quanguru.classes.modularSweep import timeEvolODE
+
+@pytest.mark.parametrize("openSys, protocol", [(False, False), (True, False), (False, True)])
+def test_krylovPropagatorMatchesExpm(openSys, protocol, propagation):
+    # apply-only propagation should give the same states as the default (unitary creating) propagation
+    refStates = propagation.states(propagation.run('expm', openSys, protocol))
+    krylovStates = propagation.states(propagation.run('krylov', openSys, protocol))
+    assert len(refStates) == len(krylovStates)
+    for ref, kry in zip(refStates, krylovStates):
+        assert np.allclose(ref, kry)
+
+def test_krylovPropagatorDoesNotCreateUnitary(propagation):
+    # the unitary is never created in apply-only mode
+    jcSys = propagation.run('krylov')
+    assert jcSys._freeEvol._paramBoundBase__matrix is None
+
+def test_propagatorPerProtocol(propagation):
+    # propagator of a protocol is bound to the simulation unless it is explicitly set for the protocol
+    jcSys, _, _ = propagation.jcSystem()
+    freeEvol = qg.freeEvolution(system=jcSys)
+    jcSys.simulation.addSubSys(jcSys, freeEvol)
+    assert freeEvol.propagator == 'expm'
+    jcSys.simulation.propagator = 'krylov'
+    assert freeEvol.propagator == 'krylov'
+    freeEvol.propagator = 'expm'
+    assert (jcSys.simulation.propagator, freeEvol.propagator) == ('krylov', 'expm')
+    with pytest.raises(ValueError):
+        freeEvol.propagator = 'unknown'
+
+def test_eigenPropagatorMatchesExpm(propagation):
+    # eigen-decomposition based unitaries should give the same states as the exponentiated ones
+    refStates = propagation.states(propagation.run('expm'))
+    eigStates = propagation.states(propagation.run('eigen'))
+    for ref, eig in zip(refStates, eigStates):
+        assert np.allclose(ref, eig)
+
+def test_eigenPropagatorDiagonalisesOnceForStepSizeSweep(propagation):
+    # sweeping the step size does not change the Hamiltonian, so it is diagonalised only once
+    jcSys, _, _ = propagation.jcSystem()
+    jcSys.simulation.propagator = 'eigen'
+    stepSizes = [0.05, 0.1, 0.2]
+    jcSys.simulation.Sweep.createSweep(system=jcSys.simulation, sweepKey='stepSize', sweepList=stepSizes)
+    diagCount = qg.freeEvolution.numberOfDiagonalisations
+    expCount = qg.freeEvolution.numberOfExponentiations
+    jcSys.runSimulation()
+    assert qg.freeEvolution.numberOfDiagonalisations - diagCount == 1
+    assert qg.freeEvolution.numberOfExponentiations == expCount
+
+    # states at the last step of each sweep point should match the exact evolution
+    hamiltonian = jcSys.totalHamiltonian
+    states = list(jcSys.simulation.qRes.states.values())[0]
+    for ind, stepSize in enumerate(stepSizes):
+        ref = qg.Unitary(hamiltonian, (len(states[ind])-1)*stepSize) @ jcSys.initialState
+        assert np.allclose(states[ind][-1].A, ref.A)
+
+def _drive(term, time):
+    term.frequency = 0.8*np.cos(1.5*time)
+
+@pytest.mark.parametrize("openSys", [False, True])
+def test_odeEvolFuncIntegratesTimeDependency(openSys, propagation):
+    # ODE evolFunc integrates the time-dependent Hamiltonian given by the timeDependency of a term
+    qub = qg.Qubit(frequency=1.0)
+    trm = qub.createTerm(operator=qg.sigmax, frequency=0)
+    trm.timeDependency = _drive
+    qub.initialState = 0
+    qub.simTotalTime = 2
+    qub.simStepSize = 0.1
+    collapseOps, decayRates = None, None
+    if openSys:
+        dis = dissipatorObj(superSys=qub)
+        dis.jOper = qg.sigmam()
+        dis.jRate = 0.1
+        dis.addToProtocol(qub._freeEvol)
+        collapseOps, decayRates = [qg.sigmam()], [0.1]
+    qub.simulation.evolFunc = timeEvolODE
+    qub.runSimulation()
+    odeStates = propagation.states(qub)[0]
+    timeList = [0.1*ind for ind in range(len(odeStates))]
+    refStates = qg.evolveODE(lambda time: 0.5*qg.sigmaz() + 0.8*np.cos(1.5*time)*qg.sigmax(), qg.basis(2, 0),
+                             timeList, collapseOps, decayRates)
+    for ref, ode in zip(refStates, odeStates):
+        assert np.allclose(ref.A, ode, atol=1e-7)
+    assert np.isclose(trm.frequency, 0.8*np.cos(1.5*timeList[-1]))
+
+def test_odeEvolFuncMatchesExpm(propagation):
+    # for a time-independent Hamiltonian, integrated states are the same as the exponentiated ones
+    refStates = propagation.states(propagation.run('expm'))
+    jcSys, _, _ = propagation.jcSystem()
+    jcSys.simulation.evolFunc = timeEvolODE
+    jcSys.runSimulation()
+    for ref, ode in zip(refStates, propagation.states(jcSys)):
+        assert np.allclose(ref, ode)
+
+def test_odeSolverIsNotPickled(propagation):
+    # the ODE solver of a protocol wraps local functions, so the protocol is pickled (e.g. for the parallel sweeps)
+    # without it. The protocol is pickled with all the (named) instances, so those of the other tests are set aside
+    registries = [qg.named._allInstacesDict, qg.qResults._allResults] # pylint: disable=protected-access
+    others = [dict(registry) for registry in registries]
+    for registry in registries:
+        registry.clear()
+    try:
+        jcSys, _, _ = propagation.jcSystem()
+        jcSys.simulation.evolFunc = timeEvolODE
+        jcSys.runSimulation()
+        assert jcSys._freeEvol._freeEvolution__odeSolver[0] is not None
+        assert pickle.loads(pickle.dumps(jcSys._freeEvol))._freeEvolution__odeSolver == (None, None)
+    finally:
+        for registry, other in zip(registries, others):
+            registry.update(other)
+
+def _pulseShape(time):
+    return 2*np.sin(np.pi*(time-0.2)/1.6)*np.cos(time)
+
+def _runDriven(propagation, propagator, stepSize):
+    # a qubit driven by a qDrive pulse through the timeDependency of a term
+    qub = qg.Qubit(frequency=1.0)
+    drive = qg.qDrive()
+    drive.addPulse(t0=0.2, t1=1.8, func=_pulseShape)
+    trm = qub.createTerm(operator=qg.sigmax, frequency=0)
+    trm.timeDependency = drive.timeDependency
+    qub.initialState = 0
+    qub.simTotalTime = 2
+    qub.simStepSize = stepSize
+    qub.simulation.propagator = propagator
+    qub.runSimulation()
+    return propagation.states(qub)[0][-1]
+
+def test_magnusPropagatorsForDrivenQubit(propagation):
+    # Magnus integrators evaluate the pulse within the steps, so they are much more accurate for the same step size
+    def hamiltonian(time):
+        return 0.5*qg.sigmaz() + (_pulseShape(time) if 1.8 > time > 0.2 else 0)*qg.sigmax()
+    ref = qg.evolveODE(hamiltonian, qg.basis(2, 0), [0, 2], rtol=1e-12, atol=1e-13)[-1].A
+    errors = {prop: np.abs(_runDriven(propagation, prop, 0.1) - ref).max()
+              for prop in ['expm', 'magnus2', 'magnus4', 'cf4']}
+    assert errors['expm'] > 10*errors['magnus2'] > 100*errors['magnus4']
+    assert errors['magnus4'] < 1e-5
+    assert errors['cf4'] < 1e-5
+
+@pytest.mark.parametrize("openSys", [False, True])
+def test_trotterPropagatorMatchesExpm(openSys, propagation):
+    # split-operator propagation should be within the Trotter tolerance of the exact one (open systems use krylov)
+    refStates = propagation.states(propagation.run('expm', openSys))
+    trotterStates = propagation.states(propagation.run('trotter', openSys))
+    for ref, tro in zip(refStates, trotterStates):
+        assert np.allclose(ref, tro, atol=1e-7)
+
+def test_trotterOptionsFixOrderAndSubsteps(propagation):
+    # a fixed low order and a single substep is less accurate than the error estimated parameters
+    refStates = propagation.states(propagation.run('expm'))
+    options = qg.freeEvolution.trotterOptions
+    qg.freeEvolution.trotterOptions = {'tolerance': 1e-8, 'order': 1, 'substeps': 1}
+    try:
+        lieStates = propagation.states(propagation.run('trotter'))
+    finally:
+        qg.freeEvolution.trotterOptions = options
+    assert not np.allclose(refStates[0], lieStates[0], atol=1e-4)
+
+@pytest.mark.parametrize("openSys, protocol", [(False, False), (True, False), (False, True)])
+def test_sectorsPropagatorMatchesExpm(openSys, protocol, propagation):
+    # block-wise exponentiation of the symmetry sectors should give the same states as the full exponentiation
+    refStates = propagation.states(propagation.run('expm', openSys, protocol))
+    sectorStates = propagation.states(propagation.run('sectors', openSys, protocol))
+    for ref, sec in zip(refStates, sectorStates):
+        assert np.allclose(ref, sec)
+
+def test_sectorsPropagatorWithConservedOperator(propagation):
+    # declared conserved excitation number gives the same (block-diagonal) unitary as the automatic detection, and an
+    # operator that is not conserved is rejected
+    jcSys, _, _ = propagation.jcSystem()
+    jcSys.simulation.propagator = 'sectors'
+    autoUnitary = jcSys._freeEvol.unitary().A
+    assert np.allclose(autoUnitary, qg.Unitary(jcSys.totalHamiltonian, 0.1).A)
+    jcSys._freeEvol.conserved = (sp.kron(qg.number(5), qg.identity(2)) +
+                                 sp.kron(qg.identity(5), qg.sigmap() @ qg.sigmam())).diagonal()
+    assert np.allclose(jcSys._freeEvol.sectorExponentiation().A, autoUnitary)
+    jcSys._freeEvol.conserved = sp.kron(qg.identity(5), qg.sigmaz())
+    with pytest.raises(ValueError):
+        jcSys._freeEvol.sectorExponentiation()
@@ -1,6 +1,8 @@
 import pytest
 import random as rnd
 import numpy as np
+from scipy.sparse.linalg import eigsh
+import quanguru as qg
 from quanguru.classes.QSystem import QuantumSystem
 from quanguru.QuantumToolbox.operators import sigmam, destroy
 from quanguru.QuantumToolbox import compositeOp
@@ -49,3 +51,43 @@ def test_dimensionAndOperatorCreatesMatrix():
     qsys = QuantumSystem(dimension=2, operator=sigmam)
     qsys._constructMatrices()
     assert np.allclose(qsys._firstTerm._paramBoundBase__matrix.A, sigmam(sparse=False))
+
+def _coupledComposite():
+    # a cavity coupled to three qubits, two of which are also coupled to each other (by two different couplings)
+    qubits = [qg.Qubit(frequency=1+0.1*ind) for ind in range(3)]
+    cavity = qg.Cavity(dimension=4, frequency=1.3)
+    comp = cavity + qubits[0] + qubits[1] + qubits[2]
+    comp.JC(0.2)
+    comp.createTerm(operator=[qg.sigmax, qg.sigmax], frequency=0.15, qSystem=[qubits[0], qubits[1]])
+    comp.createTerm(operator=[qg.Jz, qg.Jz], frequency=0.05, qSystem=[qubits[1], qubits[2]])
+    comp.initialState = [1, 0, 1, 0]
+    comp.simTotalTime = 1
+    comp.simStepSize = 0.1
+    return comp
+
+def test_matrixFreeHamiltonianMatchesTotalHamiltonian():
+    # Kronecker-structured Hamiltonian is created without the composite matrices of the terms, and it is the same as
+    # the total Hamiltonian (also for the iterative eigensolvers)
+    comp = _coupledComposite()
+    operator = comp.hamiltonianOperator
+    assert all(term._paramBoundBase__matrix is None for term in comp.terms.values()) #pylint: disable=protected-access
+    full = comp.totalHamiltonian.toarray()
+    assert np.allclose(operator @ np.identity(operator.shape[0]), full)
+    assert np.isclose(eigsh(operator, k=1, which='SA')[0][0], np.linalg.eigvalsh(full)[0])
+
+def test_matrixFreeKrylovEvolution():
+    # 'krylov' propagator with the matrix-free Hamiltonian gives the same states without creating the term matrices
+    results = []
+    for matrixFree in [False, True]:
+        comp = _coupledComposite()
+        states = []
+        def compute(qsys, state, states=states): # pylint: disable=unused-argument
+            states.append(state.toarray())
+        comp.compute = compute
+        comp._freeEvol.matrixFree = matrixFree #pylint: disable=protected-access
+        comp.simulation.propagator = 'krylov'
+        comp.runSimulation()
+        results.append(np.array(states))
+    assert all(term._paramBoundBase__matrix is None for term in comp.terms.values()) #pylint: disable=protected-access
+    assert results[0].shape == (11, 32, 1)
+    assert np.allclose(results[0], results[1])
@@ -0,0 +1,196 @@
+import numpy as np
+import pytest
+from quanguru import Qubit, Cavity, Spin, freeEvolution, qProtocol, expectation, basis #pylint: disable=import-error
+from quanguru import compositeOp, sigmaz, sigmax, sigmam, create, destroy, Jy, Jz #pylint: disable=import-error
+from quanguru import xGate, SpinRotation, Gate, normalise #pylint: disable=import-error
+from quanguru.classes.environment import dissipatorObj #pylint: disable=import-error
+from quanguru.classes.QCache import unitaryCache #pylint: disable=import-error
+from quanguru.classes.QSim import _poolMemory #pylint: disable=import-error
+
+
+# the helpers of the class tests are kept in this single conftest, since the (parallel) integration tests pickle the
+# functions of their own conftest module, which is replaced (as 'conftest') by any conftest imported after it
+
+
+class _propagation:
+    # used in the propagation fixture below
+    # creates and runs the (Jaynes-Cummings) systems used to compare the propagators, and collects their states
+
+    @staticmethod
+    def jcSystem(cavDim=5):
+        # a Jaynes-Cummings system with a non-trivial time evolution
+        cav = Cavity(dimension=cavDim, frequency=1)
+        qub = Qubit(frequency=1.2)
+        jcSys = cav + qub
+        jcSys.JC(0.3)
+        jcSys.initialState = [2, 1]
+        jcSys.simTotalTime = 2
+        jcSys.simStepSize = 0.1
+        return jcSys, cav, qub
+
+    @staticmethod
+    def states(qsys):
+        # stored states of each (qResults of the) simulation as arrays
+        return [np.array([st.A if hasattr(st, 'A') else st for st in sts])
+                for sts in qsys.simulation.qRes.states.values()]
+
+    @staticmethod
+    def run(propagator, openSys=False, protocol=False):
+        # runs the Jaynes-Cummings system with the given propagator, optionally with a cavity decay or a protocol of
+        # qubit rotations and free evolutions
+        jcSys, cav, qub = _propagation.jcSystem()
+        if openSys:
+            dis = dissipatorObj(superSys=cav)
+            dis.jOper = destroy(cav.dimension)
+            dis.jRate = 0.2
+            dis.addToProtocol(jcSys._freeEvol)
+        if protocol:
+            rot = SpinRotation(system=qub, angle=np.pi/3, rotationAxis='y')
+            freeEvol = freeEvolution(system=jcSys)
+            pro = qProtocol(system=jcSys, steps=[rot.hc, freeEvol, rot, freeEvol])
+            jcSys.simulation.addSubSys(jcSys, pro)
+        jcSys.simulation.propagator = propagator
+        jcSys.runSimulation()
+        return jcSys
+
+class _sweptSystems:
+    # used in the sweptSystems fixture below
+    # creates and runs the swept systems used to compare the sweep engines, and returns their results and states
+
+    @staticmethod
+    def jaynesCummings(batched, openSys=False):
+        # Jaynes-Cummings system with a sweep of the qubit frequency, storing the qubit population
+        cav = Cavity(dimension=4, frequency=1)
+        qub = Qubit(frequency=1.2)
+        jcSys = cav + qub
+        jcSys.JC(0.3)
+        jcSys.initialState = [1, 1]
+        jcSys.simTotalTime = 2
+        jcSys.simStepSize = 0.1
+        if openSys:
+            dis = dissipatorObj(superSys=cav)
+            dis.jOper = destroy(4)
+            dis.jRate = 0.1
+            dis.addToProtocol(jcSys._freeEvol)
+        jcSys.simulation.Sweep.createSweep(system=qub, sweepKey='frequency', sweepList=np.linspace(0.8, 1.6, 5))
+        szOper = compositeOp(sigmaz(), dimB=4)
+        def compute(qsys, state):
+            qsys.qRes.singleResult = 'sz', expectation(szOper, state)
+        jcSys.compute = compute
+        jcSys.simulation.batched = batched
+        unitaryCache.clear()
+        expCount = freeEvolution.numberOfExponentiations
+        jcSys.runSimulation()
+        states = [np.array([[st.A for st in sts] for sts in val]) for val in jcSys.simulation.qRes.states.values()]
+        return np.array(jcSys.qRes.resultsDict['sz']), states, freeEvolution.numberOfExponentiations - expCount
+
+    @staticmethod
+    def decayingQubit(trajectories, seed=None):
+        # decaying qubit starting from a superposition with a sweep of its frequency, storing the sigma-x expectation
+        qub = Qubit(frequency=1)
+        qub.initialState = [0, 1]
+        qub.simTotalTime = 1
+        qub.simStepSize = 0.1
+        dis = dissipatorObj(superSys=qub)
+        dis.jOper = sigmam()
+        dis.jRate = 1
+        dis.addToProtocol(qub._freeEvol)
+        qub.simulation.Sweep.createSweep(system=qub, sweepKey='frequency', sweepList=[1, 3])
+        def compute(qsys, state):
+            qsys.qRes.singleResult = 'sx', expectation(sigmax(), state)
+        qub.compute = compute
+        qub.simulation.trajectories = trajectories
+        qub.simulation.seed = seed
+        qub.runSimulation()
+        return np.array(qub.qRes.resultsDict['sx']), dict(qub.simulation.qRes.states)
+
+    @staticmethod
+    def kickedTop(floquet):
+        # kicked top (a two-step periodic protocol) with a sweep of the kick strength, storing the Jz expectation
+        rotation = Spin(operator=Jy, frequency=1, jValue=5)
+        kick = Spin(operator=Jz, frequency=1, order=2, jValue=5)
+        top = qProtocol(superSys=rotation, steps=[freeEvolution(superSys=rotation, ratio=1/(2*np.pi)),
+                                                   freeEvolution(superSys=kick, ratio=1/(2*np.pi*10))])
+        top.simStepSize = 1
+        top.simTotalTime = 50
+        top.initialState = basis(rotation.dimension, 1)
+        top.simulation.Sweep.createSweep(system=kick, sweepKey='frequency', sweepList=[0.5, 3])
+        jzOper = Jz(5)
+        def compute(qsim, state): # pylint: disable=unused-argument
+            qsim.qRes.singleResult = 'jz', expectation(jzOper, top.currentState)
+        top.simCompute = compute
+        top.simulation.floquet = floquet
+        diagCount = qProtocol.numberOfDiagonalisations
+        top.runSimulation()
+        states = [np.array([[st.A for st in sts] for sts in val]) for val in top.simulation.qRes.states.values()]
+        return (top, np.array(top.simulation.qRes.resultsDict['jz']), states,
+                qProtocol.numberOfDiagonalisations - diagCount)
+
+    @staticmethod
+    def gateProtocol(floquet, localGates=False, productTree=False):
+        # Jaynes-Cummings evolution with two gates on the qubit (a four-step periodic protocol) and a sweep of a gate
+        # angle
+        cav = Cavity(dimension=3, frequency=1)
+        qub = Qubit(frequency=1.1)
+        jcSys = cav + qub
+        jcSys.JC(0.2)
+        gate = xGate(system=qub, angle=0.3, implementation='instant')
+        free, rotation = freeEvolution(superSys=jcSys), SpinRotation(system=qub, angle=0.2, rotationAxis='y')
+        protocol = qProtocol(superSys=jcSys, steps=[free, gate, free, rotation])
+        protocol.simStepSize = 1
+        protocol.simTotalTime = 20
+        protocol.initialState = normalise(basis(6, 1) + basis(6, 4))
+        protocol.simulation.Sweep.createSweep(system=gate, sweepKey='angle', sweepList=[0.3, 0.6, 0.9])
+        protocol.simulation.floquet = floquet
+        diagCount = qProtocol.numberOfDiagonalisations
+        localApplication, Gate.localApplication = Gate.localApplication, localGates
+        treeComposition, qProtocol.treeComposition = qProtocol.treeComposition, productTree
+        try:
+            protocol.runSimulation()
+        finally:
+            Gate.localApplication = localApplication
+            qProtocol.treeComposition = treeComposition
+        states = [np.array([[st.A for st in sts] for sts in val]) for val in protocol.simulation.qRes.states.values()]
+        return protocol, states, qProtocol.numberOfDiagonalisations - diagCount
+
+    @staticmethod
+    def cavityDimensions(compute, p):
+        # driven cavity with a sweep of its dimension, i.e. the sweep points have different costs. The compute function
+        # is given by the test module, since the functions of this conftest cannot be pickled (see above)
+        cav = Cavity(dimension=3, frequency=1, initialState=1, simTotalTime=1, simStepSize=0.1, simCompute=compute)
+        cav.createTerm(operator=destroy, frequency=0.3)
+        cav.createTerm(operator=create, frequency=0.3)
+        cav.simulation.Sweep.createSweep(system=cav.name, sweepKey='dimension', sweepList=[2, 6, 3, 8, 4])
+        calls = []
+        cav.simulation.progress = lambda done, total, eta: calls.append((done, total, eta))
+        cav.runSimulation(p=p, coreCount=2)
+        return cav.simulation, calls
+
+    @staticmethod
+    def resonance(qSim, states): # pylint: disable=unused-argument
+        # stores a Lorentzian peak of the qubit frequency around 1.03
+        qSim.qRes.singleResult = ['peak', 1/(1 + ((qSim.superSys.frequency - 1.03)/0.02)**2)]
+
+    @staticmethod
+    def resonantQubit(sweepList):
+        # qubit with a sweep of its frequency, storing the resonance peak, and the sweep
+        qub = Qubit(frequency=1, initialState=[1, 0], simTotalTime=1, simStepSize=0.1,
+                    simCompute=_sweptSystems.resonance)
+        return qub, qub.simulation.Sweep.createSweep(system=qub.name, sweepKey='frequency', sweepList=sweepList)
+
+@pytest.fixture
+def sweptSystems():
+    # sweptSystems fixture used to access above class and its methods from the tests
+    return _sweptSystems
+
+@pytest.fixture
+def propagation():
+    # propagation fixture used to access above class and its methods from the tests
+    return _propagation
+
+@pytest.fixture(autouse=True)
+def forgetPoolSize():
+    # the pool size of a parallel run is remembered and used (in parallel) by the later runs, so it is not carried over
+    # from one test to the next
+    yield
+    _poolMemory.coreCount = None
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+import quanguru as qg
+from quanguru.classes.QCache import unitaryCache
+from quanguru.classes.QPropagators import analyticPropagators
+
+def _jaynesCummings():
+    cav = qg.Cavity(dimension=5, frequency=1)
+    qub = qg.Qubit(frequency=1.2)
+    jcSys = cav + qub
+    jcSys.JC(0.3)
+    jcSys.initialState = [1, 1]
+    return jcSys
+
+def _qubitRotation():
+    qub = qg.Qubit(frequency=0.5)
+    qub.createTerm(operator=qg.sigmax, frequency=0.8)
+    qub.initialState = 0
+    return qub
+
+def _cavity():
+    cav = qg.Cavity(dimension=6, frequency=1.1)
+    cav.initialState = qg.normalise(qg.basis(6, 1) + qg.basis(6, 4))
+    return cav
+
+def _diagonal():
+    spin = qg.Spin(jValue=1, frequency=0.4)
+    cav = qg.Cavity(dimension=3, frequency=1.1)
+    comp = spin + cav
+    comp.initialState = [qg.normalise(qg.basis(3, 0) + qg.basis(3, 2)), 1]
+    return comp
+
+def _finalState(createSystem, enabled):
+    analyticPropagators.enabled = enabled
+    unitaryCache.clear()
+    qsys = createSystem()
+    qsys.simTotalTime = 1
+    qsys.simStepSize = 0.1
+    qsys.simulation.delStates = False
+    qsys.runSimulation()
+    return np.array([state.toarray() for states in qsys.simulation.qRes.states.values() for state in states])
+
+@pytest.mark.parametrize("createSystem, name", [[_jaynesCummings, 'JaynesCummings'],
+                                                [_qubitRotation, 'qubitRotation'],
+                                                [_cavity, 'harmonicOscillator'],
+                                                [_diagonal, 'diagonal']])
+def test_closedFormsMatchExponentiation(createSystem, name):
+    # recognised systems use their closed-form propagator (without counting an exponentiation), and the evolution is
+    # the same as the exponentiation
+    enabled = analyticPropagators.enabled
+    try:
+        uses = analyticPropagators.uses[name]
+        expCount = qg.freeEvolution.numberOfExponentiations
+        expected = _finalState(createSystem, False)
+        assert analyticPropagators.uses[name] == uses
+        assert qg.freeEvolution.numberOfExponentiations == expCount + 1
+        states = _finalState(createSystem, True)
+        assert analyticPropagators.uses[name] == uses + 1
+        assert qg.freeEvolution.numberOfExponentiations == expCount + 1
+        assert (len(states) == 11) and np.allclose(states, expected)
+    finally:
+        analyticPropagators.enabled = enabled
+        unitaryCache.clear()
+
+def test_matchAndRegister():
+    # Rabi coupling is not matched by any propagator, and user-registered propagators are also used
+    cav = qg.Cavity(dimension=4, frequency=1)
+    qub = qg.Qubit(frequency=1)
+    rabi = cav + qub
+    rabi.createTerm(operator=[qg.destroy, qg.sigmax], frequency=0.2, qSystem=[cav, qub])
+    assert analyticPropagators.match(rabi) is None
+    assert analyticPropagators.match(qub) == 'diagonal'
+    analyticPropagators.register('custom', lambda qsys: qsys is rabi, lambda ham, time: 'closed form')
+    enabled = analyticPropagators.enabled
+    try:
+        assert analyticPropagators.unitary(rabi, None, 0.1) is None
+        analyticPropagators.enabled = True
+        assert analyticPropagators.unitary(rabi, None, 0.1) == 'closed form'
+        assert analyticPropagators.uses['custom'] == 1
+    finally:
+        analyticPropagators.unregister('custom')
+        analyticPropagators.enabled = enabled
+    assert analyticPropagators.unitary(rabi, None, 0.1) is None
@@ -1,6 +1,10 @@
+import platform
 import numpy as np
 import pytest
-from quanguru import QuantumSystem, sigmam, Qubit, freeEvolution
+from quanguru import QuantumSystem, sigmam, Qubit, freeEvolution, named, qResults, expectation, number
+from quanguru.classes.modularSweep import _sweepCosts, _sweepChunks
+from quanguru.classes.QSim import _poolMemory
+from quanguru.classes.QSweep import _sweep
 
 # write a compute function for the qubit
 def computeREF(qub, st):
@@ -82,3 +86,170 @@ def test_noInitialStateRequiredWhenNoTimeEvolutionWithOrder():
     # run the simulation
     with pytest.raises(TypeError):
         states = qsys.runSimulation()
+
+@pytest.mark.parametrize("openSys", [False, True])
+def test_batchedSweepMatchesDefault(openSys, sweptSystems):
+    # batched engine gives the same results and states (in the same layout) without any exponentiation, and it falls
+    # back to the default for the open systems
+    refResults, refStates, refCount = sweptSystems.jaynesCummings(False, openSys)
+    results, states, count = sweptSystems.jaynesCummings(True, openSys)
+    assert results.shape == refResults.shape == (5, 21)
+    assert np.allclose(results, refResults)
+    for ref, sts in zip(refStates, states):
+        assert np.allclose(ref, sts)
+    assert refCount == 5
+    assert count == (5 if openSys else 0)
+
+def test_trajectoryAveragesMatchDensityMatrix(sweptSystems):
+    # averages of the quantum-jump trajectories approximate the density matrix results, the same seed gives the same
+    # averages, and the states are not stored for the trajectories
+    refResults, _ = sweptSystems.decayingQubit(None)
+    results, states = sweptSystems.decayingQubit(100, seed=7)
+    assert results.shape == refResults.shape == (2, 11)
+    assert np.allclose(results, refResults, atol=0.2)
+    assert np.allclose(results, sweptSystems.decayingQubit(100, seed=7)[0])
+    assert all(len(val) == 0 for val in states.values())
+
+def test_floquetMatchesDefault(sweptSystems):
+    # stroboscopic states from the Floquet modes (one diagonalisation per sweep point) are the same as the stepwise
+    # evolution, and the quasi-energies are the phases of the eigenvalues of the period unitary
+    _, refResults, refStates, refCount = sweptSystems.kickedTop(False)
+    top, results, states, count = sweptSystems.kickedTop(True)
+    assert results.shape == refResults.shape
+    assert np.allclose(results, refResults)
+    for ref, sts in zip(refStates, states):
+        assert np.allclose(ref, sts)
+    assert (refCount, count) == (0, 2)
+    eigenValues = np.linalg.eigvals(top.unitary().toarray())
+    assert np.allclose(top.quasiEnergies, np.sort(-np.angle(eigenValues)))
+
+def test_gateProtocolUsesFloquetAndProductTree(sweptSystems):
+    # gates are not applied locally by default, so a protocol of gates and free evolutions is evolved by its Floquet
+    # modes, its unitary is composed by the (opt-in) product tree (re-computing only the swept gate), and the states
+    # are the same as the stepwise and the (opt-in) local application
+    protocol, refStates, refCount = sweptSystems.gateProtocol(False)
+    _, localStates, _ = sweptSystems.gateProtocol(False, localGates=True)
+    protocol, states, count = sweptSystems.gateProtocol(True, productTree=True)
+    assert (refCount, count) == (0, 3)
+    assert protocol.productTree.stats() == {'compositions': 3, 'updatedSteps': 6, 'multiplications': 7, 'saved': 2}
+    for ref, local, sts in zip(refStates, localStates, states):
+        assert np.allclose(ref, sts) and np.allclose(ref, local)
+
+def _computeDimension(qSim, states):
+    # stores the photon number and the dimension of the swept cavity
+    qSim.qRes.singleResult = 'n', expectation(number(states[0].shape[0]), states[0])
+    qSim.qRes.singleResult = 'dim', states[0].shape[0]
+
+def test_sweepCostsAndAdaptiveChunks(sweptSystems):
+    # dimension sweeps are ordered by the cost of exponentiation, and adaptive chunks get smaller towards the end
+    qSim, calls = sweptSystems.cavityDimensions(_computeDimension, False)
+    costs = _sweepCosts(qSim)
+    assert costs == [8, 216, 27, 512, 64]
+    assert _sweepChunks(sorted(range(5), key=lambda ind: -costs[ind]), costs, 2) == [[3], [1], [4], [2], [0]]
+    assert [len(chunk) for chunk in _sweepChunks(list(range(20)), [1]*20, 2)] == [5, 3, 3, 2] + 7*[1]
+    assert _sweepChunks(list(range(5)), [1]*5, 2, chunkSize=2) == [[0, 1], [2, 3], [4]]
+    qSim.sweepCost = lambda ind: -ind
+    assert _sweepCosts(qSim) == [0, -1, -2, -3, -4]
+    assert [call[:2] for call in calls] == [(done, 5) for done in range(1, 6)] and calls[-1][2] == 0
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason="requires fork")
+def test_streamedParallelSweepMatchesSerial(sweptSystems):
+    # results completed in any order are written into their sweep positions, and the progress is reported
+    # the simulation is pickled with all the (named) instances and results, so those of the other tests are set aside
+    registries = [named._allInstacesDict, qResults._allResults] # pylint: disable=protected-access
+    others = [dict(registry) for registry in registries]
+    for registry in registries:
+        registry.clear()
+    try:
+        serial = np.array(sweptSystems.cavityDimensions(_computeDimension, False)[0].qRes.resultsDict['n'])
+        parallel, calls = sweptSystems.cavityDimensions(_computeDimension, True)
+    finally:
+        for registry, other in zip(registries, others):
+            registry.update(other)
+        # the pool size is otherwise remembered and used by the later runs
+        _poolMemory.coreCount = None
+    assert [dim[0] for dim in parallel.qRes.resultsDict['dim']] == [2, 6, 3, 8, 4]
+    assert np.allclose(serial, np.array(parallel.qRes.resultsDict['n']))
+    assert (calls[-1][:2] == (5, 5)) and (len(calls) <= 5)
+
+def test_refinePointsConcentrateOnFastChanges():
+    # mid-points of the intervals with above-mean variation are returned (in decreasing variation), up to the count
+    sweep = _sweep()
+    assert sweep.refinePoints([0, 1, 2, 3], [0, 0, 1, 1], 5) == [1.5]
+    assert sweep.refinePoints([0, 1, 2, 3], [0, 0, 0, 0], 2) == [0.5, 1.5]
+    sweep.refineTolerance = 1.1
+    assert sweep.refinePoints([0, 1, 2, 3], [0, 0, 1, 1], 5) == []
+    sweep.logSweep, sweep.refineTolerance = True, 0
+    assert np.allclose(sweep.refinePoints([1, 100], [0, 1], 1), [10])
+
+def test_adaptiveSweepMatchesRunOverRefinedList(sweptSystems):
+    # the points are concentrated around the resonance, within the budget, and the results are the same as a run
+    # over the refined coordinates
+    qub, sweep = sweptSystems.resonantQubit(np.linspace(0, 2, 11))
+    sweep.refineKey, sweep.refineBudget = 'peak', 30
+    qub.runSimulation()
+    assert len(sweep.refinedList) == 30 and len(sweep.sweepList) == 11
+    assert np.all(np.diff(sweep.refinedList) > 0)
+    assert sum(abs(value - 1.03) < 0.1 for value in sweep.refinedList) > 15
+    peaks = qub.simulation.qRes.resultsDict['peak']
+    states = qub.simulation.states[qub.name + 'Results']
+
+    sweep.refineKey, sweep.sweepList = None, sweep.refinedList
+    qub.runSimulation()
+    assert np.allclose(peaks, qub.simulation.qRes.resultsDict['peak'])
+    assert np.allclose([state.A for sts in states for state in sts],
+                       [state.A for sts in qub.simulation.states[qub.name + 'Results'] for state in sts])
+
+def test_adaptiveSweepRefusesCheckpoint(tmp_path, sweptSystems):
+    # each round of the refinement is a different sweep, so it cannot be checkpointed (or resumed)
+    qub, sweep = sweptSystems.resonantQubit(np.linspace(0, 2, 5))
+    sweep.refineKey = 'peak'
+    with pytest.raises(ValueError, match='checkpoint'):
+        qub.runSimulation(resume=str(tmp_path / 'sweep.pkl'))
+
+def test_compiledSweepPlanRunsOnlyChangedSweeps(monkeypatch, sweptSystems):
+    # the plan has the same indices as the modular arithmetic, and only the changed sweeps are run at each point
+    qub, _ = sweptSystems.resonantQubit([0.9, 1, 1.1])
+    qub.simulation.Sweep.createSweep(system=qub.name, sweepKey='simTotalTime', sweepList=[1, 2, 3, 4],
+                                     combinatorial=True)
+    simSweep = qub.simulation.Sweep
+    simSweep.prepare()
+    assert np.array_equal(simSweep.indexTable, [simSweep._indicesForSweep(ind, *simSweep.inds) for ind in range(12)])
+
+    calls = []
+    runSweep = _sweep.runSweep
+    def countedRunSweep(sweep, ind):
+        calls.append(sweep.sweepKey)
+        runSweep(sweep, ind)
+    monkeypatch.setattr(_sweep, 'runSweep', countedRunSweep)
+    def results():
+        qub.runSimulation()
+        counts = (calls.count('frequency'), calls.count('simTotalTime'))
+        calls.clear()
+        states = [state.A for sts in qub.simulation.states[qub.name + 'Results'] for st in sts for state in st]
+        return counts, [np.array(row, dtype=object) for row in qub.simulation.qRes.resultsDict['peak']], states
+
+    counts, peaks, states = results()
+    # reference run without the plan, i.e. all the sweeps are run at each point by the modular arithmetic
+    with monkeypatch.context() as patch:
+        def runPoint(simSweep, ind):
+            simSweep.runSweep(simSweep._indicesForSweep(ind, *simSweep.inds))
+        patch.setattr(type(simSweep), 'runPoint', runPoint)
+        refCounts, refPeaks, refStates = results()
+    assert (counts, refCounts) == ((3, 12), (12, 12))
+    assert all(np.allclose(np.concatenate(row), np.concatenate(ref)) for row, ref in zip(peaks, refPeaks))
+    assert len(states) == len(refStates) == 3*(11 + 21 + 31 + 41) and np.allclose(states, refStates)
+    lastPeaks = [[peak[-1] for peak in row] for row in peaks]
+    expected = [1/(1 + ((freq - 1.03)/0.02)**2) for freq in [0.9, 1, 1.1]]
+    assert np.allclose(lastPeaks, np.repeat(expected, 4).reshape(3, 4))
+
+    calls.clear()
+    simSweep.prepare(changedOnly=True)
+    for ind in [5, 6, 0]:
+        simSweep.runPoint(ind)
+    assert calls == ['frequency', 'simTotalTime', 'simTotalTime', 'frequency', 'simTotalTime']
+    calls.clear()
+    simSweep.prepare()
+    for ind in [5, 6]:
+        simSweep.runPoint(ind)
+    assert calls == 2*['frequency', 'simTotalTime']
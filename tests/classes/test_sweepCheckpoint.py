@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import quanguru as qg
+
+def _comp(qSim, states):
+    qSim.qRes.singleResult = ['x', qg.expectation(qg.sigmax(), states[0])]
+
+def _qubitSweep():
+    qub = qg.Qubit(frequency=1, initialState={0: 0.6, 1: 0.8}, _inpCoef=True, simTotalTime=1, simStepSize=0.1,
+                   simCompute=_comp)
+    qub.simulation.Sweep.createSweep(system=qub.name, sweepKey='frequency', sweepList=[0.5, 1, 1.5])
+    qub.simulation.Sweep.createSweep(system=qub.name, sweepKey='frequency', sweepList=[0.1, 0.2], combinatorial=True)
+    return qub
+
+def _flatStates(states):
+    if isinstance(states, list):
+        return [matrix for state in states for matrix in _flatStates(state)]
+    return [states.A]
+
+def test_interruptedSweepIsResumedFromCheckpoint(tmp_path):
+    # an interrupted sweep resumes from the last completed point, and the results are the same as the full run
+    qub = _qubitSweep()
+    qub.runSimulation()
+    results = np.array(qub.simulation.qRes.resultsDict['x'])
+    states = _flatStates(qub.simulation.states[qub.name+'Results'])
+
+    evolved = []
+    def interrupt(qSim):
+        evolved.append(qSim.superSys.frequency)
+        if len(evolved) == 4:
+            raise KeyboardInterrupt
+    qub.simulation.preCompute = interrupt
+    qub.simulation.checkpointInterval = 0
+    with pytest.raises(KeyboardInterrupt):
+        qub.simulation.run(resume=str(tmp_path / 'sweep.pkl'))
+
+    evolved.clear()
+    qub.runSimulation(resume=True)
+    assert len(evolved) == 3
+    assert np.allclose(qub.simulation.qRes.resultsDict['x'], results)
+    assert np.allclose(_flatStates(qub.simulation.states[qub.name+'Results']), states)
+
+    evolved.clear()
+    qub.runSimulation(resume=True)
+    assert (len(evolved) == 0) and np.allclose(qub.simulation.qRes.resultsDict['x'], results)
+
+def test_parallelResumeAndSignatureCheck(tmp_path):
+    # a truncated (last) save is ignored, the parallel sweep evolves only the missing points, and a checkpoint of a
+    # different sweep is not resumed. The simulation is pickled with all the (named) instances and results, so those
+    # of the other tests are set aside
+    registries = [qg.named._allInstacesDict, qg.qResults._allResults] # pylint: disable=protected-access
+    others = [dict(registry) for registry in registries]
+    for registry in registries:
+        registry.clear()
+    try:
+        qub = _qubitSweep()
+        qub.runSimulation()
+        results = np.array(qub.simulation.qRes.resultsDict['x'])
+
+        path = tmp_path / 'sweep.pkl'
+        qub.simulation.checkpointInterval = 0
+        qub.simulation.run(resume=str(path))
+        with open(path, 'r+b') as file:
+            file.truncate(path.stat().st_size - 5)
+        assert sorted(qg.sweepCheckpoint.open(qub.simulation, resume=True).completed) == list(range(5))
+
+        qub.runSimulation(p=qg.localExecutor(), resume=True)
+        assert np.allclose(qub.simulation.qRes.resultsDict['x'], results)
+        assert sorted(qg.sweepCheckpoint.open(qub.simulation, resume=True).completed) == list(range(6))
+
+        list(qub.simulation.Sweep.sweeps.values())[0].sweepList = [0.5, 1, 2]
+        with pytest.raises(ValueError):
+            qub.runSimulation(resume=True)
+    finally:
+        for registry, other in zip(registries, others):
+            registry.update(other)
@@ -0,0 +1,136 @@
+import numpy as np
+import quanguru as qg
+from quanguru.classes.QCache import unitaryCache, unitaryProductTree, operatorCache
+
+def test_cacheKeyUsesContent():
+    # keys of different objects with the same content are the same
+    key = unitaryCache.key(qg.sigmaz(), [qg.sigmam()], [0.1], 0.5)
+    assert key == unitaryCache.key(qg.sigmaz(), [qg.sigmam()], [0.1], 0.5)
+    assert unitaryCache.key(qg.sigmaz(), None, None, 0.5) != unitaryCache.key(qg.sigmaz(), None, None, 0.25)
+    assert unitaryCache.key(qg.sigmaz()) != unitaryCache.key(qg.sigmax())
+
+def test_cacheEvictionAndStats():
+    # least-recently-used matrices are evicted when the memory budget is exceeded
+    budget, policy = unitaryCache.memoryBudget, unitaryCache.policy
+    unitaryCache.clear()
+    matrices = [np.full((4, 4), i, dtype=complex) for i in range(3)]
+    unitaryCache.memoryBudget = 2*matrices[0].nbytes
+    unitaryCache.policy = 'lru'
+    try:
+        unitaryCache.add('a', matrices[0])
+        unitaryCache.add('b', matrices[1])
+        assert unitaryCache.get('a') is matrices[0]
+        unitaryCache.add('c', matrices[2])
+        assert unitaryCache.get('b') is None
+        assert unitaryCache.get('a') is matrices[0]
+        assert unitaryCache.stats() == {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2,
+                                        'memory': 2*matrices[0].nbytes}
+    finally:
+        unitaryCache.memoryBudget, unitaryCache.policy = budget, policy
+        unitaryCache.clear()
+
+def test_sweepReusesCachedUnitaries():
+    # a sweep axis (initial state) that does not change the Hamiltonian re-uses the cached unitaries, instead of
+    # re-exponentiating for the inner (frequency) sweep at every value of the outer one
+    unitaryCache.clear()
+    cav = qg.Cavity(dimension=5, frequency=1)
+    qub = qg.Qubit(frequency=1.2)
+    jcSys = cav + qub
+    jcSys.JC(0.3)
+    jcSys.initialState = [0, 1]
+    jcSys.simTotalTime = 1
+    jcSys.simStepSize = 0.1
+    jcSys.simulation.Sweep.createSweep(system=cav, sweepKey='initialState', sweepList=[0, 1, 2])
+    jcSys.simulation.Sweep.createSweep(system=qub, sweepKey='frequency', sweepList=[1, 1.5], combinatorial=True)
+    expCount = qg.freeEvolution.numberOfExponentiations
+    jcSys.runSimulation()
+    assert qg.freeEvolution.numberOfExponentiations - expCount == 2
+    assert unitaryCache.hits == 4
+    unitaryCache.clear()
+
+def test_timeDependentHamiltoniansAreNotCached():
+    # a time-dependent term gives a new Hamiltonian at every step, so its exponentials are neither looked up nor cached
+    unitaryCache.clear()
+    qub = qg.Qubit(frequency=1)
+    qub.terms[list(qub.terms)[0]].timeDependency = lambda term, time: setattr(term, 'frequency', 1 + time)
+    qub.initialState = 0
+    qub.simTotalTime = 1
+    qub.simStepSize = 0.1
+    expCount = qg.freeEvolution.numberOfExponentiations
+    qub.runSimulation()
+    assert qg.freeEvolution.numberOfExponentiations - expCount == 10
+    assert unitaryCache.stats() == {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'memory': 0}
+    assert unitaryCache.get(None) is None
+    unitaryCache.clear()
+
+def test_productTreeRecomputesOnlyChangedPaths():
+    # the tree gives the same product, and a single changed unitary (out of 8) needs only 3 (log2(8)) multiplications
+    rng = np.random.default_rng(3)
+    unitaries = [rng.normal(size=(3, 3)) for _ in range(8)]
+    tree = unitaryProductTree()
+    assert tree.product([]) is None
+    assert np.allclose(tree.product(unitaries), np.linalg.multi_dot(unitaries[::-1]))
+    unitaries[5] = rng.normal(size=(3, 3))
+    assert np.allclose(tree.product(unitaries), np.linalg.multi_dot(unitaries[::-1]))
+    assert tree.stats() == {'compositions': 3, 'updatedSteps': 9, 'multiplications': 10, 'saved': 4}
+    assert np.allclose(tree.product(unitaries[:5]), np.linalg.multi_dot(unitaries[:5][::-1]))
+
+def test_productTreeDetectsChangesByContent():
+    # an in-place change of a unitary is re-computed, whereas re-created unitaries with the same content are not
+    rng = np.random.default_rng(5)
+    unitaries = [rng.normal(size=(3, 3)) for _ in range(4)]
+    tree = unitaryProductTree()
+    tree.product(unitaries)
+    unitaries[1] *= 2
+    assert np.allclose(tree.product(unitaries), np.linalg.multi_dot(unitaries[::-1]))
+    assert (tree.updatedSteps == 5) and (tree.multiplications == 5)
+    unitaries = [unitary.copy() for unitary in unitaries]
+    assert np.allclose(tree.product(unitaries), np.linalg.multi_dot(unitaries[::-1]))
+    assert (tree.updatedSteps == 5) and (tree.multiplications == 5)
+
+def test_protocolComposesOnlyUpdatedSteps():
+    # the tree composition is opt-in, and changing the system of a single step of a protocol re-computes only the
+    # products on its path in the tree
+    qubits = [qg.Qubit(frequency=0.1*(ind+1)) for ind in range(8)]
+    protocol = qg.qProtocol(superSys=qubits[0], steps=[qg.freeEvolution(superSys=qubit) for qubit in qubits])
+    protocol.simStepSize = 0.5
+    def reference():
+        return np.linalg.multi_dot([qg.Unitary(qubit.totalHamiltonian, 0.5).A for qubit in qubits[::-1]])
+    assert np.allclose(protocol.unitary().A, reference())
+    assert protocol.productTree.stats()['compositions'] == 0
+    treeComposition, qg.qProtocol.treeComposition = qg.qProtocol.treeComposition, True
+    try:
+        qubits[0].frequency = 0.5
+        assert np.allclose(protocol.unitary().A, reference())
+        qubits[3].frequency = 2
+        assert np.allclose(protocol.unitary().A, reference())
+    finally:
+        qg.qProtocol.treeComposition = treeComposition
+    assert protocol.productTree.stats() == {'compositions': 2, 'updatedSteps': 9, 'multiplications': 10, 'saved': 4}
+    qubits[3].frequency = 1
+    assert np.allclose(protocol.unitary().A, reference())
+    assert protocol.productTree.stats()['compositions'] == 0
+
+def test_operatorCacheReusesTermOperators():
+    # re-created systems re-use the cached (composite) operators, which are separate from the cached unitaries
+    operatorCache.clear()
+    matrices = []
+    for _ in range(2):
+        comp = qg.Cavity(dimension=3, frequency=1) + qg.Qubit(frequency=1)
+        matrices.append(comp.totalHamiltonian.toarray())
+    stats = operatorCache.stats()
+    assert (stats['misses'], stats['hits'], stats['size']) == (2, 2, 2)
+    assert np.allclose(matrices[0], matrices[1])
+    assert unitaryCache._cache is not operatorCache._cache # pylint: disable=protected-access
+    operatorCache.clear()
+
+def test_cachedOperatorsAreNotShared():
+    # the terms get copies of the cached operators, so an in-place change of one term does not leak into the others
+    operatorCache.clear()
+    qubits = [qg.Qubit(frequency=1) for _ in range(2)]
+    operators = [qubit.terms[list(qubit.terms)[0]]._constructMatrices() for qubit in qubits] # pylint: disable=protected-access
+    assert operators[0] is not operators[1]
+    operators[0].data *= 2
+    assert np.allclose(operators[1].toarray(), np.diag([0.5, -0.5]))
+    assert np.allclose(qg.Qubit(frequency=1).totalHamiltonian.toarray(), np.diag([0.5, -0.5]))
+    operatorCache.clear()
@@ -0,0 +1,150 @@
+import pickle
+import platform
+import warnings
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+import pytest
+import quanguru as qg
+from quanguru.classes import QPool
+from quanguru.classes.QPool import workerPool, sharedStates, sweepExecutor, threadBudget
+from quanguru.classes.QRes import qResBlank
+from quanguru.classes.QSim import _poolMemory
+
+@contextmanager
+def _isolatedRegistries():
+    # the simulation is pickled with all the (named) instances and results, so those of the other tests are set aside
+    registries = [qg.named._allInstacesDict, qg.qResults._allResults] # pylint: disable=protected-access
+    others = [dict(registry) for registry in registries]
+    for registry in registries:
+        registry.clear()
+    try:
+        yield
+    finally:
+        for registry, other in zip(registries, others):
+            registry.update(other)
+
+def _comp(qSim, states):
+    qSim.qRes.singleResult = ['x', qg.expectation(qg.sigmax(), states[0])]
+
+def _sweepResults(p):
+    qub = qg.Qubit(frequency=1, initialState={0: 0.6, 1: 0.8}, _inpCoef=True, simTotalTime=1, simStepSize=0.1,
+                   simCompute=_comp)
+    qub.simulation.Sweep.createSweep(system=qub.name, sweepKey='frequency', sweepList=[0.5, 1, 1.5])
+    qub.runSimulation(p=p, coreCount=2)
+    states = qub.simulation.states[qub.name + 'Results']
+    assert all(sp.issparse(state) for sweepStates in states for state in sweepStates)
+    return np.array(qub.simulation.qRes.resultsDict['x']), np.array([[st.A for st in sts] for sts in states])
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason="requires fork")
+def test_persistentPoolIsReusedAcrossRuns():
+    # runs use (and do not close) the started pool until it is closed, and give the same results as a single process
+    with _isolatedRegistries():
+        serial = _sweepResults(False)
+        pool = workerPool.start(2)
+        try:
+            runs = workerPool.runs
+            assert workerPool.start() is pool
+            for _ in range(2):
+                assert all(np.allclose(par, ser) for par, ser in zip(_sweepResults(True), serial))
+                assert workerPool.active() and workerPool.processes() == 2
+            assert workerPool.runs == runs + 2
+            assert all(np.allclose(par, ser) for par, ser in zip(_sweepResults(False), serial))
+            assert workerPool.runs == runs + 2
+        finally:
+            workerPool.close()
+    assert not workerPool.active()
+
+def test_workerSimulationIsUnpickledOncePerRun():
+    # the worker re-uses the simulation of a run, and un-pickles the new one for the next run
+    token, payload = workerPool._payload({'frequency': 1}) # pylint: disable=protected-access
+    simulation = workerPool._simulation(token, payload) # pylint: disable=protected-access
+    assert workerPool._simulation(token, payload) is simulation # pylint: disable=protected-access
+    newToken, newPayload = workerPool._payload({'frequency': 1}) # pylint: disable=protected-access
+    assert newToken != token
+    assert workerPool._simulation(newToken, newPayload) is not simulation # pylint: disable=protected-access
+
+def test_sharedStatesRoundTrip():
+    # states written into the shared memory (by a worker) are replaced by a status record and read back by the main
+    # process, and the states that do not fit are left as they are
+    transport = sharedStates({('res', 'ket'): (2, 3, 2, 1)})
+    states = [qg.basis(2, 0), qg.basis(2, 1), 1j*qg.basis(2, 0)]
+    worker = pickle.loads(pickle.dumps(transport))
+    valUni = qResBlank()
+    valUni.states['ket'] = states
+    valUni.states['other'] = [qg.basis(3, 0)]
+    worker.write('res', valUni, 1)
+    worker.close()
+    assert valUni.states['ket'][0] == sharedStates.marker
+    transport.read('res', valUni, 1)
+    transport.close(unlink=True)
+    assert all(sp.issparse(state) and np.allclose(state.A, ref.A) for state, ref in zip(valUni.states['ket'], states))
+    assert valUni.states['other'][0] is not None and valUni.states['other'][0].shape == (3, 1)
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason="requires fork")
+def test_statesArePickledWithoutSharedMemory(monkeypatch):
+    # without shared memory (before python 3.8) the states of the worker processes are pickled as before
+    with _isolatedRegistries():
+        serial = _sweepResults(False)
+        monkeypatch.setattr(QPool, 'shared_memory', None)
+        with ProcessPoolExecutor(2) as processes:
+            assert not sweepExecutor.wrap(processes).sharedMemory
+            assert all(np.allclose(par, ser) for par, ser in zip(_sweepResults(processes), serial))
+
+def test_threadBudgetSplitsCores():
+    # small systems use all the cores for the sweep, large ones use BLAS threads, and workers are at most the points
+    assert threadBudget.split(10, 100, 64) == (64, 1)
+    assert threadBudget.split(2048, 100, 64) == (8, 8)
+    assert threadBudget.split(2048, 3, 64) == (3, 21)
+    assert threadBudget.split(10**5, 5, 8) == (1, 8)
+
+def test_defaultProcessPoolIsSplit(monkeypatch):
+    # default process pools are split from the system dimension and the sweep size, using all but one of the cores
+    pools = []
+    monkeypatch.setattr(QPool.multiprocessing, 'cpu_count', lambda: 9)
+    monkeypatch.setattr(threadBudget, 'processPool', lambda processes, cores=None: pools.append((processes, cores)))
+    qub = qg.Qubit(frequency=1)
+    qub.simulation.Sweep.createSweep(system=qub, sweepKey='frequency', sweepList=[1, 2, 3])
+    qub.simulation.Sweep.prepare()
+    _poolMemory._budgetedPool(qub.simulation) # pylint: disable=protected-access
+    cav = qg.Cavity(dimension=1024, frequency=1)
+    cav.simulation.Sweep.createSweep(system=cav, sweepKey='frequency', sweepList=[1, 2, 3])
+    cav.simulation.Sweep.prepare()
+    _poolMemory._budgetedPool(cav.simulation) # pylint: disable=protected-access
+    cav.simulation.trajectories = 100
+    _poolMemory._budgetedPool(cav.simulation) # pylint: disable=protected-access
+    assert pools == [(3, 8), (2, 8), (2, 8)]
+
+def test_warningWithoutThreadpoolctl(monkeypatch):
+    # without threadpoolctl, the process pools are created silently, and the thread backend warns only once
+    monkeypatch.setattr(QPool, 'threadpool_limits', None)
+    monkeypatch.setattr(threadBudget, '_warned', False)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        threadBudget._initialiseWorker(3) # pylint: disable=protected-access
+    with pytest.warns(UserWarning, match='thread workers'):
+        assert threadBudget.limit(2) is None
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert threadBudget.limit(2) is None
+
+def test_threadBackendMatchesSerial():
+    # each thread uses its own copy of the simulation, and the results and states are the same as a single process
+    with _isolatedRegistries():
+        serial = _sweepResults(False)
+        threads = _sweepResults('threads')
+    assert all(np.allclose(thr, ser) for thr, ser in zip(threads, serial))
+
+@pytest.mark.skipif(platform.system() == 'Windows', reason="requires fork")
+def test_executorBackendsMatchSerial():
+    # concurrent.futures executors are used as they are (and not shut down), and give the same results as serial
+    with _isolatedRegistries():
+        serial = _sweepResults(False)
+        with ThreadPoolExecutor(2) as threads, ProcessPoolExecutor(2) as processes:
+            for executor in (threads, processes, qg.localExecutor()):
+                assert sweepExecutor.isExecutor(executor)
+                assert sweepExecutor.wrap(executor).sharedMemory is (executor is processes)
+                assert all(np.allclose(exe, ser) for exe, ser in zip(_sweepResults(executor), serial))
+            assert sweepExecutor.wrap(processes).workers == 2
+            assert threads.submit(sum, [1, 2]).result() == 3